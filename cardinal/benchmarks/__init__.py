@@ -0,0 +1,3 @@
+"""
+Benchmarks for Cardinal.
+"""
\ No newline at end of file
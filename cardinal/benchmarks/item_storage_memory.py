@@ -0,0 +1,117 @@
+"""
+Memory used by the in-memory item storage backends of the example module.
+
+Fills each backend with the same generated items and reports the memory
+it allocated, measured with tracemalloc, along with the time taken to
+create the items and to read them back page by page.
+
+Run from the cardinal directory:
+
+    python -m benchmarks.item_storage_memory --items 100000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict, Iterator
+
+from modules.example_module.compact import CompactItemStorage
+from modules.example_module.storage import MemoryItemStorage
+
+BACKENDS = {
+    "memory": MemoryItemStorage,
+    "compact": CompactItemStorage,
+}
+
+
+def generate_items(count: int) -> Iterator[Dict[str, Any]]:
+    """
+    Generate item data.
+
+    The strings are built on the fly, so that a backend keeping references
+    to them is charged for their memory.
+
+    Args:
+        count: Number of items
+
+    Yields:
+        The field values of each item
+    """
+    now = datetime.now()
+    for i in range(count):
+        yield {
+            "name": f"Item {i:08d}",
+            "description": f"Description of generated item number {i}",
+            "price": (i % 10000) / 100,
+            "is_active": i % 3 != 0,
+            "created_at": now,
+        }
+
+
+def measure(name: str, count: int, page_size: int) -> Dict[str, float]:
+    """
+    Fill one backend and measure it.
+
+    Args:
+        name: Name of the backend in BACKENDS
+        count: Number of items to create
+        page_size: Number of items per page when reading them back
+
+    Returns:
+        Bytes allocated in total and per item, and the create and scan times
+    """
+    gc.collect()
+    tracemalloc.start()
+    start_memory = tracemalloc.get_traced_memory()[0]
+
+    start = time.perf_counter()
+    storage = BACKENDS[name]()
+    for data in generate_items(count):
+        storage.create(data)
+    create_s = time.perf_counter() - start
+
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - start_memory
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    cursor = None
+    while True:
+        _, cursor = storage.get_page(cursor, page_size, 0)
+        if cursor is None:
+            break
+    scan_s = time.perf_counter() - start
+
+    return {
+        "bytes": used,
+        "bytes_per_item": used / count,
+        "create_s": create_s,
+        "scan_s": scan_s,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=100000, help="Number of items per backend")
+    parser.add_argument("--page-size", type=int, default=500, help="Items per page when reading back")
+    parser.add_argument("--backend", action="append", choices=sorted(BACKENDS),
+                        help="Backend to measure (repeatable, default: all)")
+    args = parser.parse_args()
+
+    print(f"{'backend':<10}{'total MiB':>12}{'bytes/item':>12}{'create s':>10}{'scan s':>10}")
+    results = {}
+    for name in args.backend or list(BACKENDS):
+        result = measure(name, args.items, args.page_size)
+        results[name] = result
+        print(f"{name:<10}{result['bytes'] / 2 ** 20:>12.1f}{result['bytes_per_item']:>12.0f}"
+              f"{result['create_s']:>10.2f}{result['scan_s']:>10.2f}")
+
+    if "memory" in results and "compact" in results:
+        ratio = results["memory"]["bytes"] / max(1, results["compact"]["bytes"])
+        print(f"compact uses {ratio:.1f}x less memory than memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,525 @@
+"""
+Load test of Cardinal core and the example module, with baseline comparison.
+
+Measures throughput and p50/p99 latency of /health, /modules and the items
+CRUD endpoints at several concurrency levels and collection sizes, plus the
+latency of item reads while the example module is hot-reloaded. Requests go
+through HTTP semantics with httpx, either to the application in-process
+(ASGI, no network), to a uvicorn server started in a background thread, or
+to an already running server.
+
+Runs are reproducible: the request mix uses a fixed random seed, each case
+starts with a warm-up and reports the median of several rounds, and every
+collection size gets a fresh application with the in-memory storage
+(in-process and uvicorn targets).
+
+Run from the cardinal directory:
+
+    python -m benchmarks.load
+    python -m benchmarks.load --target uvicorn --concurrency 1,10,50
+    python -m benchmarks.load --save-baseline benchmarks/load_baseline.json
+    python -m benchmarks.load --baseline benchmarks/load_baseline.json
+
+With --baseline, the exit status is 1 if a case got slower than the
+thresholds allow. Baselines are only comparable on the same machine and
+with the same options, so none is committed (load_baseline.json is ignored
+by git): record one before making a change and compare after it. The
+default thresholds are strict: a 10% throughput drop, or a p99 latency 25%
+and 0.25 ms higher, is a regression. On a shared machine whose results
+swing by 30% or more, loosen them for that run rather than in the defaults,
+and use more rounds:
+
+    python -m benchmarks.load --baseline benchmarks/load_baseline.json \
+        --rounds 7 --rps-threshold 0.45 --latency-threshold 1.0 --min-latency-increase 1.0
+"""
+
+import argparse
+import asyncio
+import gc
+import itertools
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import sys
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from core import create_app
+from core.config import CoreConfig
+
+# Request factory of a scenario: request number -> (method, path, JSON body)
+RequestFactory = Callable[[int], Tuple[str, str, Optional[Any]]]
+
+SCENARIOS = ("health", "modules", "items_list", "item_get", "item_create", "item_update", "item_delete")
+
+# Default of --min-latency-increase: p99 increases below this many
+# milliseconds are noise, never regressions
+MIN_LATENCY_REGRESSION_MS = 0.25
+
+
+def build_config() -> CoreConfig:
+    """Configuration of the benchmarked application: no file logging, no watcher."""
+    return CoreConfig(log_file=None, auto_reload=False, module_loading="eager")
+
+
+class Target:
+    """
+    An application to send requests to.
+
+    Attributes:
+        client: HTTP client bound to the application
+        app: The application, when it runs in this process (needed for reloads)
+    """
+
+    def __init__(self, client: httpx.AsyncClient, app: Any = None,
+                 run_in_app_loop: Optional[Callable[[Awaitable], Awaitable]] = None):
+        self.client = client
+        self.app = app
+        self._run_in_app_loop = run_in_app_loop
+
+    async def reload_module(self, module_name: str) -> float:
+        """
+        Hot-reload a module of the application.
+
+        Returns:
+            Time taken by the reload, in milliseconds.
+        """
+        loader = self.app.state.module_loader
+        start = time.perf_counter()
+        coroutine = loader.load_module_async(module_name)
+        if self._run_in_app_loop is not None:
+            await self._run_in_app_loop(coroutine)
+        else:
+            await coroutine
+        return (time.perf_counter() - start) * 1000
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class InProcessTarget(Target):
+    """The application called through ASGI in this event loop."""
+
+    def __init__(self):
+        app = create_app(build_config())
+        self._lifespan = app.router.lifespan_context(app)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://cardinal")
+        super().__init__(client, app)
+
+    async def start(self) -> None:
+        await self._lifespan.__aenter__()
+
+    async def close(self) -> None:
+        await super().close()
+        await self._lifespan.__aexit__(None, None, None)
+
+
+class UvicornTarget(Target):
+    """The application served by uvicorn on a local port, in its own thread and event loop."""
+
+    def __init__(self):
+        import uvicorn
+
+        app = create_app(build_config())
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_until_complete, args=(self.server.serve(),),
+                                       daemon=True)
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}",
+                                   limits=httpx.Limits(max_connections=1000, max_keepalive_connections=1000))
+        super().__init__(client, app, self._run_on_server_loop)
+
+    async def _run_on_server_loop(self, coroutine: Awaitable) -> Any:
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, self.loop))
+
+    async def start(self) -> None:
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("uvicorn failed to start")
+            await asyncio.sleep(0.05)
+
+    async def close(self) -> None:
+        await super().close()
+        self.server.should_exit = True
+        await asyncio.to_thread(self.thread.join, 10)
+
+
+class UrlTarget(Target):
+    """An application already running at a URL; it cannot be reset or reloaded."""
+
+    def __init__(self, url: str):
+        client = httpx.AsyncClient(base_url=url.rstrip("/"),
+                                   limits=httpx.Limits(max_connections=1000, max_keepalive_connections=1000))
+        super().__init__(client)
+
+    async def start(self) -> None:
+        (await self.client.get("/health")).raise_for_status()
+
+
+def make_target(kind: str, url: Optional[str]) -> Target:
+    if kind == "inprocess":
+        return InProcessTarget()
+    if kind == "uvicorn":
+        return UvicornTarget()
+    if kind == "url":
+        if not url:
+            raise SystemExit("--url is required with --target url")
+        return UrlTarget(url)
+    raise SystemExit(f"Unknown target: {kind}")
+
+
+async def create_items(client: httpx.AsyncClient, count: int, rng: random.Random) -> List[int]:
+    """
+    Create items through the bulk endpoint.
+
+    Returns:
+        The IDs of the new items.
+    """
+    ids: List[int] = []
+    for start in range(0, count, 1000):
+        batch = [
+            {"name": f"bench-{start + i}", "description": "load test item", "price": round(rng.uniform(1, 500), 2)}
+            for i in range(min(1000, count - start))
+        ]
+        response = await client.post("/items/bulk", json=batch)
+        response.raise_for_status()
+        ids.extend(result["id"] for result in response.json()["results"] if result["status"] == 201)
+    return ids
+
+
+async def measure(client: httpx.AsyncClient, make_request: RequestFactory, concurrency: int,
+                  requests: Optional[int] = None, stop: Optional[asyncio.Event] = None) -> Dict[str, Any]:
+    """
+    Send requests from concurrent workers and collect their latencies.
+
+    Args:
+        client: HTTP client bound to the application
+        make_request: Builds the method, path and body of each request
+        concurrency: Number of concurrent workers
+        requests: Total number of requests to send
+        stop: Alternatively, an event that ends the run when set
+
+    Returns:
+        Request and error counts, throughput and latency percentiles.
+    """
+    counter = itertools.count()
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        while True:
+            if stop is not None and stop.is_set():
+                return
+            number = next(counter)
+            if requests is not None and number >= requests:
+                return
+            method, path, body = make_request(number)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            if failed:
+                errors += 1
+            # In-process requests that never wait on I/O complete without
+            # suspending; yield so that the other workers and the reloads run
+            await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    def percentile(quantile: float) -> float:
+        if not latencies:
+            return 0.0
+        return round(latencies[min(len(latencies) - 1, int(quantile * len(latencies)))] * 1000, 3)
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+    }
+
+
+def request_factory(scenario: str, ids: List[int], spare_ids: List[int], rng: random.Random) -> RequestFactory:
+    """
+    Build the requests of a scenario.
+
+    Args:
+        scenario: One of SCENARIOS
+        ids: IDs of the items in the collection
+        spare_ids: IDs of items created to be deleted
+        rng: Source of the random item choices
+    """
+    if scenario == "health":
+        return lambda number: ("GET", "/health", None)
+    if scenario == "modules":
+        return lambda number: ("GET", "/modules", None)
+    if scenario == "items_list":
+        # Pages spread over the collection, through keyset cursors
+        cursors = [rng.choice(ids) for _ in range(1024)]
+        return lambda number: ("GET", f"/items/?limit=20&cursor={cursors[number % 1024]}", None)
+    if scenario == "item_get":
+        picks = [rng.choice(ids) for _ in range(1024)]
+        return lambda number: ("GET", f"/items/{picks[number % 1024]}", None)
+    if scenario == "item_create":
+        return lambda number: ("POST", "/items/", {"name": f"created-{number}", "price": 9.99})
+    if scenario == "item_update":
+        picks = [rng.choice(ids) for _ in range(1024)]
+        return lambda number: ("PUT", f"/items/{picks[number % 1024]}", {"price": 10.0 + number % 100})
+    if scenario == "item_delete":
+        return lambda number: ("DELETE", f"/items/{spare_ids[number]}", None)
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+async def run_reload_scenario(target: Target, ids: List[int], concurrency: int, reloads: int,
+                              interval: float, rng: random.Random) -> Dict[str, Any]:
+    """
+    Read items while the example module is hot-reloaded several times.
+
+    Returns:
+        The latencies of the reads, and the mean and maximum reload times.
+    """
+    stop = asyncio.Event()
+    reload_ms: List[float] = []
+
+    async def reloader() -> None:
+        try:
+            for _ in range(reloads):
+                await asyncio.sleep(interval)
+                reload_ms.append(await target.reload_module("example_module"))
+            await asyncio.sleep(interval)
+        finally:
+            stop.set()
+
+    make_request = request_factory("item_get", ids, [], rng)
+    result, _ = await asyncio.gather(measure(target.client, make_request, concurrency, stop=stop), reloader())
+    result["reloads"] = len(reload_ms)
+    result["reload_mean_ms"] = round(sum(reload_ms) / len(reload_ms), 3) if reload_ms else None
+    result["reload_max_ms"] = round(max(reload_ms), 3) if reload_ms else None
+    return result
+
+
+async def run_suite(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    """
+    Run every scenario at every collection size and concurrency level.
+
+    Returns:
+        Results by case name ("scenario/n<size>/c<concurrency>").
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    rng = random.Random(args.seed)
+    seeded_ids: List[int] = []
+
+    for size in args.sizes:
+        target = make_target(args.target, args.url)
+        await target.start()
+        try:
+            if args.target == "url":
+                # The collection of a running server cannot be reset, only grown
+                seeded_ids += await create_items(target.client, max(0, size - len(seeded_ids)), rng)
+                ids = list(seeded_ids)
+            else:
+                ids = await create_items(target.client, size, rng)
+
+            for concurrency in args.concurrency:
+                for scenario in args.scenarios:
+                    spare_ids: List[int] = []
+                    if scenario == "item_delete":
+                        spare_ids = await create_items(
+                            target.client, args.warmup + args.rounds * args.requests, rng
+                        )
+                    make_request = request_factory(scenario, ids, spare_ids, rng)
+
+                    # Warm up on the first requests of the scenario, then take
+                    # the median of several rounds over the next ones
+                    await measure(target.client, make_request, concurrency, requests=args.warmup)
+                    rounds = []
+                    for round_number in range(args.rounds):
+                        offset = args.warmup + round_number * args.requests
+                        gc.collect()
+                        rounds.append(await measure(
+                            target.client, lambda number: make_request(number + offset), concurrency,
+                            requests=args.requests,
+                        ))
+                    result = median_result(rounds)
+                    name = f"{scenario}/n{size}/c{concurrency}"
+                    results[name] = result
+                    print_result(name, result)
+
+                if args.reloads and target.app is not None:
+                    name = f"hot_reload/n{size}/c{concurrency}"
+                    result = await run_reload_scenario(
+                        target, ids, concurrency, args.reloads, args.reload_interval, rng
+                    )
+                    results[name] = result
+                    print_result(name, result)
+        finally:
+            await target.close()
+
+    return results
+
+
+def median_result(rounds: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine the results of several rounds of a case.
+
+    Args:
+        rounds: Results of each round, as returned by measure
+
+    Returns:
+        The median throughput and latencies of the rounds, and their total
+        request and error counts.
+    """
+    result: Dict[str, Any] = {
+        "requests": sum(round_result["requests"] for round_result in rounds),
+        "errors": sum(round_result["errors"] for round_result in rounds),
+    }
+    for key in ("rps", "p50_ms", "p99_ms", "max_ms"):
+        result[key] = statistics.median(round_result[key] for round_result in rounds)
+    return result
+
+
+def print_result(name: str, result: Dict[str, Any]) -> None:
+    line = (f"{name:<32}{result['rps']:>10.0f} req/s  p50 {result['p50_ms']:>8.2f} ms  "
+            f"p99 {result['p99_ms']:>8.2f} ms  max {result['max_ms']:>8.2f} ms")
+    if result["errors"]:
+        line += f"  errors {result['errors']}"
+    if "reloads" in result:
+        line += f"  ({result['reloads']} reloads, mean {result['reload_mean_ms']} ms)"
+    print(line, flush=True)
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            rps_threshold: float, latency_threshold: float,
+            min_latency_increase: float = MIN_LATENCY_REGRESSION_MS) -> List[str]:
+    """
+    Compare results with a baseline.
+
+    Args:
+        results: Results of this run
+        baseline: Results of the baseline run
+        rps_threshold: Largest accepted relative throughput drop (0.1 for 10%)
+        latency_threshold: Largest accepted relative p99 latency increase
+        min_latency_increase: p99 latency increases below this many
+            milliseconds are never regressions
+
+    Returns:
+        A description of each regression.
+    """
+    regressions = []
+    print(f"\n{'case':<32}{'req/s':>10}{'change':>9}{'p99 ms':>10}{'change':>9}")
+    for name, base in baseline.items():
+        current = results.get(name)
+        if current is None:
+            continue
+        rps_change = current["rps"] / base["rps"] - 1 if base["rps"] else 0.0
+        p99_change = current["p99_ms"] / base["p99_ms"] - 1 if base["p99_ms"] else 0.0
+        print(f"{name:<32}{current['rps']:>10.0f}{rps_change:>+9.1%}{current['p99_ms']:>10.2f}{p99_change:>+9.1%}")
+
+        if rps_change < -rps_threshold:
+            regressions.append(f"{name}: throughput {base['rps']:.0f} -> {current['rps']:.0f} req/s "
+                               f"({rps_change:+.1%})")
+        if (p99_change > latency_threshold
+                and current["p99_ms"] - base["p99_ms"] > min_latency_increase):
+            regressions.append(f"{name}: p99 latency {base['p99_ms']:.2f} -> {current['p99_ms']:.2f} ms "
+                               f"({p99_change:+.1%})")
+        if current["errors"] > base.get("errors", 0):
+            regressions.append(f"{name}: {current['errors']} errors (baseline {base.get('errors', 0)})")
+    return regressions
+
+
+def environment(args: argparse.Namespace) -> Dict[str, Any]:
+    """Describe the machine and options of a run, stored with baselines."""
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "target": args.target,
+        "sizes": args.sizes,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "rounds": args.rounds,
+        "seed": args.seed,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", choices=("inprocess", "uvicorn", "url"), default="inprocess",
+                        help="Where the application runs")
+    parser.add_argument("--url", help="Base URL of the server with --target url")
+    parser.add_argument("--scenarios", type=lambda value: value.split(","), default=list(SCENARIOS),
+                        help="Comma-separated scenarios to run")
+    parser.add_argument("--concurrency", type=int_list, default=[1, 10, 50], help="Concurrency levels")
+    parser.add_argument("--sizes", type=int_list, default=[100, 10000], help="Collection sizes")
+    parser.add_argument("--requests", type=int, default=1000, help="Measured requests per case")
+    parser.add_argument("--warmup", type=int, default=100, help="Warm-up requests per case")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per case, their median is kept")
+    parser.add_argument("--reloads", type=int, default=3,
+                        help="Hot reloads per hot_reload case (0 to skip the scenario)")
+    parser.add_argument("--reload-interval", type=float, default=0.5, help="Seconds between hot reloads")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed of the request mix")
+    parser.add_argument("--baseline", help="Baseline file to compare the results with")
+    parser.add_argument("--save-baseline", help="File to write the results to, as a new baseline")
+    parser.add_argument("--rps-threshold", type=float, default=0.10,
+                        help="Largest accepted throughput drop against the baseline (0.1 for 10%%)")
+    parser.add_argument("--latency-threshold", type=float, default=0.25,
+                        help="Largest accepted p99 latency increase against the baseline (0.25 for 25%%)")
+    parser.add_argument("--min-latency-increase", type=float, default=MIN_LATENCY_REGRESSION_MS,
+                        help="p99 latency increases below this many milliseconds are never regressions")
+    args = parser.parse_args()
+
+    if args.rounds < 1:
+        parser.error("--rounds must be at least 1")
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = asyncio.run(run_suite(args))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump({"environment": environment(args), "results": results}, baseline_file, indent=2)
+            baseline_file.write("\n")
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(results, baseline["results"], args.rps_threshold, args.latency_threshold,
+                              args.min_latency_increase)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Per-request overhead of the metrics middleware.
+
+Calls a minimal ASGI application directly, with and without
+MetricsMiddleware around it, and reports the extra time per request. No
+server or HTTP client is involved, so the difference is the cost of the
+instrumentation alone.
+
+Run from the cardinal directory:
+
+    python -m benchmarks.metrics_overhead --requests 200000
+"""
+
+import argparse
+import asyncio
+import time
+
+from core.metrics import MetricsRegistry
+from core.middleware import MetricsMiddleware
+
+
+class _Route:
+    path = "/items/{item_id}"
+
+
+ROUTE = _Route()
+
+
+async def endpoint_app(scope, receive, send) -> None:
+    """A minimal application that routes like Starlette and sends an empty response."""
+    scope["route"] = ROUTE
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message) -> None:
+    pass
+
+
+async def run(app, requests: int) -> float:
+    """
+    Call an application repeatedly.
+
+    Args:
+        app: The ASGI application
+        requests: Number of calls
+
+    Returns:
+        Mean time per call, in microseconds.
+    """
+    scope = {"type": "http", "method": "GET", "path": "/items/1", "headers": [], "query_string": b""}
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def main_async(requests: int, rounds: int) -> None:
+    registry = MetricsRegistry()
+    registry.set_module_prefix("example_module", "/items")
+    instrumented = MetricsMiddleware(endpoint_app, registry)
+
+    # Best of several rounds, to limit noise
+    bare = min([await run(endpoint_app, requests) for _ in range(rounds)])
+    measured = min([await run(instrumented, requests) for _ in range(rounds)])
+
+    print(f"bare app:          {bare:8.2f} us/request")
+    print(f"with metrics:      {measured:8.2f} us/request")
+    print(f"metrics overhead:  {measured - bare:8.2f} us/request")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200000, help="Requests per round")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per variant, the best one is kept")
+    args = parser.parse_args()
+    asyncio.run(main_async(args.requests, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Throughput of /health with the old and new request logging middleware.
+
+The request logger used to be installed with ``@app.middleware("http")``
+(Starlette's BaseHTTPMiddleware), which runs the rest of the stack in a
+separate task and wraps the response body in a stream. It is now a
+RequestHook run by the plain ASGI RequestHooksMiddleware. This benchmark
+calls the application directly through ASGI, with DEBUG logging disabled
+as in production, in three setups:
+
+- none: no request logging
+- base_http: the previous BaseHTTPMiddleware logger
+- hooks: the RequestLogHook registered on the hooks middleware
+
+Run from the cardinal directory:
+
+    python -m benchmarks.request_middleware --requests 20000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from core import create_app
+from core.config import CoreConfig
+from core.middleware import add_request_hook
+from core.utils.logging import RequestLogHook
+
+logger = logging.getLogger("cardinal.benchmark")
+logger.setLevel(logging.INFO)
+
+
+def build_app(setup: str):
+    """
+    Build a Cardinal app with one of the request logging setups.
+
+    Args:
+        setup: "none", "base_http" or "hooks"
+
+    Returns:
+        The FastAPI application
+    """
+    app = create_app(CoreConfig(
+        log_file=None,
+        auto_reload=False,
+        metrics_enabled=False,
+        response_cache_max_bytes=0,
+    ))
+
+    if setup == "base_http":
+        @app.middleware("http")
+        async def log_requests(request, call_next):
+            logger.debug(f"Request: {request.method} {request.url.path}")
+            response = await call_next(request)
+            logger.debug(f"Response: {response.status_code}")
+            return response
+    elif setup == "hooks":
+        add_request_hook(app, RequestLogHook(logger))
+
+    return app
+
+
+async def run(app, requests: int) -> float:
+    """
+    Send GET /health requests straight to the ASGI application.
+
+    Args:
+        app: The application
+        requests: Number of requests
+
+    Returns:
+        Requests per second.
+    """
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/health", "raw_path": b"/health",
+        "query_string": b"", "root_path": "", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return requests / (time.perf_counter() - start)
+
+
+async def main_async(requests: int, rounds: int) -> None:
+    apps = {setup: build_app(setup) for setup in ("none", "base_http", "hooks")}
+
+    # Warm up, then keep the best of several interleaved rounds
+    for app in apps.values():
+        await run(app, 200)
+    results = {setup: 0.0 for setup in apps}
+    for _ in range(rounds):
+        for setup, app in apps.items():
+            results[setup] = max(results[setup], await run(app, requests))
+
+    for setup, rate in results.items():
+        print(f"{setup:<10}{rate:>10.0f} req/s{1e6 / rate:>10.1f} us/req")
+    print(f"hooks vs base_http: {results['hooks'] / results['base_http']:.2f}x throughput")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000, help="Requests per round")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per setup, the best one is kept")
+    args = parser.parse_args()
+    asyncio.run(main_async(args.requests, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
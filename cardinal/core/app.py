@@ -2,9 +2,21 @@
 Main FastAPI application factory for Cardinal.
 """
 
+import asyncio
 import logging
+import os
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import PlainTextResponse
+from .bulkhead import BulkheadLimits, BulkheadRegistry
+from .cache import ResponseCache
+from .executors import ExecutionPolicy, ExecutorRegistry, set_executor_registry
+from .coordination import ReloadCoordinator, default_state_dir
+from .metrics import CORE_MODULE, MetricsRegistry
+from .middleware import BulkheadMiddleware, LazyLoadMiddleware, MetricsMiddleware, RequestHooksMiddleware, ResponseCacheMiddleware
 from .module_loader import ModuleLoader
+from .openapi import OpenAPICache
+from .resources import ResourceRegistry
+from .utils.logging import get_log_pipeline
 from .config import CoreConfig
 
 logger = logging.getLogger(__name__)
@@ -41,51 +53,189 @@ def create_app(config: CoreConfig = None) -> FastAPI:
         return {"status": "healthy", "version": config.version}
     
     # Create and setup module loader
-    module_loader = ModuleLoader(app, config.modules_path)
+    module_loader = ModuleLoader(
+        app,
+        config.modules_path,
+        watcher_backend=config.watcher_backend,
+        watcher_debounce=config.watcher_debounce,
+        watcher_poll_interval=config.watcher_poll_interval,
+        load_workers=config.module_load_workers,
+    )
+
+    # Record per-route metrics; set up before any module is loaded so that
+    # module prefixes are known to the registry
+    if config.metrics_enabled:
+        module_loader.metrics = MetricsRegistry(modules_package=module_loader.modules_path.name)
+
+        @main_router.get(config.metrics_url, tags=["System"], response_class=PlainTextResponse)
+        async def get_metrics():
+            """Return request metrics in the Prometheus text format."""
+            text = module_loader.metrics.render_prometheus()
+            if module_loader.bulkheads is not None:
+                text += module_loader.bulkheads.render_prometheus()
+            return PlainTextResponse(text, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+    # Per-module concurrency limits; set up before any module is loaded so
+    # that module prefixes and limits are known to the registry
+    module_loader.bulkheads = BulkheadRegistry(
+        BulkheadLimits(
+            max_concurrent=config.bulkhead_max_concurrent,
+            max_queue=config.bulkhead_max_queue,
+            queue_timeout=config.bulkhead_queue_timeout,
+        ),
+        overrides=config.bulkhead_modules,
+    )
+
+    # Shared resources (pooled HTTP client, ...), opened at startup
+    resources = ResourceRegistry(
+        max_connections=config.http_client_max_connections,
+        max_keepalive_connections=config.http_client_max_keepalive,
+        keepalive_expiry=config.http_client_keepalive_expiry,
+        timeout=config.http_client_timeout,
+        http2=config.http_client_http2,
+        retries=config.http_client_retries,
+    )
+    app.state.resources = resources
+
+    @main_router.get(config.resources_url, tags=["System"])
+    async def resources_info():
+        """Return the connection pool stats of the shared resources."""
+        return resources.stats()
+
+    # Per-module thread and process pools used by offload and run_sync
+    module_loader.executors = ExecutorRegistry(
+        ExecutionPolicy(
+            threads=config.executor_threads,
+            processes=config.executor_processes or os.cpu_count() or 1,
+        ),
+        overrides=config.executor_modules,
+        modules_package=module_loader.modules_path.name,
+        start_method=config.executor_start_method,
+    )
+    set_executor_registry(module_loader.executors)
+
+    # Coordinate hot reloads between worker processes
+    if config.auto_reload and config.reload_coordination == "file":
+        module_loader.coordinator = ReloadCoordinator(
+            module_loader,
+            config.reload_state_dir or default_state_dir(module_loader.modules_path),
+            sync_interval=config.reload_sync_interval,
+        )
 
     # Add modules info endpoint
     @main_router.get("/modules", tags=["System"])
     async def modules_info():
         """Return information about all loaded modules."""
         modules_data = []
+        metrics = module_loader.metrics.module_summary() if module_loader.metrics is not None else {}
+        bulkheads = module_loader.bulkheads.stats()
+        executors = module_loader.executors.stats()
         
         for module_name, module in module_loader.loaded_modules.items():
             router = module_loader._get_module_router(module)
-            routes_count = 0
-            prefix = ""
-            
-            if router:
-                prefix = getattr(router, "prefix", "")
-                # Count routes associated with this router
-                for route in app.routes:
-                    if hasattr(route, "path") and route.path.startswith(prefix or "/"):
-                        if not prefix or (
-                            # Ensure we only count routes that belong to this router
-                            # and not routes that just happen to start with the same prefix
-                            prefix == "/" or 
-                            route.path == prefix or 
-                            route.path.startswith(f"{prefix}/")
-                        ):
-                            routes_count += 1
+            prefix = getattr(router, "prefix", "") if router else ""
+            routes_count = module_loader.get_routes_count(module_name)
             
             # Get module description if available
             description = getattr(module, "__doc__", "").strip() or "No description available"
+            stats = module_loader.module_stats.get(module_name)
             
             modules_data.append({
                 "name": module_name,
                 "route_prefix": prefix,
                 "routes_count": routes_count,
                 "description": description,
-                "is_active": True  # All loaded modules are active
+                "is_active": True,  # All loaded modules are active
+                "loaded": True,
+                "load_stats": stats.to_dict() if stats else None,
+                "metrics": metrics.get(module_name),
+                "bulkhead": bulkheads.get(module_name),
+                "executors": executors.get(module_name)
+            })
+
+        # Modules that failed to load and have no previous version serving
+        for module_name, stats in module_loader.module_stats.items():
+            if module_name not in module_loader.loaded_modules:
+                modules_data.append({
+                    "name": module_name,
+                    "route_prefix": "",
+                    "routes_count": 0,
+                    "description": "No description available",
+                    "is_active": False,
+                    "loaded": False,
+                    "load_stats": stats.to_dict()
+                })
+
+        # Modules discovered in lazy mode but not imported yet
+        for module_name, prefix in module_loader.pending_modules.items():
+            entry = module_loader.manifest.get(module_name)
+            modules_data.append({
+                "name": module_name,
+                "route_prefix": prefix,
+                "routes_count": 0,
+                "description": (entry.description if entry else "") or "No description available",
+                "is_active": True,
+                "loaded": False,
+                "load_stats": None,
+                "metrics": metrics.get(module_name),
+                "bulkhead": bulkheads.get(module_name)
             })
         
-        return {"modules": modules_data}
+        if module_loader.coordinator is not None:
+            reload_status = await asyncio.to_thread(module_loader.coordinator.status)
+        else:
+            reload_status = {"mode": "none"}
+
+        response_cache = module_loader.response_cache
+        log_pipeline = get_log_pipeline()
+
+        return {
+            "modules": modules_data,
+            "reload": reload_status,
+            "response_cache": response_cache.stats() if response_cache is not None else None,
+            "core_metrics": metrics.get(CORE_MODULE),
+            "logging": log_pipeline.stats() if log_pipeline is not None else None,
+            "startup_ms": round(module_loader.startup_ms, 3) if module_loader.startup_ms is not None else None
+        }
 
     # Include the main router
     app.include_router(main_router)
 
-    # Load initial modules
-    module_loader.load_all_modules()
+    # Serve the OpenAPI schema from the incremental per-module cache
+    module_loader.openapi_cache = OpenAPICache(app, module_loader, compress=config.openapi_gzip)
+    module_loader.openapi_cache.install(config.openapi_url)
+
+    # Load initial modules, or only discover them in lazy modes
+    if config.module_loading in ("lazy", "warmup"):
+        module_loader.prepare_lazy_loading(config.module_manifest_file)
+        app.add_middleware(
+            LazyLoadMiddleware,
+            module_loader=module_loader,
+            load_all_paths=[config.openapi_url],
+        )
+    else:
+        module_loader.load_all_modules()
+
+    # Inside the response cache, so that cache hits do not take a module slot
+    app.add_middleware(BulkheadMiddleware, registry=module_loader.bulkheads)
+
+    # Cache the responses of routes marked with cache_response
+    if config.response_cache_max_bytes > 0:
+        module_loader.response_cache = ResponseCache(
+            max_bytes=config.response_cache_max_bytes,
+            max_entry_bytes=config.response_cache_max_entry_bytes,
+            modules_package=module_loader.modules_path.name,
+        )
+        app.add_middleware(ResponseCacheMiddleware, cache=module_loader.response_cache)
+    app.state.response_cache = module_loader.response_cache
+
+    # Request hooks (logging, timing, tracing) registered with add_request_hook
+    app.state.request_hooks = []
+    app.add_middleware(RequestHooksMiddleware, hooks=app.state.request_hooks)
+
+    # Outermost, so that cache hits and lazy loading are measured too
+    if module_loader.metrics is not None:
+        app.add_middleware(MetricsMiddleware, registry=module_loader.metrics)
 
     # Store module_loader in app state for access from other parts
     app.state.module_loader = module_loader
@@ -94,13 +244,26 @@ def create_app(config: CoreConfig = None) -> FastAPI:
     @app.on_event("startup")
     async def startup_event():
         logger.info(f"Starting Cardinal {config.version}")
+        # Before the module hooks, so that they can use the shared resources
+        await resources.start()
+        await module_loader.run_startup_hooks()
         if config.auto_reload:
             await module_loader.start_watcher()
+        if config.module_loading == "warmup":
+            await module_loader.start_warmup()
 
     @app.on_event("shutdown")
     async def shutdown_event():
         logger.info("Shutting down Cardinal")
+        await module_loader.stop_warmup()
         if config.auto_reload:
             await module_loader.stop_watcher()
+        # Let the calls submitted to the module pools complete before the
+        # modules release what they use (e.g. storage connections)
+        await asyncio.to_thread(module_loader.executors.shutdown)
+        await module_loader.unload_all_modules()
+        # Pools the unload hooks may have started again
+        await asyncio.to_thread(module_loader.executors.shutdown)
+        await resources.close()
 
     return app
\ No newline at end of file
@@ -0,0 +1,306 @@
+"""
+Per-module concurrency limits (bulkheads) for Cardinal.
+
+Every module shares the event loop and the threadpool, so one slow module
+could otherwise hold all the capacity. A bulkhead caps the number of
+requests a module handles at once. Requests over the limit wait in a
+bounded queue; they are rejected with 429 when the queue is full, and with
+503 when they waited longer than the queue timeout.
+
+Limits come from CoreConfig (defaults and per-module overrides), or from
+the module itself:
+
+    router = APIRouter(prefix="/reports")
+    set_bulkhead(router, max_concurrent=8, max_queue=32, queue_timeout=2.0)
+
+Requests are attributed to a module by its router prefix, before routing,
+so modules without a prefix are not limited.
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+# Attribute set on routers by set_bulkhead
+BULKHEAD_ATTR = "__cardinal_bulkhead__"
+
+
+class BulkheadLimits:
+    """
+    Limits of one module's bulkhead.
+
+    Attributes:
+        max_concurrent: Requests handled at once (0 for no limit)
+        max_queue: Requests waiting for a slot before new ones are rejected with 429
+        queue_timeout: Seconds a request waits for a slot before it is rejected with 503
+    """
+
+    __slots__ = ("max_concurrent", "max_queue", "queue_timeout")
+
+    def __init__(self, max_concurrent: int = 0, max_queue: int = 100, queue_timeout: float = 5.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+    def merge(self, changes: Dict[str, Any]) -> "BulkheadLimits":
+        """Return a copy with some of the limits changed."""
+        limits = self.to_dict()
+        limits.update({key: value for key, value in changes.items() if key in limits})
+        return BulkheadLimits(**limits)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+        }
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, BulkheadLimits) and self.to_dict() == other.to_dict()
+
+
+def set_bulkhead(router: Any, max_concurrent: int, max_queue: int = 100, queue_timeout: float = 5.0) -> None:
+    """
+    Declare the concurrency limits of a module on its router.
+
+    Per-module overrides in CoreConfig.bulkhead_modules take precedence.
+
+    Args:
+        router: The module's APIRouter
+        max_concurrent: Requests handled at once
+        max_queue: Requests waiting for a slot before new ones are rejected with 429
+        queue_timeout: Seconds a request waits for a slot before it is rejected with 503
+    """
+    setattr(router, BULKHEAD_ATTR, BulkheadLimits(max_concurrent, max_queue, queue_timeout))
+
+
+def get_bulkhead_limits(router: Any) -> Optional[BulkheadLimits]:
+    """Return the limits declared on a router with set_bulkhead, if any."""
+    return getattr(router, BULKHEAD_ATTR, None)
+
+
+class Bulkhead:
+    """
+    Admits a bounded number of concurrent requests, queueing the excess.
+
+    Only used from the event loop, so it needs no locking.
+    """
+
+    def __init__(self, limits: BulkheadLimits):
+        """
+        Initialize the bulkhead.
+
+        Args:
+            limits: The limits to enforce
+        """
+        self.limits = limits
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.peak_queued = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        """Number of requests waiting for a slot."""
+        return len(self._waiters)
+
+    async def acquire(self) -> Optional[int]:
+        """
+        Wait for a slot.
+
+        Returns:
+            None once the request holds a slot, which it must give back with
+            release(), or the status code to reject the request with.
+        """
+        limits = self.limits
+        if self.in_flight < limits.max_concurrent and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return None
+
+        if len(self._waiters) >= limits.max_queue or limits.queue_timeout <= 0:
+            self.rejected_queue_full += 1
+            return 429
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.peak_queued = max(self.peak_queued, len(self._waiters))
+        try:
+            await asyncio.wait_for(waiter, limits.queue_timeout)
+        except asyncio.TimeoutError:
+            self._discard_waiter(waiter)
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait timed out
+                self.release()
+            self.rejected_timeout += 1
+            return 503
+        except asyncio.CancelledError:
+            self._discard_waiter(waiter)
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the request was cancelled
+                self.release()
+            raise
+
+        # release() handed its slot over, so in_flight is already counted
+        self.admitted += 1
+        return None
+
+    def _discard_waiter(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self) -> None:
+        """Give a slot back, handing it to the oldest waiting request if any."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Describe the bulkhead state.
+
+        Returns:
+            The limits, requests in flight and queued, and admission and
+            rejection counters.
+        """
+        return dict(
+            self.limits.to_dict(),
+            in_flight=self.in_flight,
+            queued=self.queued,
+            peak_queued=self.peak_queued,
+            admitted=self.admitted,
+            rejected_queue_full=self.rejected_queue_full,
+            rejected_timeout=self.rejected_timeout,
+        )
+
+
+class BulkheadRegistry:
+    """
+    Holds the bulkhead of each module and finds the one guarding a request path.
+
+    Only used from the event loop, so it needs no locking.
+    """
+
+    def __init__(self, defaults: Optional[BulkheadLimits] = None,
+                 overrides: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            defaults: Limits of modules that declare none
+            overrides: Limits by module name, taking precedence over the
+                limits a module declares
+        """
+        self.defaults = defaults or BulkheadLimits()
+        self.overrides = dict(overrides or {})
+        self.bulkheads: Dict[str, Bulkhead] = {}
+        self._prefixes: Dict[str, str] = {}
+
+    def limits_for(self, module_name: str, declared: Optional[BulkheadLimits] = None) -> BulkheadLimits:
+        """
+        Resolve the limits of a module.
+
+        Args:
+            module_name: Name of the module
+            declared: Limits the module declared on its router
+
+        Returns:
+            The declared limits (or the defaults) with the configured overrides applied.
+        """
+        limits = declared or self.defaults
+        override = self.overrides.get(module_name)
+        return limits.merge(override) if override else limits
+
+    def configure(self, module_name: str, prefix: str, declared: Optional[BulkheadLimits] = None) -> None:
+        """
+        Set up or update the bulkhead of a module.
+
+        A module reloaded with the same limits keeps its bulkhead, so the
+        requests it is handling still count against the limit.
+
+        Args:
+            module_name: Name of the module
+            prefix: Prefix of the module's router
+            declared: Limits the module declared on its router
+        """
+        for other_prefix, other_module in list(self._prefixes.items()):
+            if other_module == module_name:
+                del self._prefixes[other_prefix]
+
+        limits = self.limits_for(module_name, declared)
+        if not prefix or limits.max_concurrent <= 0:
+            self.bulkheads.pop(module_name, None)
+            return
+
+        self._prefixes[prefix.rstrip("/")] = module_name
+        bulkhead = self.bulkheads.get(module_name)
+        if bulkhead is None or bulkhead.limits != limits:
+            self.bulkheads[module_name] = Bulkhead(limits)
+
+    def remove_module(self, module_name: str) -> None:
+        """
+        Forget the bulkhead of a removed module.
+
+        Args:
+            module_name: Name of the module
+        """
+        self._prefixes = {prefix: name for prefix, name in self._prefixes.items() if name != module_name}
+        self.bulkheads.pop(module_name, None)
+
+    def for_path(self, path: str) -> Optional[Bulkhead]:
+        """
+        Find the bulkhead of the module whose prefix matches a request path.
+
+        Args:
+            path: The request path
+
+        Returns:
+            The bulkhead, or None if the path is not limited.
+        """
+        if self._prefixes:
+            # Try the path and each of its parents, longest first
+            while path:
+                module_name = self._prefixes.get(path)
+                if module_name is not None:
+                    return self.bulkheads.get(module_name)
+                path = path[:path.rfind("/")]
+        return None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Describe the bulkhead of each module.
+
+        Returns:
+            Mapping of module name to the stats of its bulkhead.
+        """
+        return {module_name: bulkhead.stats() for module_name, bulkhead in self.bulkheads.items()}
+
+    def render_prometheus(self) -> str:
+        """
+        Render the queue depth and rejection counters in the Prometheus text format.
+
+        Returns:
+            The text to append to /metrics.
+        """
+        bulkheads = sorted(self.bulkheads.items())
+        lines = [
+            "# HELP cardinal_bulkhead_queued Requests waiting for a slot, by module.",
+            "# TYPE cardinal_bulkhead_queued gauge",
+        ]
+        lines.extend(f'cardinal_bulkhead_queued{{module="{name}"}} {bulkhead.queued}'
+                     for name, bulkhead in bulkheads)
+        lines.append("# HELP cardinal_bulkhead_rejected_total Requests rejected by the bulkhead, by module and reason.")
+        lines.append("# TYPE cardinal_bulkhead_rejected_total counter")
+        for name, bulkhead in bulkheads:
+            lines.append(f'cardinal_bulkhead_rejected_total{{module="{name}",reason="queue_full"}} '
+                         f'{bulkhead.rejected_queue_full}')
+            lines.append(f'cardinal_bulkhead_rejected_total{{module="{name}",reason="timeout"}} '
+                         f'{bulkhead.rejected_timeout}')
+        return "\n".join(lines) + "\n"
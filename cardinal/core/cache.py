@@ -0,0 +1,360 @@
+"""
+HTTP response cache shared by Cardinal modules.
+
+Modules opt in per route by decorating the endpoint, below the route
+decorator:
+
+    @router.get("/stats")
+    @cache_response(ttl=30, vary_headers=["accept-language"])
+    async def get_stats(): ...
+
+ResponseCacheMiddleware then serves repeated GET requests for that route
+from memory until the TTL expires, with an ETag so clients can revalidate
+with If-None-Match. Entries are grouped per request path and evicted least
+recently used first once the cache is over its memory budget. The module
+loader drops a module's entries whenever it reloads or removes the module.
+
+A cache hit is answered before the request reaches the router, so the
+endpoint's dependencies do not run: authentication, rate limiting or any
+other per-request check is skipped for the lifetime of the entry. Only mark
+routes whose responses are the same for every client allowed to make the
+request, or vary the cache on the headers that identify the client.
+"""
+
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
+from urllib.parse import parse_qsl
+
+from starlette.types import Scope
+
+from .module_names import module_of
+
+logger = logging.getLogger(__name__)
+
+# Attribute set on endpoints by cache_response
+CACHE_POLICY_ATTR = "__cardinal_cache__"
+
+# Rough memory cost of an entry besides its body and headers
+ENTRY_OVERHEAD = 512
+
+CacheKey = Tuple[Tuple[Tuple[str, str], ...], Tuple[bytes, ...]]
+
+
+class CachePolicy:
+    """
+    How the responses of one route are cached.
+
+    Attributes:
+        ttl: How long, in seconds, a response is served from the cache
+        vary_query: True to cache per query string, False to ignore it, or
+            the names of the query parameters that select a response
+        vary_headers: Names of the request headers that select a response
+    """
+
+    def __init__(self, ttl: float, vary_query: Union[bool, Iterable[str]] = True,
+                 vary_headers: Iterable[str] = ()):
+        self.ttl = ttl
+        self.vary_query: Union[bool, FrozenSet[str]] = (
+            vary_query if isinstance(vary_query, bool) else frozenset(vary_query)
+        )
+        self.vary_headers = tuple(name.lower().encode("latin-1") for name in vary_headers)
+
+    def cache_key(self, scope: Scope) -> CacheKey:
+        """
+        Build the key that selects a cached response of the route.
+
+        Args:
+            scope: The ASGI scope of the request
+
+        Returns:
+            The normalized query parameters and header values the route varies on.
+        """
+        query: Tuple[Tuple[str, str], ...] = ()
+        if self.vary_query:
+            params = parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+            if self.vary_query is not True:
+                params = [param for param in params if param[0] in self.vary_query]
+            query = tuple(sorted(params))
+
+        headers: Tuple[bytes, ...] = ()
+        if self.vary_headers:
+            values: Dict[bytes, List[bytes]] = {}
+            for name, value in scope.get("headers", ()):
+                if name in self.vary_headers:
+                    values.setdefault(name, []).append(value)
+            headers = tuple(b",".join(values.get(name, ())) for name in self.vary_headers)
+
+        return query, headers
+
+
+def cache_response(ttl: float, vary_query: Union[bool, Iterable[str]] = True,
+                   vary_headers: Iterable[str] = ()) -> Callable[[Callable], Callable]:
+    """
+    Mark an endpoint's GET responses as cacheable.
+
+    Apply it below the route decorator, so the router registers the marked
+    function. Cached responses are served without calling the endpoint or
+    its dependencies, including authentication ones, so only mark routes
+    whose response does not depend on who asks, or list the identifying
+    headers (e.g. "authorization") in vary_headers.
+
+    Args:
+        ttl: How long, in seconds, a response is served from the cache
+        vary_query: True to cache per query string, False to ignore it, or
+            the names of the query parameters that select a response
+        vary_headers: Names of the request headers that select a response
+
+    Returns:
+        A decorator returning the endpoint unchanged, with its cache policy attached.
+    """
+    policy = CachePolicy(ttl, vary_query=vary_query, vary_headers=vary_headers)
+
+    def decorator(endpoint: Callable) -> Callable:
+        setattr(endpoint, CACHE_POLICY_ATTR, policy)
+        return endpoint
+    return decorator
+
+
+def get_cache_policy(endpoint: Any) -> Optional[CachePolicy]:
+    """Return the cache policy of an endpoint, if it has one."""
+    return getattr(endpoint, CACHE_POLICY_ATTR, None)
+
+
+class CachedResponse:
+    """
+    A complete response kept in the cache.
+    """
+
+    __slots__ = ("status", "headers", "body", "etag", "expires_at", "size", "route", "endpoint")
+
+    def __init__(self, status: int, headers: List[Tuple[bytes, bytes]], body: bytes,
+                 etag: bytes, expires_at: float, route: Any = None, endpoint: Any = None):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = etag
+        self.expires_at = expires_at
+        self.size = len(body) + sum(len(name) + len(value) for name, value in headers) + ENTRY_OVERHEAD
+        # The route that produced the response, for middleware that reports on it
+        self.route = route
+        self.endpoint = endpoint
+
+
+class _PathBucket:
+    """
+    The cached responses of one request path.
+    """
+
+    __slots__ = ("policy", "module", "keys")
+
+    def __init__(self, policy: CachePolicy, module: Optional[str]):
+        self.policy = policy
+        self.module = module
+        self.keys: Set[CacheKey] = set()
+
+
+def make_etag(body: bytes) -> bytes:
+    """Build a strong ETag from a response body."""
+    return b'"' + hashlib.sha1(body).hexdigest().encode("ascii") + b'"'
+
+
+def etag_matches(if_none_match: bytes, etag: bytes) -> bool:
+    """
+    Check an If-None-Match request header against an ETag.
+
+    Args:
+        if_none_match: Value of the header
+        etag: ETag of the current response
+
+    Returns:
+        True if the client already has this version of the response.
+    """
+    tags = {tag.strip() for tag in if_none_match.split(b",")}
+    return etag in tags or b"W/" + etag in tags or b"*" in tags
+
+
+class ResponseCache:
+    """
+    Memory-bounded LRU cache of complete responses, grouped by request path.
+
+    Used from the event loop only, so it needs no locking.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_entry_bytes: int = 1024 * 1024,
+                 modules_package: str = "modules"):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Memory budget of the whole cache
+            max_entry_bytes: Largest response body that is cached
+            modules_package: Import name of the modules package, used to find
+                the module an endpoint belongs to
+        """
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.modules_package = modules_package
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # (path, key) -> response, least recently used first
+        self._entries: "OrderedDict[Tuple[str, CacheKey], CachedResponse]" = OrderedDict()
+        self._buckets: Dict[str, _PathBucket] = {}
+
+    def module_of(self, endpoint: Any) -> Optional[str]:
+        """
+        Find the Cardinal module an endpoint is defined in.
+
+        Args:
+            endpoint: The endpoint function
+
+        Returns:
+            The module name, or None for core endpoints.
+        """
+        return module_of(endpoint, self.modules_package)
+
+    def policy_for(self, path: str) -> Optional[CachePolicy]:
+        """
+        Return the cache policy of a path that has cached responses.
+
+        Args:
+            path: The request path
+
+        Returns:
+            The policy, or None if nothing is cached for the path.
+        """
+        bucket = self._buckets.get(path)
+        return bucket.policy if bucket is not None else None
+
+    def get(self, path: str, key: CacheKey) -> Optional[CachedResponse]:
+        """
+        Look up a response that has not expired.
+
+        Args:
+            path: The request path
+            key: The cache key of the request
+
+        Returns:
+            The cached response, or None on a miss.
+        """
+        entry = self._entries.get((path, key))
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._discard(path, key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end((path, key))
+        self.hits += 1
+        return entry
+
+    def put(self, path: str, key: CacheKey, policy: CachePolicy, module: Optional[str],
+            entry: CachedResponse) -> None:
+        """
+        Store a response, evicting the least recently used ones if needed.
+
+        Args:
+            path: The request path
+            key: The cache key of the request
+            policy: Cache policy of the route
+            module: Module that owns the route
+            entry: The response to store
+        """
+        if entry.size > self.max_bytes:
+            return
+
+        self._discard(path, key)
+        bucket = self._buckets.get(path)
+        if bucket is None or bucket.policy is not policy:
+            # First response for the path, or the route changed since
+            self._discard_bucket(path)
+            bucket = self._buckets[path] = _PathBucket(policy, module)
+
+        bucket.keys.add(key)
+        self._entries[(path, key)] = entry
+        self.size += entry.size
+
+        while self.size > self.max_bytes:
+            (old_path, old_key), _ = next(iter(self._entries.items()))
+            self._discard(old_path, old_key)
+            self.evictions += 1
+
+    def _discard(self, path: str, key: CacheKey) -> None:
+        entry = self._entries.pop((path, key), None)
+        if entry is None:
+            return
+        self.size -= entry.size
+        bucket = self._buckets.get(path)
+        if bucket is not None:
+            bucket.keys.discard(key)
+            if not bucket.keys:
+                del self._buckets[path]
+
+    def _discard_bucket(self, path: str) -> int:
+        bucket = self._buckets.pop(path, None)
+        if bucket is None:
+            return 0
+        for key in bucket.keys:
+            entry = self._entries.pop((path, key), None)
+            if entry is not None:
+                self.size -= entry.size
+        return len(bucket.keys)
+
+    def invalidate_module(self, module_name: str) -> int:
+        """
+        Drop every cached response of a module's routes.
+
+        Args:
+            module_name: Name of the module
+
+        Returns:
+            The number of responses dropped.
+        """
+        paths = [path for path, bucket in self._buckets.items() if bucket.module == module_name]
+        dropped = sum(self._discard_bucket(path) for path in paths)
+        if dropped:
+            logger.info(f"Dropped {dropped} cached responses of module {module_name}")
+        return dropped
+
+    def invalidate_path(self, prefix: str) -> int:
+        """
+        Drop every cached response for the paths starting with a prefix.
+
+        Args:
+            prefix: Path prefix, e.g. "/items"
+
+        Returns:
+            The number of responses dropped.
+        """
+        paths = [path for path in self._buckets if path.startswith(prefix)]
+        return sum(self._discard_bucket(path) for path in paths)
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        self._entries.clear()
+        self._buckets.clear()
+        self.size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Describe the cache usage.
+
+        Returns:
+            Entry count, memory use and hit/miss/eviction counters.
+        """
+        return {
+            "entries": len(self._entries),
+            "paths": len(self._buckets),
+            "size_bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -4,7 +4,7 @@ Configuration management for Cardinal core.
 
 import os
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Any, Dict, Optional
 from pathlib import Path
 
 class CoreConfig(BaseSettings):
@@ -16,25 +16,121 @@ class CoreConfig(BaseSettings):
         description: Description of the application
         version: Version of the application
         modules_path: Path to the modules directory
+        module_loading: How modules are loaded at startup: "eager" imports all of them,
+            "lazy" imports each one on the first request to its prefix, "warmup" is
+            lazy plus a background import of all modules after startup
+        module_manifest_file: Optional path where the lazy-loading manifest is written
+        module_load_workers: Number of threads used to import modules concurrently at startup
         auto_reload: Whether to automatically reload modules on changes
+        watcher_backend: File watcher used for auto reload ("auto", "inotify" or "polling")
+        watcher_debounce: Quiet period in seconds before a burst of file changes is applied
+        watcher_poll_interval: Scan interval in seconds when the polling watcher is used
+        reload_coordination: How hot reloads are coordinated between worker processes:
+            "none" lets every worker watch on its own, "file" elects one watcher and
+            publishes module generations through a shared state directory
+        reload_state_dir: Directory shared by the workers for coordination state
+            (defaults to a directory in the system temp dir)
+        reload_sync_interval: How often, in seconds, workers check for a new generation
         docs_url: URL for the Swagger UI documentation
         redoc_url: URL for the ReDoc documentation
         openapi_url: URL for the OpenAPI schema
+        openapi_gzip: Whether to serve a pre-compressed copy of the OpenAPI schema
+        response_cache_max_bytes: Memory budget of the response cache for routes marked
+            with cache_response (0 disables the cache)
+        response_cache_max_entry_bytes: Largest response body kept in the response cache
+        bulkhead_max_concurrent: Requests each module handles at once (0 for no limit,
+            unless the module sets its own with set_bulkhead)
+        bulkhead_max_queue: Requests waiting for a module slot before new ones are
+            rejected with 429
+        bulkhead_queue_timeout: Seconds a request waits for a module slot before it is
+            rejected with 503
+        bulkhead_modules: Limits by module name, e.g. {"reports": {"max_concurrent": 4}},
+            taking precedence over the defaults and the module's own limits
+        executor_threads: Worker threads of each module's own thread pool, used by
+            offload and run_sync
+        executor_processes: Worker processes of each module's own process pool
+            (defaults to the number of CPUs)
+        executor_modules: Pool sizes by module name, e.g. {"reports": {"processes": 2}},
+            taking precedence over the defaults and the module's own sizes
+        executor_start_method: multiprocessing start method of the worker processes
+            ("fork", "spawn" or "forkserver"; defaults to the platform default)
+        http_client_max_connections: Maximum open connections of the shared HTTP client
+        http_client_max_keepalive: Maximum idle connections the shared HTTP client keeps open
+        http_client_keepalive_expiry: Seconds an idle connection of the shared HTTP client
+            is kept open
+        http_client_timeout: Default timeout of the shared HTTP client, in seconds
+        http_client_http2: Whether the shared HTTP client negotiates HTTP/2 (needs httpx[http2])
+        http_client_retries: Retries of failed connection attempts of the shared HTTP client
+        resources_url: URL of the shared resources stats endpoint
+        metrics_enabled: Whether to record per-route request metrics
+        metrics_url: URL of the Prometheus metrics endpoint
+        error_window: Seconds over which repeats of an unhandled error are counted
+            before one summary line is logged (the first occurrence is logged in full)
+        error_max_fingerprints: Number of distinct errors tracked
+        error_body_echo_bytes: Largest request body echoed in validation error responses
+        errors_url: URL of the error summary endpoint
         log_level: Log level for the application
         log_format: Format string for logs
         log_file: Path to the log file
+        log_json: Whether to write logs as one JSON object per line
+        log_max_bytes: Size at which the log file is rotated (0 to never rotate)
+        log_backup_count: Number of rotated log files kept
+        log_queue_size: Maximum number of log records waiting to be written; records
+            logged while the queue is full are dropped
+        log_rate_limits: Maximum log records per second, by logger name (covers child
+            loggers too, "" for all loggers)
+        log_sample_rates: Fraction of records below WARNING kept, by logger name
     """
     app_name: str = "Cardinal API"
     description: str = "A modular, extensible API framework"
     version: str = "0.1.0"
     modules_path: str = "modules"
+    module_loading: str = "eager"
+    module_manifest_file: Optional[str] = None
+    module_load_workers: int = 4
     auto_reload: bool = True
+    watcher_backend: str = "auto"
+    watcher_debounce: float = 0.5
+    watcher_poll_interval: float = 2.0
+    reload_coordination: str = "none"
+    reload_state_dir: Optional[str] = None
+    reload_sync_interval: float = 0.5
     docs_url: str = "/docs"
     redoc_url: str = "/redoc"
     openapi_url: str = "/openapi.json"
+    openapi_gzip: bool = True
+    response_cache_max_bytes: int = 64 * 1024 * 1024
+    response_cache_max_entry_bytes: int = 1024 * 1024
+    bulkhead_max_concurrent: int = 0
+    bulkhead_max_queue: int = 100
+    bulkhead_queue_timeout: float = 5.0
+    bulkhead_modules: Dict[str, Dict[str, Any]] = {}
+    executor_threads: int = 4
+    executor_processes: Optional[int] = None
+    executor_modules: Dict[str, Dict[str, int]] = {}
+    executor_start_method: Optional[str] = None
+    http_client_max_connections: int = 100
+    http_client_max_keepalive: int = 20
+    http_client_keepalive_expiry: float = 5.0
+    http_client_timeout: float = 10.0
+    http_client_http2: bool = False
+    http_client_retries: int = 0
+    resources_url: str = "/resources"
+    metrics_enabled: bool = True
+    metrics_url: str = "/metrics"
+    error_window: float = 60.0
+    error_max_fingerprints: int = 1000
+    error_body_echo_bytes: int = 1024
+    errors_url: str = "/errors"
     log_level: str = "INFO"
     log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     log_file: Optional[str] = "logs/cardinal.log"
+    log_json: bool = False
+    log_max_bytes: int = 10 * 1024 * 1024
+    log_backup_count: int = 5
+    log_queue_size: int = 10000
+    log_rate_limits: Dict[str, float] = {}
+    log_sample_rates: Dict[str, float] = {}
 
     class Config:
         """Configuration for the settings class"""
@@ -0,0 +1,349 @@
+"""
+Hot-reload coordination between several worker processes.
+
+When Cardinal runs with several uvicorn/gunicorn workers, only one of them
+(the leader, elected with an exclusive lock on a file) watches the modules
+directory. Each batch of changes it detects is published as a new
+*generation* in a small JSON state file. Every worker, the leader included,
+polls that file and applies the changes it has not seen yet, so all workers
+converge on the same module versions. Each worker also records the
+generation it is serving, which /modules reports.
+
+Along with each generation, the leader stores the stat index of the modules
+directory it was published from. A worker taking over as leader starts its
+watcher from that index, so changes made while no worker was leading are
+published as well.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .watcher import FileStat, ModuleChanges, StatIndex
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def default_state_dir(modules_path: Path) -> str:
+    """
+    Return the default state directory shared by the workers of one app.
+
+    Args:
+        modules_path: Path to the modules directory
+
+    Returns:
+        A directory in the system temp dir, unique per modules directory.
+    """
+    digest = hashlib.sha1(str(modules_path.resolve()).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"cardinal-reload-{digest}")
+
+
+def _write_json_atomic(path: Path, data: Dict[str, Any]) -> None:
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _files_from_json(data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Dict[str, FileStat]]]:
+    # JSON turns the (mtime, size) tuples into lists
+    if data is None:
+        return None
+    return {name: {path: tuple(stat) for path, stat in files.items()} for name, files in data.items()}
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ReloadCoordinator:
+    """
+    Keeps the modules of several worker processes at the same generation.
+    """
+
+    def __init__(self, module_loader, state_dir: str, sync_interval: float = 0.5,
+                 history_size: int = 100):
+        """
+        Initialize the coordinator, before the worker loads its modules.
+
+        Args:
+            module_loader: The ModuleLoader of this worker
+            state_dir: Directory shared by all workers for the state files
+            sync_interval: How often, in seconds, workers check for a new generation
+            history_size: Number of generations kept in the state file. A worker
+                that falls further behind reloads all modules.
+        """
+        if fcntl is None:
+            raise RuntimeError("Reload coordination requires fcntl (POSIX systems only)")
+
+        self.module_loader = module_loader
+        self.state_dir = Path(state_dir)
+        self.state_file = self.state_dir / "generation.json"
+        self.lock_file = self.state_dir / "leader.lock"
+        self.workers_dir = self.state_dir / "workers"
+        self.sync_interval = sync_interval
+        self.history_size = history_size
+
+        self.worker_id = os.getpid()
+        # The worker loads its modules after this, so it serves at least the
+        # generation published now; later ones are applied by the first sync
+        state = self._read_state()
+        self.generation = state["generation"] if state is not None else 0
+        self.is_leader = False
+        self._lock_fd: Optional[int] = None
+        self._state_stamp = None
+        self._watcher = None
+
+    async def run(self) -> None:
+        """
+        Follow published generations, and lead when no other worker does.
+        """
+        await asyncio.to_thread(self._prepare)
+        logger.info(f"Worker {self.worker_id} joined reload coordination at generation {self.generation}")
+
+        try:
+            while self.module_loader.running:
+                if not self.is_leader and self._try_lead():
+                    await asyncio.to_thread(self._start_leader_watcher)
+                try:
+                    await self.sync()
+                except Exception as e:
+                    logger.error(f"Error syncing module generation: {str(e)}")
+                await asyncio.sleep(self.sync_interval)
+        finally:
+            self.close()
+
+    def _prepare(self) -> None:
+        self.workers_dir.mkdir(parents=True, exist_ok=True)
+        self._write_worker_status()
+
+    def _try_lead(self) -> bool:
+        """
+        Try to become the leader.
+
+        Returns:
+            True if this worker acquired the leader lock.
+        """
+        fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+
+        self._lock_fd = fd
+        self.is_leader = True
+        logger.info(f"Worker {self.worker_id} is now the module watcher leader")
+        return True
+
+    def _start_leader_watcher(self) -> None:
+        # Start from the files of the last published generation rather than from
+        # the directory as it is now, so that changes made while no worker was
+        # leading are published by the first scan
+        state = self._read_state()
+        baseline = _files_from_json(state.get("files")) if state else None
+        if baseline is None:
+            # Nothing published yet to compare against: record the modules as they are now
+            index = StatIndex(self.module_loader.modules_path)
+            index.build()
+            baseline = index.files
+            state = state or {"generation": 0, "history": []}
+            self._write_state(state["generation"], state.get("history", []), baseline)
+
+        watcher = self.module_loader.create_watcher(self.publish, baseline=baseline)
+        self._watcher = watcher
+        self.module_loader.watcher = watcher
+        watcher.start()
+        self._write_worker_status()
+
+    def publish(self, changes: ModuleChanges) -> None:
+        """
+        Publish a batch of changes as a new generation.
+
+        Called from the leader's watcher thread.
+
+        Args:
+            changes: The changes detected by the watcher
+        """
+        state = self._read_state() or {"generation": 0, "history": []}
+        generation = state["generation"] + 1
+
+        history: List[Dict[str, Any]] = state.get("history", [])[-(self.history_size - 1):]
+        history.append({
+            "generation": generation,
+            "changed": {name: sorted(files) for name, files in changes.changed.items()},
+            "removed": sorted(changes.removed),
+        })
+
+        self._write_state(generation, history, self._watcher.index.files)
+        logger.info(f"Published module generation {generation}")
+
+    def _write_state(self, generation: int, history: List[Dict[str, Any]],
+                     files: Dict[str, Dict[str, FileStat]]) -> None:
+        _write_json_atomic(self.state_file, {
+            "generation": generation,
+            "leader": self.worker_id,
+            "published_at": time.time(),
+            "history": history,
+            "files": files,
+        })
+
+    async def sync(self) -> None:
+        """
+        Apply the changes of any generation newer than the one this worker serves.
+
+        Raises:
+            RuntimeError: If a module could not be reloaded; the generation is
+                not advanced, so the next sync tries again
+        """
+        stamp, state = await asyncio.to_thread(self._read_state_if_changed)
+        if state is None:
+            return
+
+        if state["generation"] > self.generation:
+            target = state["generation"]
+            logger.info(f"Worker {self.worker_id} reloading from generation {self.generation} to {target}")
+            if not await self.module_loader._apply_changes(self._changes_since(state)):
+                raise RuntimeError(f"Could not apply module generation {target}")
+            self.generation = target
+            await asyncio.to_thread(self._write_worker_status)
+
+        # Only skip this state file from now on once it has been applied, so a
+        # failed reload is retried on the next sync
+        self._state_stamp = stamp
+
+    def _changes_since(self, state: Dict[str, Any]) -> ModuleChanges:
+        """
+        Merge the published changes newer than this worker's generation.
+
+        Args:
+            state: The published state
+
+        Returns:
+            The changes to apply.
+        """
+        changes = ModuleChanges()
+        entries = [e for e in state.get("history", []) if e["generation"] > self.generation]
+
+        if len(entries) < state["generation"] - self.generation:
+            # Too far behind: the history no longer covers every missed generation
+            logger.warning(f"Worker {self.worker_id} missed module generations, reloading all modules")
+            on_disk = set(self.module_loader.discover_modules())
+            known = set(self.module_loader.loaded_modules) | set(self.module_loader.pending_modules)
+            changes.changed = {name: set() for name in on_disk}
+            changes.removed = known - on_disk
+            return changes
+
+        for entry in sorted(entries, key=lambda e: e["generation"]):
+            batch = ModuleChanges()
+            batch.changed = {name: set(files) for name, files in entry["changed"].items()}
+            batch.removed = set(entry["removed"])
+            changes.merge(batch)
+        return changes
+
+    def _read_state(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.state_file, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable reload state file: {str(e)}")
+            return None
+
+    def _read_state_if_changed(self) -> Tuple[Optional[tuple], Optional[Dict[str, Any]]]:
+        # A single stat per interval while nothing changes
+        try:
+            st = os.stat(self.state_file)
+        except FileNotFoundError:
+            return None, None
+
+        stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if stamp == self._state_stamp:
+            return stamp, None
+        return stamp, self._read_state()
+
+    def _write_worker_status(self) -> None:
+        _write_json_atomic(self.workers_dir / f"{self.worker_id}.json", {
+            "pid": self.worker_id,
+            "generation": self.generation,
+            "leader": self.is_leader,
+            "updated_at": time.time(),
+        })
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Describe the coordination state of all workers.
+
+        Returns:
+            This worker's generation, the published generation and the
+            generation served by each live worker.
+        """
+        state = self._read_state() or {}
+        workers = []
+
+        try:
+            worker_files = list(self.workers_dir.iterdir())
+        except FileNotFoundError:
+            worker_files = []
+
+        for worker_file in worker_files:
+            if worker_file.suffix != ".json":
+                continue
+            try:
+                with open(worker_file, encoding="utf-8") as f:
+                    worker = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            if not _pid_alive(worker["pid"]):
+                # Left over by a worker that did not shut down cleanly
+                try:
+                    worker_file.unlink()
+                except OSError:
+                    pass
+                continue
+            workers.append(worker)
+
+        return {
+            "mode": "file",
+            "worker": self.worker_id,
+            "leader": self.is_leader,
+            "generation": self.generation,
+            "published_generation": state.get("generation", 0),
+            "workers": sorted(workers, key=lambda w: w["pid"]),
+        }
+
+    def close(self) -> None:
+        """
+        Stop leading, if this worker was the leader, and unregister the worker.
+        """
+        if self.is_leader:
+            if self.module_loader.watcher:
+                self.module_loader.watcher.stop()
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            os.close(self._lock_fd)
+            self._lock_fd = None
+            self.is_leader = False
+
+        try:
+            (self.workers_dir / f"{self.worker_id}.json").unlink()
+        except OSError:
+            pass
@@ -0,0 +1,443 @@
+"""
+Per-module thread and process pools for Cardinal.
+
+Blocking or CPU-bound code must not run on the event loop, and running it
+in the shared threadpool lets one busy module starve the others. Modules
+can instead run it in pools of their own:
+
+    @offload("process")
+    def render_report(data: dict) -> bytes:
+        ...
+
+    @router.get("/report")
+    async def get_report():
+        return Response(await render_report(load_data()))
+
+A decorated function becomes a coroutine function that runs the original
+in the module's thread pool or process pool. Decorated endpoints work too,
+since FastAPI awaits them. run_sync runs any callable the same way without
+decorating it.
+
+Pool sizes come from CoreConfig (defaults and per-module overrides), or
+from the module itself with set_execution_policy(router, threads=..,
+processes=..). Pools are created on first use. A reloaded module keeps its
+thread pool unless its sizes changed, and gets a new process pool, since
+the worker processes run the code they imported. The pools of a removed
+module, and those replaced on reload, are shut down letting submitted
+calls finish.
+
+Functions run in a process pool must be module-level functions, and their
+arguments and results must be picklable. The worker looks the function up
+by module and name, so the worker processes need the modules package on
+their import path, as the application itself does.
+"""
+
+import asyncio
+import contextvars
+import functools
+import importlib
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from .module_names import CORE_MODULE, module_of
+
+logger = logging.getLogger(__name__)
+
+# Kinds of pools
+THREAD = "thread"
+PROCESS = "process"
+
+# Attribute set on routers by set_execution_policy
+EXECUTION_POLICY_ATTR = "__cardinal_execution_policy__"
+
+# Attribute set on the coroutine functions returned by offload
+OFFLOADED_ATTR = "__cardinal_offloaded__"
+
+
+class ExecutionPolicy:
+    """
+    Pool sizes of one module.
+
+    Attributes:
+        threads: Worker threads of the module's thread pool
+        processes: Worker processes of the module's process pool
+    """
+
+    __slots__ = ("threads", "processes")
+
+    def __init__(self, threads: int = 4, processes: int = 0):
+        self.threads = threads
+        self.processes = processes
+
+    def merge(self, changes: Dict[str, Any]) -> "ExecutionPolicy":
+        """Return a copy with some of the sizes changed."""
+        sizes = self.to_dict()
+        sizes.update({key: value for key, value in changes.items() if key in sizes and value is not None})
+        return ExecutionPolicy(**sizes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"threads": self.threads, "processes": self.processes}
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, ExecutionPolicy) and self.to_dict() == other.to_dict()
+
+
+def set_execution_policy(router: Any, threads: Optional[int] = None, processes: Optional[int] = None) -> None:
+    """
+    Declare the pool sizes of a module on its router.
+
+    Sizes left to None use the CoreConfig defaults, and per-module
+    overrides in CoreConfig.executor_modules take precedence.
+
+    Args:
+        router: The module's APIRouter
+        threads: Worker threads of the module's thread pool
+        processes: Worker processes of the module's process pool
+    """
+    setattr(router, EXECUTION_POLICY_ATTR, {"threads": threads, "processes": processes})
+
+
+def get_execution_policy(router: Any) -> Optional[Dict[str, Optional[int]]]:
+    """Return the pool sizes declared on a router with set_execution_policy, if any."""
+    return getattr(router, EXECUTION_POLICY_ATTR, None)
+
+
+def _call_in_process(module_path: str, qualname: str, args: tuple, kwargs: Dict[str, Any]) -> Any:
+    """
+    Run a function in a worker process, looking it up by module and name.
+
+    The function itself is not pickled: when it was decorated with offload,
+    its name refers to the coroutine function wrapping it.
+    """
+    target: Any = importlib.import_module(module_path)
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    if getattr(target, OFFLOADED_ATTR, False):
+        target = target.__wrapped__
+    return target(*args, **kwargs)
+
+
+class ModuleExecutors:
+    """
+    The thread pool and process pool of one module, created on first use.
+    """
+
+    def __init__(self, module_name: str, policy: ExecutionPolicy, mp_context: Any = None):
+        self.module_name = module_name
+        self.policy = policy
+        self.mp_context = mp_context
+        self.thread_pool: Optional[ThreadPoolExecutor] = None
+        self.process_pool: Optional[ProcessPoolExecutor] = None
+        self.submitted = {THREAD: 0, PROCESS: 0}
+        self.active = {THREAD: 0, PROCESS: 0}
+        self._lock = threading.Lock()
+
+    def get(self, kind: str) -> Executor:
+        """
+        Return a pool of the module, creating it if needed.
+
+        Args:
+            kind: THREAD or PROCESS
+
+        Returns:
+            The pool.
+        """
+        with self._lock:
+            if kind == THREAD:
+                if self.thread_pool is None:
+                    self.thread_pool = ThreadPoolExecutor(
+                        max_workers=max(1, self.policy.threads),
+                        thread_name_prefix=f"cardinal-{self.module_name}",
+                    )
+                return self.thread_pool
+            if kind == PROCESS:
+                if self.policy.processes <= 0:
+                    raise RuntimeError(f"Module {self.module_name} has no process pool")
+                if self.process_pool is None:
+                    self.process_pool = ProcessPoolExecutor(
+                        max_workers=self.policy.processes, mp_context=self.mp_context
+                    )
+                return self.process_pool
+        raise ValueError(f"Unknown pool kind: {kind}")
+
+    def retire_process_pool(self) -> None:
+        """
+        Start a new process pool on the next call; calls already submitted
+        to the current one still run to completion.
+
+        Its worker processes keep the modules they imported, so after a
+        reload they would keep running the previous version of the code.
+        """
+        with self._lock:
+            pool, self.process_pool = self.process_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def discard_process_pool(self, pool: Executor) -> None:
+        """Forget a broken process pool, so that the next call starts a new one."""
+        with self._lock:
+            if self.process_pool is pool:
+                self.process_pool = None
+        pool.shutdown(wait=False)
+
+    def shutdown(self, wait: bool = False) -> None:
+        """
+        Shut the pools down. Calls already submitted still run to completion.
+
+        Args:
+            wait: Whether to block until they have
+        """
+        with self._lock:
+            pools = [pool for pool in (self.thread_pool, self.process_pool) if pool is not None]
+            self.thread_pool = self.process_pool = None
+        for pool in pools:
+            pool.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(
+            self.policy.to_dict(),
+            thread_pool_started=self.thread_pool is not None,
+            process_pool_started=self.process_pool is not None,
+            submitted=dict(self.submitted),
+            active=dict(self.active),
+        )
+
+
+class ExecutorRegistry:
+    """
+    Holds the pools of each module.
+    """
+
+    def __init__(self, defaults: Optional[ExecutionPolicy] = None,
+                 overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+                 modules_package: str = "modules", start_method: Optional[str] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            defaults: Pool sizes of modules that declare none
+            overrides: Pool sizes by module name, taking precedence over the
+                sizes a module declares
+            modules_package: Import name of the modules package, used to find
+                the module a function belongs to
+            start_method: multiprocessing start method of the worker
+                processes (None for the platform default)
+        """
+        self.defaults = defaults or ExecutionPolicy(processes=os.cpu_count() or 1)
+        self.overrides = dict(overrides or {})
+        self.modules_package = modules_package
+        self.mp_context = multiprocessing.get_context(start_method) if start_method else None
+        self.modules: Dict[str, ModuleExecutors] = {}
+        self._declared: Dict[str, Dict[str, Optional[int]]] = {}
+        self._lock = threading.Lock()
+
+    def module_of(self, func: Callable) -> str:
+        """
+        Find the Cardinal module a function is defined in.
+
+        Args:
+            func: The function
+
+        Returns:
+            The module name, or CORE_MODULE for functions outside of the modules package.
+        """
+        return module_of(func, self.modules_package) or CORE_MODULE
+
+    def policy_for(self, module_name: str) -> ExecutionPolicy:
+        """
+        Resolve the pool sizes of a module.
+
+        Args:
+            module_name: Name of the module
+
+        Returns:
+            The defaults, with the sizes the module declared and the
+            configured overrides applied.
+        """
+        policy = self.defaults.merge(self._declared.get(module_name) or {})
+        override = self.overrides.get(module_name)
+        return policy.merge(override) if override else policy
+
+    def configure(self, module_name: str, declared: Optional[Dict[str, Optional[int]]] = None) -> None:
+        """
+        Set the pool sizes of a freshly (re)loaded module.
+
+        A reloaded module whose sizes did not change keeps its thread pool;
+        only its process pool is replaced, since the worker processes run
+        the code they imported. If the sizes changed, the pools of the
+        previous version are shut down. Calls already submitted to them
+        still complete either way.
+
+        Args:
+            module_name: Name of the module
+            declared: Pool sizes the module declared on its router
+        """
+        with self._lock:
+            if declared:
+                self._declared[module_name] = declared
+            else:
+                self._declared.pop(module_name, None)
+            previous = self.modules.get(module_name)
+            resized = previous is not None and previous.policy != self.policy_for(module_name)
+            if resized:
+                del self.modules[module_name]
+        if previous is None:
+            return
+        if resized:
+            previous.shutdown(wait=False)
+            logger.info(f"Shut down the pools of module {module_name}, their sizes changed")
+        else:
+            previous.retire_process_pool()
+
+    def remove_module(self, module_name: str) -> None:
+        """
+        Shut down the pools of a removed module.
+
+        Args:
+            module_name: Name of the module
+        """
+        with self._lock:
+            self._declared.pop(module_name, None)
+            previous = self.modules.pop(module_name, None)
+        if previous is not None:
+            previous.shutdown(wait=False)
+            logger.info(f"Shut down the pools of module {module_name}")
+
+    def executors(self, module_name: str) -> ModuleExecutors:
+        """Return the pools of a module, set up with its current policy."""
+        executors = self.modules.get(module_name)
+        if executors is None:
+            with self._lock:
+                executors = self.modules.get(module_name)
+                if executors is None:
+                    executors = self.modules[module_name] = ModuleExecutors(
+                        module_name, self.policy_for(module_name), self.mp_context
+                    )
+        return executors
+
+    async def run(self, module_name: str, kind: str, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a function in one of a module's pools.
+
+        Args:
+            module_name: Name of the module whose pool is used
+            kind: THREAD or PROCESS
+            func: The function to run; a module-level function for PROCESS
+            *args: Positional arguments of the function
+            **kwargs: Keyword arguments of the function
+
+        Returns:
+            The result of the function.
+        """
+        executors = self.executors(module_name)
+        pool = executors.get(kind)
+        loop = asyncio.get_running_loop()
+
+        if kind == THREAD:
+            # Run with the caller's context variables, as run_in_threadpool does
+            context = contextvars.copy_context()
+            call = functools.partial(context.run, func, *args, **kwargs)
+        else:
+            call = functools.partial(_call_in_process, func.__module__, func.__qualname__, args, kwargs)
+
+        executors.submitted[kind] += 1
+        executors.active[kind] += 1
+        try:
+            return await loop.run_in_executor(pool, call)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start over on the next call
+            executors.discard_process_pool(pool)
+            raise
+        finally:
+            executors.active[kind] -= 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shut down the pools of every module.
+
+        Args:
+            wait: Whether to block until the submitted calls have completed
+        """
+        with self._lock:
+            modules = list(self.modules.values())
+            self.modules.clear()
+        for executors in modules:
+            executors.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Describe the pools of each module that has used them.
+
+        Returns:
+            Mapping of module name to its pool sizes and call counters.
+        """
+        return {module_name: executors.stats() for module_name, executors in list(self.modules.items())}
+
+
+# The registry used by offload and run_sync, set up by create_app
+_registry: Optional[ExecutorRegistry] = None
+
+
+def get_executor_registry() -> ExecutorRegistry:
+    """Return the registry of module pools, creating one with default sizes if needed."""
+    global _registry
+    if _registry is None:
+        _registry = ExecutorRegistry()
+    return _registry
+
+
+def set_executor_registry(registry: ExecutorRegistry) -> None:
+    """Set the registry used by offload and run_sync."""
+    global _registry
+    _registry = registry
+
+
+async def run_sync(func: Callable, *args: Any, kind: str = THREAD, module: Optional[str] = None,
+                   **kwargs: Any) -> Any:
+    """
+    Run a synchronous function in a module's pool.
+
+    Args:
+        func: The function to run; a module-level function for PROCESS
+        *args: Positional arguments of the function
+        kind: THREAD or PROCESS
+        module: Module whose pool is used (defaults to the module defining func)
+        **kwargs: Keyword arguments of the function
+
+    Returns:
+        The result of the function.
+    """
+    registry = get_executor_registry()
+    return await registry.run(module or registry.module_of(func), kind, func, *args, **kwargs)
+
+
+def offload(kind: str = THREAD) -> Callable[[Callable], Callable]:
+    """
+    Make a synchronous function run in its module's thread or process pool.
+
+    Args:
+        kind: THREAD or PROCESS
+
+    Returns:
+        A decorator turning the function into a coroutine function.
+    """
+    if kind not in (THREAD, PROCESS):
+        raise ValueError(f"Unknown pool kind: {kind}")
+
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            raise TypeError(f"{func.__qualname__} is already a coroutine function")
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            registry = get_executor_registry()
+            return await registry.run(registry.module_of(func), kind, func, *args, **kwargs)
+
+        setattr(wrapper, OFFLOADED_ATTR, True)
+        return wrapper
+    return decorator
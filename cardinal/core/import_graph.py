@@ -0,0 +1,191 @@
+"""
+Import graph of the files inside a Cardinal module.
+
+Used to reload only the files that changed and the files that import them,
+instead of re-importing the whole module package.
+"""
+
+import ast
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Set
+
+from .watcher import IGNORED_DIRS
+
+
+def source_files(module_dir: Path) -> List[str]:
+    """
+    List the .py files of a module.
+
+    Args:
+        module_dir: Path to the module directory
+
+    Returns:
+        Normalized paths of the module's source files.
+    """
+    files = []
+    for root, dirs, names in os.walk(module_dir):
+        dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
+        files.extend(os.path.normpath(os.path.join(root, name)) for name in names if name.endswith(".py"))
+    return files
+
+
+def hash_file(path: str) -> str:
+    """
+    Hash the contents of a file.
+
+    Args:
+        path: Path of the file
+
+    Returns:
+        The SHA-1 hex digest of the file contents.
+    """
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def hash_sources(module_dir: Path) -> Dict[str, str]:
+    """
+    Hash every source file of a module.
+
+    Args:
+        module_dir: Path to the module directory
+
+    Returns:
+        Mapping of file path to content hash.
+    """
+    hashes = {}
+    for path in source_files(module_dir):
+        try:
+            hashes[path] = hash_file(path)
+        except FileNotFoundError:
+            continue
+    return hashes
+
+
+def file_to_module(package: str, module_dir: Path, path: str) -> str:
+    """
+    Return the dotted import name of a file inside a module.
+
+    Args:
+        package: Import name of the module package (e.g. "modules.example_module")
+        module_dir: Path to the module directory
+        path: Path of the file
+
+    Returns:
+        The import name, e.g. "modules.example_module.services".
+    """
+    relative = Path(os.path.relpath(path, module_dir)).with_suffix("")
+    parts = list(relative.parts)
+    if parts[-1] == "__init__":
+        parts.pop()
+    return ".".join([package] + parts)
+
+
+def build_import_graph(package: str, module_dir: Path) -> Dict[str, Set[str]]:
+    """
+    Find which files of a module import which other files of the same module.
+
+    Args:
+        package: Import name of the module package
+        module_dir: Path to the module directory
+
+    Returns:
+        Mapping of import name to the import names of the module's own
+        files it imports.
+    """
+    files = {file_to_module(package, module_dir, path): path for path in source_files(module_dir)}
+    graph: Dict[str, Set[str]] = {}
+
+    for name, path in files.items():
+        is_package = os.path.basename(path) == "__init__.py"
+        try:
+            with open(path, "rb") as f:
+                tree = ast.parse(f.read(), filename=path)
+        except (OSError, SyntaxError, ValueError):
+            graph[name] = set()
+            continue
+
+        imported: Set[str] = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imported.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                if node.level:
+                    # Resolve the relative import against this file's package
+                    base_parts = name.split(".")
+                    if not is_package:
+                        base_parts = base_parts[:-1]
+                    if node.level > 1:
+                        base_parts = base_parts[:-(node.level - 1)]
+                    base = ".".join(base_parts)
+                    target = f"{base}.{node.module}" if node.module else base
+                else:
+                    target = node.module or ""
+                # "from package import submodule" imports the submodule; the
+                # package only counts when something else is taken from it
+                submodules = {f"{target}.{alias.name}" for alias in node.names}
+                imported.update(submodules)
+                if not submodules <= files.keys():
+                    imported.add(target)
+
+        graph[name] = {target for target in imported if target in files and target != name}
+
+    return graph
+
+
+def dependents(graph: Dict[str, Set[str]], changed: Iterable[str]) -> Set[str]:
+    """
+    Find the changed files and every file that imports them, directly or not.
+
+    Args:
+        graph: The module's import graph
+        changed: Import names of the changed files
+
+    Returns:
+        The set of import names to reload.
+    """
+    reverse: Dict[str, Set[str]] = {}
+    for name, targets in graph.items():
+        for target in targets:
+            reverse.setdefault(target, set()).add(name)
+
+    result = set(changed)
+    stack = list(result)
+    while stack:
+        for importer in reverse.get(stack.pop(), ()):
+            if importer not in result:
+                result.add(importer)
+                stack.append(importer)
+    return result
+
+
+def reload_order(graph: Dict[str, Set[str]], names: Set[str]) -> List[str]:
+    """
+    Order files so that each one comes after the files it imports.
+
+    Args:
+        graph: The module's import graph
+        names: Import names to order
+
+    Returns:
+        The names in reload order. Files in an import cycle are appended
+        in alphabetical order.
+    """
+    remaining = {name: graph.get(name, set()) & names for name in names}
+    order: List[str] = []
+
+    while remaining:
+        ready = sorted(name for name, deps in remaining.items() if not deps)
+        if not ready:
+            # Import cycle: no order satisfies every edge
+            order.extend(sorted(remaining))
+            break
+        for name in ready:
+            order.append(name)
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+    return order
@@ -0,0 +1,90 @@
+"""
+Lifecycle hooks of Cardinal modules.
+
+A module package may define any of these functions, sync or async, each
+taking a ModuleContext:
+
+    async def on_load(context): ...     # after import, before the module serves
+    async def on_warmup(context): ...   # after on_load, before the module serves
+    async def on_unload(context): ...   # when the module is replaced or removed
+
+On a hot reload the new version is loaded and warmed up while the previous
+one is still serving. Its routes are then swapped in, and only then does
+the previous version get on_unload, with context.reloading set.
+
+The context, and its state dictionary, belong to the module name rather
+than to one version of the module. Resources stored in context.state by
+one version (connection pools, clients, caches) are still there for the
+next one, which can adopt them instead of starting cold. A version being
+replaced should therefore leave the resources its successor adopted
+alone. When the module is removed or the application shuts down,
+on_unload runs with context.reloading unset and must release everything.
+"""
+
+import inspect
+import time
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import FastAPI
+
+# Names of the hook functions looked up on module packages
+ON_LOAD = "on_load"
+ON_WARMUP = "on_warmup"
+ON_UNLOAD = "on_unload"
+
+
+class ModuleContext:
+    """
+    What a module's lifecycle hooks receive.
+
+    Attributes:
+        module_name: Name of the module
+        app: The FastAPI application
+        state: Resources and data kept across the versions of the module
+        generation: Number of versions of the module loaded so far
+        reloading: True while a version that is being replaced is unloaded
+    """
+
+    def __init__(self, module_name: str, app: FastAPI):
+        self.module_name = module_name
+        self.app = app
+        self.state: Dict[str, Any] = {}
+        self.generation = 0
+        self.reloading = False
+
+
+def get_hook(module: Any, name: str) -> Optional[Callable[[ModuleContext], Any]]:
+    """
+    Return a lifecycle hook of a module, if it defines one.
+
+    Args:
+        module: The module package
+        name: ON_LOAD, ON_WARMUP or ON_UNLOAD
+
+    Returns:
+        The hook function, or None.
+    """
+    hook = getattr(module, name, None)
+    return hook if callable(hook) else None
+
+
+async def call_hook(hook: Optional[Callable[[ModuleContext], Any]], context: ModuleContext) -> float:
+    """
+    Run a lifecycle hook, awaiting it if it is async.
+
+    Exceptions raised by the hook propagate.
+
+    Args:
+        hook: The hook function, or None
+        context: Context of the module
+
+    Returns:
+        Time spent in the hook, in milliseconds.
+    """
+    if hook is None:
+        return 0.0
+    start = time.perf_counter()
+    result = hook(context)
+    if inspect.isawaitable(result):
+        await result
+    return (time.perf_counter() - start) * 1000
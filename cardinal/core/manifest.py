@@ -0,0 +1,135 @@
+"""
+Lightweight module manifest for lazy loading.
+
+The manifest maps each module to the prefix of its router. It is built by
+reading the module sources with ``ast`` instead of importing them, so it
+costs a few milliseconds per module regardless of what the module imports.
+"""
+
+import ast
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class ManifestEntry:
+    """
+    What is known about a module without importing it.
+
+    Attributes:
+        name: Name of the module
+        prefix: Prefix of the module's router, or None if it cannot be
+            determined statically (such a module cannot be loaded lazily)
+        description: The module docstring
+    """
+
+    def __init__(self, name: str, prefix: Optional[str], description: str):
+        self.name = name
+        self.prefix = prefix
+        self.description = description
+
+    def to_dict(self) -> Dict[str, Optional[str]]:
+        return {"prefix": self.prefix, "description": self.description}
+
+
+def _router_prefixes(tree: ast.AST) -> Set[str]:
+    """
+    Find the constant prefixes passed to APIRouter(...) calls in a syntax tree.
+
+    Args:
+        tree: Parsed module source
+
+    Returns:
+        The set of prefixes found. A router created without a constant
+        prefix is reported as an empty string.
+    """
+    prefixes = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        func = node.func
+        name = func.id if isinstance(func, ast.Name) else getattr(func, "attr", None)
+        if name != "APIRouter":
+            continue
+
+        prefix = ""
+        for keyword in node.keywords:
+            if keyword.arg == "prefix":
+                value = keyword.value
+                prefix = value.value if isinstance(value, ast.Constant) and isinstance(value.value, str) else ""
+        prefixes.add(prefix.rstrip("/"))
+    return prefixes
+
+
+def read_manifest_entry(module_dir: Path) -> ManifestEntry:
+    """
+    Build the manifest entry of a module from its sources.
+
+    Args:
+        module_dir: Path to the module directory
+
+    Returns:
+        The manifest entry of the module.
+    """
+    description = ""
+    prefixes: Set[str] = set()
+
+    # Look at __init__.py first, then routes.py, then the other top-level files
+    files = ["__init__.py", "routes.py"] + sorted(
+        f for f in os.listdir(module_dir)
+        if f.endswith(".py") and f not in ("__init__.py", "routes.py")
+    )
+
+    for file in files:
+        file_path = module_dir / file
+        if not file_path.exists():
+            continue
+        try:
+            tree = ast.parse(file_path.read_bytes(), filename=str(file_path))
+        except (SyntaxError, ValueError) as e:
+            logger.warning(f"Could not parse {file_path}: {str(e)}")
+            return ManifestEntry(module_dir.name, None, description)
+
+        if file == "__init__.py":
+            description = (ast.get_docstring(tree) or "").strip()
+        prefixes |= _router_prefixes(tree)
+
+    # Only a single, non-empty prefix can be matched against incoming requests
+    prefix = next(iter(prefixes)) if len(prefixes) == 1 else None
+    return ManifestEntry(module_dir.name, prefix or None, description)
+
+
+def build_manifest(modules_path: Path, module_names: Iterable[str]) -> Dict[str, ManifestEntry]:
+    """
+    Build the manifest for a set of modules.
+
+    Args:
+        modules_path: Path to the modules directory
+        module_names: Names of the modules to include
+
+    Returns:
+        Mapping of module name to its manifest entry.
+    """
+    return {name: read_manifest_entry(modules_path / name) for name in module_names}
+
+
+def write_manifest(path: str, manifest: Dict[str, ManifestEntry]) -> None:
+    """
+    Write a manifest to a JSON file.
+
+    Args:
+        path: Path of the file to write
+        manifest: The manifest to write
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({name: entry.to_dict() for name, entry in sorted(manifest.items())}, f, indent=2)
+    os.replace(tmp_path, path)
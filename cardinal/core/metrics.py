@@ -0,0 +1,237 @@
+"""
+Request metrics for Cardinal, grouped by route and by owning module.
+
+MetricsMiddleware records, for every route, the number of requests and
+server errors and a latency histogram, plus the number of requests in
+flight per module. The registry renders them in the Prometheus text format
+for /metrics and summarizes them per module for /modules.
+
+Recording a request costs a few dictionary lookups and a bisect; nothing
+is allocated per request once a route has been seen.
+"""
+
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+from .module_names import CORE_MODULE, module_of
+
+# Route label of requests that match no route (404, 405)
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Upper bounds of the latency histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RouteStats:
+    """
+    Counters and latency histogram of one route.
+    """
+
+    __slots__ = ("module", "method", "route", "requests", "errors", "bucket_counts", "duration_sum")
+
+    def __init__(self, module: str, method: str, route: str, bucket_count: int):
+        self.module = module
+        self.method = method
+        self.route = route
+        self.requests = 0
+        self.errors = 0
+        # One count per bucket, plus one for durations above the last bound
+        self.bucket_counts = [0] * (bucket_count + 1)
+        self.duration_sum = 0.0
+
+    def labels(self) -> str:
+        return (f'module="{_escape_label(self.module)}",method="{_escape_label(self.method)}",'
+                f'route="{_escape_label(self.route)}"')
+
+
+class MetricsRegistry:
+    """
+    Holds the request metrics of the application.
+
+    Only used from the event loop, so it needs no locking.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, modules_package: str = "modules"):
+        """
+        Initialize the registry.
+
+        Args:
+            buckets: Upper bounds of the latency histogram buckets, in seconds
+            modules_package: Import name of the modules package, used to find
+                the module an endpoint belongs to
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.modules_package = modules_package
+        self.routes: Dict[Tuple[str, str, str], RouteStats] = {}
+        self.in_flight: Dict[str, int] = {CORE_MODULE: 0}
+        self._prefixes: Dict[str, str] = {}
+
+    def set_module_prefix(self, module_name: str, prefix: str) -> None:
+        """
+        Record the route prefix of a module, used to attribute in-flight requests.
+
+        Args:
+            module_name: Name of the module
+            prefix: Prefix of the module's router
+        """
+        for other_prefix, other_module in list(self._prefixes.items()):
+            if other_module == module_name:
+                del self._prefixes[other_prefix]
+        if prefix:
+            self._prefixes[prefix.rstrip("/")] = module_name
+        self.in_flight.setdefault(module_name, 0)
+
+    def remove_module(self, module_name: str) -> None:
+        """
+        Forget the metrics of a removed module.
+
+        Args:
+            module_name: Name of the module
+        """
+        self._prefixes = {prefix: name for prefix, name in self._prefixes.items() if name != module_name}
+        self.routes = {key: stats for key, stats in self.routes.items() if stats.module != module_name}
+        if not self.in_flight.get(module_name):
+            self.in_flight.pop(module_name, None)
+
+    def module_for_path(self, path: str) -> str:
+        """
+        Find the module whose prefix matches a request path.
+
+        Args:
+            path: The request path
+
+        Returns:
+            The module name, or CORE_MODULE if no module prefix matches.
+        """
+        if self._prefixes:
+            # Try the path and each of its parents, longest first
+            while path:
+                module_name = self._prefixes.get(path)
+                if module_name is not None:
+                    return module_name
+                path = path[:path.rfind("/")]
+        return CORE_MODULE
+
+    def module_of(self, endpoint: Any) -> Optional[str]:
+        """
+        Find the Cardinal module an endpoint is defined in.
+
+        Args:
+            endpoint: The endpoint function
+
+        Returns:
+            The module name, or None for core endpoints.
+        """
+        return module_of(endpoint, self.modules_package)
+
+    def record(self, module: str, method: str, route: str, status: int, duration: float) -> None:
+        """
+        Record a finished request.
+
+        Args:
+            module: Module that owns the route
+            method: HTTP method of the request
+            route: Path template of the matched route
+            status: Status code of the response (500 if the app raised)
+            duration: Time taken to handle the request, in seconds
+        """
+        key = (module, method, route)
+        stats = self.routes.get(key)
+        if stats is None:
+            stats = self.routes[key] = RouteStats(module, method, route, len(self.buckets))
+
+        stats.requests += 1
+        if status >= 500:
+            stats.errors += 1
+        stats.bucket_counts[bisect_left(self.buckets, duration)] += 1
+        stats.duration_sum += duration
+
+    def _quantile(self, bucket_counts: List[int], count: int, quantile: float) -> Optional[float]:
+        """Estimate a latency quantile as the upper bound of the bucket that holds it."""
+        if count == 0:
+            return None
+        rank = quantile * count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, bucket_counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def module_summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Summarize the metrics of each module.
+
+        Returns:
+            Mapping of module name to its request and error counts, requests
+            in flight, mean latency and estimated 95th percentile latency.
+        """
+        totals: Dict[str, Dict[str, Any]] = {}
+        for stats in self.routes.values():
+            total = totals.setdefault(stats.module, {
+                "requests": 0, "errors": 0, "duration_sum": 0.0,
+                "bucket_counts": [0] * (len(self.buckets) + 1),
+            })
+            total["requests"] += stats.requests
+            total["errors"] += stats.errors
+            total["duration_sum"] += stats.duration_sum
+            for i, bucket_count in enumerate(stats.bucket_counts):
+                total["bucket_counts"][i] += bucket_count
+
+        summary = {}
+        for module in set(totals) | set(self.in_flight):
+            total = totals.get(module)
+            requests = total["requests"] if total else 0
+            p95 = self._quantile(total["bucket_counts"], requests, 0.95) if total else None
+            if p95 == float("inf"):
+                p95 = None  # Above the last bucket: no meaningful estimate
+            summary[module] = {
+                "requests": requests,
+                "errors": total["errors"] if total else 0,
+                "in_flight": self.in_flight.get(module, 0),
+                "mean_ms": round(total["duration_sum"] / requests * 1000, 3) if requests else None,
+                "p95_ms": p95 * 1000 if p95 is not None else None,
+            }
+        return summary
+
+    def render_prometheus(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            The text to serve at /metrics.
+        """
+        routes = sorted(self.routes.values(), key=lambda stats: (stats.module, stats.route, stats.method))
+        lines = [
+            "# HELP cardinal_requests_total Requests handled, by route.",
+            "# TYPE cardinal_requests_total counter",
+        ]
+        lines.extend(f"cardinal_requests_total{{{stats.labels()}}} {stats.requests}" for stats in routes)
+
+        lines.append("# HELP cardinal_request_errors_total Requests that ended with a server error, by route.")
+        lines.append("# TYPE cardinal_request_errors_total counter")
+        lines.extend(f"cardinal_request_errors_total{{{stats.labels()}}} {stats.errors}" for stats in routes)
+
+        lines.append("# HELP cardinal_request_duration_seconds Request latency, by route.")
+        lines.append("# TYPE cardinal_request_duration_seconds histogram")
+        for stats in routes:
+            labels = stats.labels()
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, stats.bucket_counts):
+                cumulative += bucket_count
+                lines.append(f'cardinal_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'cardinal_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.requests}')
+            lines.append(f"cardinal_request_duration_seconds_sum{{{labels}}} {stats.duration_sum}")
+            lines.append(f"cardinal_request_duration_seconds_count{{{labels}}} {stats.requests}")
+
+        lines.append("# HELP cardinal_requests_in_flight Requests being handled, by module.")
+        lines.append("# TYPE cardinal_requests_in_flight gauge")
+        lines.extend(
+            f'cardinal_requests_in_flight{{module="{_escape_label(module)}"}} {count}'
+            for module, count in sorted(self.in_flight.items())
+        )
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,459 @@
+"""
+ASGI middleware used by Cardinal core.
+"""
+
+import logging
+import time
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+
+from fastapi import FastAPI, Request
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .bulkhead import BulkheadRegistry
+from .cache import CachedResponse, ResponseCache, etag_matches, get_cache_policy, make_etag
+from .metrics import CORE_MODULE, UNMATCHED_ROUTE, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class LazyLoadMiddleware:
+    """
+    Import lazily loaded modules the first time a request hits their prefix.
+
+    Once every module has been loaded this only costs an attribute lookup
+    per request.
+    """
+
+    def __init__(self, app: ASGIApp, module_loader, load_all_paths: Iterable[str] = ()):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application
+            module_loader: The ModuleLoader holding the pending modules
+            load_all_paths: Paths that need every module loaded (e.g. the OpenAPI schema)
+        """
+        self.app = app
+        self.module_loader = module_loader
+        self.load_all_paths = {path for path in load_all_paths if path}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.module_loader.pending_modules and scope["type"] in ("http", "websocket"):
+            path = scope["path"]
+            if path in self.load_all_paths:
+                await self.module_loader.load_pending_modules()
+            else:
+                module_name = self.module_loader.match_pending_module(path)
+                if module_name is not None:
+                    await self.module_loader.ensure_loaded(module_name)
+
+        await self.app(scope, receive, send)
+
+
+class ResponseCacheMiddleware:
+    """
+    Serve GET requests of cacheable routes from a ResponseCache.
+
+    Only routes marked with cache_response are cached, and only their
+    complete 200 responses without cookies. A request to a path with
+    nothing cached costs a dictionary lookup.
+    """
+
+    def __init__(self, app: ASGIApp, cache: ResponseCache):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application
+            cache: The cache to serve from and fill
+        """
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if_none_match = None
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                if_none_match = value
+
+        policy = self.cache.policy_for(path)
+        key = None
+        if policy is not None:
+            key = policy.cache_key(scope)
+            entry = self.cache.get(path, key)
+            if entry is not None:
+                # Let outer middleware see the route, as if the router had run
+                scope["route"] = entry.route
+                scope["endpoint"] = entry.endpoint
+                await self._send_cached(entry, if_none_match, send)
+                return
+
+        # Miss: the router sets scope["endpoint"] before the response starts,
+        # which tells whether the route is cacheable
+        start_message: Optional[Message] = None
+        body: List[bytes] = []
+        body_size = 0
+        buffering = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, body_size, buffering
+
+            if message["type"] == "http.response.start":
+                endpoint_policy = get_cache_policy(scope.get("endpoint"))
+                if endpoint_policy is None or message["status"] != 200 or any(
+                    name == b"set-cookie" for name, _ in message.get("headers", ())
+                ):
+                    await send(message)
+                    return
+                start_message = message
+                buffering = True
+                return
+
+            if not buffering or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body.append(message.get("body", b""))
+            body_size += len(body[-1])
+
+            if body_size > self.cache.max_entry_bytes:
+                # Too large to cache: send what was held back and stream the rest
+                buffering = False
+                await send(start_message)
+                await send({
+                    "type": "http.response.body",
+                    "body": b"".join(body),
+                    "more_body": message.get("more_body", False),
+                })
+                return
+
+            if message.get("more_body", False):
+                return
+
+            buffering = False
+            await self._store_and_send(scope, path, key, start_message, b"".join(body), if_none_match, send)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _store_and_send(self, scope: Scope, path: str, key, start_message: Message,
+                              body: bytes, if_none_match: Optional[bytes], send: Send) -> None:
+        endpoint = scope.get("endpoint")
+        policy = get_cache_policy(endpoint)
+
+        headers = list(start_message.get("headers", ()))
+        etag = next((value for name, value in headers if name == b"etag"), None)
+        if etag is None:
+            etag = make_etag(body)
+            headers.append((b"etag", etag))
+
+        entry = CachedResponse(200, headers, body, etag, time.monotonic() + policy.ttl,
+                               route=scope.get("route"), endpoint=endpoint)
+        if key is None or self.cache.policy_for(path) is not policy:
+            key = policy.cache_key(scope)
+        self.cache.put(path, key, policy, self.cache.module_of(endpoint), entry)
+
+        if if_none_match is not None and etag_matches(if_none_match, etag):
+            await self._send_not_modified(entry, send)
+            return
+
+        await send({"type": "http.response.start", "status": 200, "headers": headers + [(b"x-cache", b"MISS")]})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _send_cached(self, entry: CachedResponse, if_none_match: Optional[bytes], send: Send) -> None:
+        if if_none_match is not None and etag_matches(if_none_match, entry.etag):
+            await self._send_not_modified(entry, send)
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": entry.status,
+            "headers": entry.headers + [(b"x-cache", b"HIT")],
+        })
+        await send({"type": "http.response.body", "body": entry.body})
+
+    async def _send_not_modified(self, entry: CachedResponse, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": 304,
+            "headers": [(b"etag", entry.etag)] + [
+                (name, value) for name, value in entry.headers
+                if name in (b"cache-control", b"vary", b"expires")
+            ],
+        })
+        await send({"type": "http.response.body", "body": b""})
+
+
+class BulkheadMiddleware:
+    """
+    Limit the requests each module handles at once, with a BulkheadRegistry.
+
+    Requests to paths without a bulkhead only cost the prefix lookup.
+    """
+
+    # Body and headers of the rejection responses, by status code
+    REJECTIONS = {
+        429: ("Too Many Requests", "The module has too many requests queued. Please retry later."),
+        503: ("Service Unavailable", "The module did not have capacity in time. Please retry later."),
+    }
+
+    def __init__(self, app: ASGIApp, registry: BulkheadRegistry, retry_after: int = 1):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application
+            registry: The bulkheads of the modules
+            retry_after: Value of the Retry-After header of rejections, in seconds
+        """
+        self.app = app
+        self.registry = registry
+        self.retry_after = str(retry_after)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        bulkhead = self.registry.for_path(scope["path"])
+        if bulkhead is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = await bulkhead.acquire()
+        if status is not None:
+            error, detail = self.REJECTIONS[status]
+            response = JSONResponse(
+                status_code=status,
+                content={"error": error, "detail": detail},
+                headers={"Retry-After": self.retry_after},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            bulkhead.release()
+
+
+class MetricsMiddleware:
+    """
+    Record the latency and outcome of every HTTP request in a MetricsRegistry.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application
+            registry: The registry to record into
+        """
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        module = registry.module_for_path(scope["path"])
+        in_flight = registry.in_flight
+        in_flight[module] = in_flight.get(module, 0) + 1
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            in_flight[module] -= 1
+
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            if module == CORE_MODULE:
+                # Modules without a prefix are only known once routed
+                module = registry.module_of(scope.get("endpoint")) or CORE_MODULE
+            registry.record(module, scope["method"], route_path, status, duration)
+
+
+class RequestHook:
+    """
+    Code run around every HTTP request, e.g. for logging, timing or tracing.
+
+    Register hooks with add_request_hook. Hooks run on the event loop and
+    should return quickly; an exception raised by a hook is logged and does
+    not affect the request.
+    """
+
+    def on_request(self, scope: Scope) -> Any:
+        """
+        Called when a request arrives.
+
+        Args:
+            scope: The ASGI scope of the request
+
+        Returns:
+            A context object passed back to on_response.
+        """
+        return None
+
+    def on_response(self, scope: Scope, status: int, duration: float, context: Any,
+                    error: Optional[BaseException]) -> None:
+        """
+        Called once the response has been sent, or the application raised.
+
+        Args:
+            scope: The ASGI scope of the request, including the matched route
+            status: Status code of the response (500 if the application raised)
+            duration: Time taken to handle the request, in seconds
+            context: The value returned by on_request
+            error: The exception raised by the application, if any
+        """
+
+
+class RequestHooksMiddleware:
+    """
+    Call the registered RequestHooks around each HTTP request.
+
+    Plain ASGI: the response is passed through message by message, so
+    streaming responses keep streaming. With no hook registered a request
+    only costs a list check.
+    """
+
+    def __init__(self, app: ASGIApp, hooks: List[RequestHook]):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application
+            hooks: The hook list; hooks added to it later are picked up
+        """
+        self.app = app
+        self.hooks = hooks
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.hooks or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        hooks = tuple(self.hooks)
+        contexts = []
+        for hook in hooks:
+            try:
+                contexts.append(hook.on_request(scope))
+            except Exception:
+                logger.exception(f"Request hook {type(hook).__name__} failed")
+                contexts.append(None)
+
+        status = 500
+        error = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            for hook, context in zip(hooks, contexts):
+                try:
+                    hook.on_response(scope, status, duration, context, error)
+                except Exception:
+                    logger.exception(f"Request hook {type(hook).__name__} failed")
+
+
+def add_request_hook(app: FastAPI, hook: RequestHook) -> None:
+    """
+    Register a hook to run around every HTTP request.
+
+    Apps built with create_app already have the hooks middleware, so hooks
+    can be added at any time. On other apps the middleware is installed on
+    the first call, which must happen before the app starts.
+
+    Args:
+        app: The FastAPI application
+        hook: The hook to add
+    """
+    hooks = getattr(app.state, "request_hooks", None)
+    if hooks is None:
+        hooks = app.state.request_hooks = []
+        app.add_middleware(RequestHooksMiddleware, hooks=hooks)
+    hooks.append(hook)
+
+
+def remove_request_hook(app: FastAPI, hook: RequestHook) -> None:
+    """
+    Unregister a hook added with add_request_hook.
+
+    Args:
+        app: The FastAPI application
+        hook: The hook to remove
+    """
+    hooks = getattr(app.state, "request_hooks", None)
+    if hooks is not None and hook in hooks:
+        hooks.remove(hook)
+
+
+class UnhandledErrorMiddleware:
+    """
+    Turn exceptions raised while handling a request into an error response.
+
+    A handler registered with app.exception_handler(Exception) runs in
+    Starlette's ServerErrorMiddleware, which re-raises the exception once the
+    response is sent, so the server logs its traceback on every occurrence.
+    This middleware handles the exception before it gets there instead.
+    """
+
+    def __init__(self, app: ASGIApp, handler: Callable[[Request, Exception], Awaitable[Response]]):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application
+            handler: Logs the exception and builds the response
+        """
+        self.app = app
+        self.handler = handler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            if response_started:
+                # Too late for an error response; the server aborts the connection
+                raise
+            response = await self.handler(Request(scope), exc)
+            await response(scope, receive, send)
@@ -4,37 +4,142 @@ Module discovery and loading for Cardinal.
 
 import os
 import sys
+import copy
 import importlib
 import importlib.util
 import inspect
 import logging
 import asyncio
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Any
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Any
 from fastapi import FastAPI, APIRouter
+from starlette.routing import BaseRoute
+from .import_graph import build_import_graph, dependents, file_to_module, hash_file, hash_sources, reload_order
+from .bulkhead import BulkheadRegistry, get_bulkhead_limits
+from .executors import ExecutorRegistry, get_execution_policy
+from .lifecycle import ON_LOAD, ON_UNLOAD, ON_WARMUP, ModuleContext, call_hook, get_hook
+from .metrics import MetricsRegistry
+from .manifest import ManifestEntry, build_manifest, read_manifest_entry, write_manifest
+from .cache import ResponseCache
+from .openapi import OpenAPICache
+from .watcher import FileStat, ModuleChanges, ModuleWatcher
 
 logger = logging.getLogger(__name__)
 
+
+def _count_routes(routes: List[BaseRoute]) -> int:
+    """
+    Count the endpoints in a list of routes.
+
+    Recent FastAPI versions register an included router as a single entry
+    that wraps the original router, so those entries are expanded.
+
+    Args:
+        routes: Routes as registered in the app
+
+    Returns:
+        The number of endpoints.
+    """
+    count = 0
+    for route in routes:
+        original_router = getattr(route, "original_router", None)
+        if original_router is not None:
+            count += _count_routes(original_router.routes)
+        else:
+            count += 1
+    return count
+
+
+class ModuleLoadStats:
+    """
+    Timings and outcome of the last load of a module.
+
+    Attributes:
+        import_ms: Time spent importing the module, in milliseconds
+        register_ms: Time spent building and publishing its routes, in milliseconds
+        hooks_ms: Time spent in the module's on_load and on_warmup hooks, in milliseconds
+        error: Error message if the load failed
+        loaded_at: Unix time of the load
+        reloaded_files: Import names reloaded by a partial reload, None for a full import
+    """
+
+    def __init__(self):
+        self.import_ms = 0.0
+        self.register_ms = 0.0
+        self.hooks_ms = 0.0
+        self.error: Optional[str] = None
+        self.loaded_at = time.time()
+        self.reloaded_files: Optional[List[str]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "import_ms": round(self.import_ms, 3),
+            "register_ms": round(self.register_ms, 3),
+            "hooks_ms": round(self.hooks_ms, 3),
+            "error": self.error,
+            "loaded_at": self.loaded_at,
+            "reloaded_files": self.reloaded_files,
+        }
+
+
 class ModuleLoader:
     """
     Handles the discovery, loading, and hot-reloading of Cardinal modules.
     """
 
-    def __init__(self, app: FastAPI, modules_path: str):
+    def __init__(self, app: FastAPI, modules_path: str, watcher_backend: str = "auto",
+                 watcher_debounce: float = 0.5, watcher_poll_interval: float = 2.0,
+                 load_workers: int = 4):
         """
         Initialize the ModuleLoader.
 
         Args:
             app: The FastAPI application instance
             modules_path: Path to the directory containing modules
+            watcher_backend: File watcher backend ("auto", "inotify" or "polling")
+            watcher_debounce: Quiet period in seconds before a burst of changes is applied
+            watcher_poll_interval: Scan interval in seconds of the polling backend
+            load_workers: Number of threads used to import modules at startup
         """
         self.app = app
         self.modules_path = Path(modules_path)
         self.loaded_modules: Dict[str, Any] = {}
+        self.module_routes: Dict[str, List[BaseRoute]] = {}
+        self.module_stats: Dict[str, ModuleLoadStats] = {}
+        self.source_hashes: Dict[str, Dict[str, str]] = {}
+        self.module_contexts: Dict[str, ModuleContext] = {}
+        # Modules loaded synchronously whose on_load/on_warmup hooks still have to run
+        self._startup_hooks: List[str] = []
+        # Set once run_startup_hooks has run; modules are then loaded with load_module_async
+        self.started = False
+        self.load_workers = load_workers
+        self.startup_ms: Optional[float] = None
+        self.watcher_backend = watcher_backend
+        self.watcher_debounce = watcher_debounce
+        self.watcher_poll_interval = watcher_poll_interval
+        self.watcher: Optional[ModuleWatcher] = None
+        self.coordinator = None
+        self.openapi_cache: Optional[OpenAPICache] = None
+        self.response_cache: Optional[ResponseCache] = None
+        self.metrics: Optional[MetricsRegistry] = None
+        self.bulkheads: Optional[BulkheadRegistry] = None
+        self.executors: Optional[ExecutorRegistry] = None
         self.watcher_task = None
         self.running = False
 
+        # Lazy loading state: modules known from the manifest but not imported yet
+        self.lazy_loading = False
+        self.manifest: Dict[str, ManifestEntry] = {}
+        self.pending_modules: Dict[str, str] = {}
+        self._pending_prefixes: Dict[str, str] = {}
+        self._load_locks: Dict[str, asyncio.Lock] = {}
+        # Serializes the sys.modules cleanup of modules built in worker threads
+        self._import_lock = threading.Lock()
+        self.warmup_task = None
+
         # Ensure the modules directory exists
         if not self.modules_path.exists():
             logger.warning(f"Modules directory {self.modules_path} does not exist. Creating it.")
@@ -56,57 +161,431 @@ class ModuleLoader:
 
         return modules
 
-    def load_module(self, module_name: str) -> bool:
+    def load_module(self, module_name: str, changed_files: Optional[Set[str]] = None) -> bool:
         """
         Load a specific module and register its routes.
 
+        The import runs on the calling thread. The module's on_load and
+        on_warmup hooks are deferred to run_startup_hooks, so this is only
+        available before startup; use load_module_async afterwards.
+
         Args:
             module_name: Name of the module to load
+            changed_files: Files known to have changed since the last load, if any
 
         Returns:
             True if the module was loaded successfully, False otherwise.
+
+        Raises:
+            RuntimeError: If the startup hooks have already run
         """
+        if self.started:
+            raise RuntimeError(
+                f"Cannot load module {module_name} synchronously after startup, use load_module_async"
+            )
+        stats = ModuleLoadStats()
         try:
-            # Full import path for the module
-            full_module_path = f"{self.modules_path.name}.{module_name}"
+            result = self._build_module(module_name, stats, changed_files)
+        except Exception as e:
+            self._record_failure(module_name, stats, e)
+            return False
 
-            # Check if the module was previously loaded
-            if module_name in self.loaded_modules:
-                # Try to reload the module
-                logger.info(f"Reloading module: {module_name}")
+        if result is None:
+            logger.info(f"Module {module_name} sources are unchanged, skipping reload")
+            return False
 
-                # Remove existing routes if any
-                if hasattr(self.loaded_modules[module_name], "router"):
-                    self._unregister_module_routes(module_name)
+        module, routes = result
+        if module_name not in self._startup_hooks:
+            self._startup_hooks.append(module_name)
+        return self._activate_module(module_name, module, routes, stats)
 
-                # Remove from sys.modules to force a fresh import
-                self._cleanup_module_from_sys(full_module_path)
+    async def load_module_async(self, module_name: str,
+                                changed_files: Optional[Set[str]] = None) -> bool:
+        """
+        Load or reload a module without blocking the event loop.
 
-            # Import the module
-            module = importlib.import_module(full_module_path)
+        The module is imported and its routes are built in a worker thread.
+        The route table is then swapped in a single step on the event loop:
+        requests already dispatched finish on the old handlers, new requests
+        go to the new ones, and the module's endpoints never disappear in
+        between. If the import or the module's on_load/on_warmup hooks fail,
+        the previous version keeps serving.
 
-            # Reload to ensure we get the latest version
-            module = importlib.reload(module)
+        The new version runs its on_load and on_warmup hooks before its
+        routes are published; the previous version gets on_unload once they
+        have been, with the module context marked as reloading.
 
-            # Store the module
-            self.loaded_modules[module_name] = module
+        Args:
+            module_name: Name of the module to load
+            changed_files: Files known to have changed since the last load, if any
+
+        Returns:
+            True if the module was loaded successfully, False otherwise.
+        """
+        stats = ModuleLoadStats()
+        # Taken before the build, which may replace the module in sys.modules
+        previous_unload = get_hook(self.loaded_modules.get(module_name), ON_UNLOAD)
+        reloading = module_name in self.loaded_modules
+        try:
+            result = await asyncio.to_thread(self._build_module, module_name, stats, changed_files)
+        except Exception as e:
+            self._record_failure(module_name, stats, e)
+            return False
 
-            # Look for a router attribute or instance
-            router = self._get_module_router(module)
+        if result is None:
+            logger.info(f"Module {module_name} sources are unchanged, skipping reload")
+            return False
 
-            if router:
-                # Include the router in the app
-                logger.info(f"Registering routes for module: {module_name}")
-                self.app.include_router(router)
-                return True
-            else:
-                logger.warning(f"No router found in module: {module_name}")
-                return False
+        module, routes = result
+        context = self.get_module_context(module_name)
+        try:
+            await self._start_module(module, context, stats)
+        except Exception as e:
+            self._record_failure(module_name, stats, e)
+            return False
+
+        success = self._activate_module(module_name, module, routes, stats)
+        if reloading:
+            await self._unload(module_name, previous_unload, context, reloading=True)
+        return success
+
+    def get_module_context(self, module_name: str) -> ModuleContext:
+        """
+        Return the lifecycle context of a module, creating it if needed.
+
+        Args:
+            module_name: Name of the module
+
+        Returns:
+            The context shared by every version of the module.
+        """
+        context = self.module_contexts.get(module_name)
+        if context is None:
+            context = self.module_contexts[module_name] = ModuleContext(module_name, self.app)
+        return context
+
+    async def _start_module(self, module: Any, context: ModuleContext, stats: ModuleLoadStats) -> None:
+        """
+        Run the on_load and on_warmup hooks of a new version of a module.
+
+        Args:
+            module: The imported module
+            context: Context of the module
+            stats: Receives the time spent in the hooks
+        """
+        context.generation += 1
+        context.reloading = False
+        stats.hooks_ms += await call_hook(get_hook(module, ON_LOAD), context)
+        stats.hooks_ms += await call_hook(get_hook(module, ON_WARMUP), context)
+
+    async def _unload(self, module_name: str, hook: Optional[Callable[[ModuleContext], Any]],
+                      context: ModuleContext, reloading: bool) -> None:
+        """
+        Run the on_unload hook of a version of a module, logging its errors.
 
+        Args:
+            module_name: Name of the module
+            hook: The on_unload hook of that version, or None
+            context: Context of the module
+            reloading: Whether the version is being replaced by a new one
+        """
+        context.reloading = reloading
+        try:
+            await call_hook(hook, context)
         except Exception as e:
-            logger.error(f"Error loading module {module_name}: {str(e)}")
+            logger.error(f"Error unloading module {module_name}: {str(e)}", exc_info=True)
+        finally:
+            context.reloading = False
+
+    async def run_startup_hooks(self) -> None:
+        """
+        Run the on_load and on_warmup hooks of the modules loaded synchronously.
+
+        Called at application startup, before requests are served. A module
+        whose hooks fail is unloaded.
+        """
+        self.started = True
+        module_names, self._startup_hooks = self._startup_hooks, []
+        for module_name in module_names:
+            module = self.loaded_modules.get(module_name)
+            if module is None:
+                continue
+            stats = self.module_stats.get(module_name) or ModuleLoadStats()
+            try:
+                await self._start_module(module, self.get_module_context(module_name), stats)
+            except Exception as e:
+                logger.error(f"Lifecycle hooks of module {module_name} failed, unloading it")
+                await self.unload_module(module_name)
+                self._record_failure(module_name, stats, e)
+                self._update_openapi_schema([module_name])
+
+    async def unload_module(self, module_name: str) -> None:
+        """
+        Run a module's on_unload hook, then unregister it and forget its context.
+
+        Args:
+            module_name: Name of the module
+        """
+        module = self.loaded_modules.get(module_name)
+        if module is not None:
+            await self._unload(module_name, get_hook(module, ON_UNLOAD), self.get_module_context(module_name),
+                               reloading=False)
+        self._remove_module(module_name)
+        self.module_contexts.pop(module_name, None)
+
+    async def unload_all_modules(self) -> None:
+        """
+        Run the on_unload hook of every loaded module, at application shutdown.
+        """
+        for module_name in sorted(self.loaded_modules):
+            await self._unload(module_name, get_hook(self.loaded_modules[module_name], ON_UNLOAD),
+                               self.get_module_context(module_name), reloading=False)
+
+    def _build_module(self, module_name: str, stats: ModuleLoadStats,
+                      changed_files: Optional[Set[str]] = None
+                      ) -> Optional[Tuple[Any, Optional[List[BaseRoute]]]]:
+        """
+        Import a module and build its routes without touching the app.
+
+        When the changed files of an already loaded module are known, only
+        those files and the files that import them are reloaded. Safe to run
+        in a worker thread.
+
+        Args:
+            module_name: Name of the module to import
+            stats: Receives the import and route building timings
+            changed_files: Files known to have changed since the last load, if any
+
+        Returns:
+            The imported module and its routes (None if it has no router), or
+            None if the changed files have the same contents as before.
+        """
+        # Full import path for the module
+        full_module_path = f"{self.modules_path.name}.{module_name}"
+        module_dir = self.modules_path / module_name
+
+        if module_name in self.loaded_modules:
+            logger.info(f"Reloading module: {module_name}")
+
+            previous_hashes = self.source_hashes.get(module_name)
+            if changed_files and previous_hashes is not None:
+                changed = self._changed_sources(previous_hashes, changed_files)
+                if changed is not None:
+                    if not changed:
+                        return None
+                    try:
+                        module = self._reload_files(module_name, changed, stats)
+                        return module, self._build_module_routes(module, stats)
+                    except Exception as e:
+                        logger.warning(
+                            f"Partial reload of module {module_name} failed ({str(e)}), "
+                            f"reloading the whole module"
+                        )
+
+        # Hash the sources before importing them, so that the hashes describe
+        # the code that actually got imported
+        hashes = hash_sources(module_dir)
+
+        # Remove from sys.modules and drop stale finder caches to force a fresh
+        # import. Invalidating the caches is not thread-safe, and the startup
+        # workers build several modules at once.
+        with self._import_lock:
+            self._cleanup_module_from_sys(full_module_path)
+            importlib.invalidate_caches()
+
+        # Import the module
+        start = time.perf_counter()
+        try:
+            module = importlib.import_module(full_module_path)
+        finally:
+            stats.import_ms = (time.perf_counter() - start) * 1000
+
+        self.source_hashes[module_name] = hashes
+        return module, self._build_module_routes(module, stats)
+
+    def _build_module_routes(self, module: Any, stats: ModuleLoadStats) -> Optional[List[BaseRoute]]:
+        """
+        Build the routes of an imported module.
+
+        Args:
+            module: The imported module
+            stats: Receives the route building time
+
+        Returns:
+            The module's routes, or None if it has no router.
+        """
+        # Look for a router attribute or instance
+        router = self._get_module_router(module)
+        if router is None:
+            return None
+
+        start = time.perf_counter()
+        routes = self._build_routes(router)
+        stats.register_ms = (time.perf_counter() - start) * 1000
+        return routes
+
+    def _changed_sources(self, previous_hashes: Dict[str, str],
+                         changed_files: Set[str]) -> Optional[Dict[str, str]]:
+        """
+        Filter changed files down to those whose contents really changed.
+
+        Args:
+            previous_hashes: Content hashes recorded at the last load
+            changed_files: Files reported as changed by the watcher
+
+        Returns:
+            Mapping of really changed files to their new hash, or None if a
+            file was added or deleted (which requires a full reload).
+        """
+        changed = {}
+        for path in changed_files:
+            path = os.path.normpath(path)
+            previous = previous_hashes.get(path)
+            if previous is None:
+                return None
+            try:
+                digest = hash_file(path)
+            except FileNotFoundError:
+                return None
+            if digest != previous:
+                changed[path] = digest
+        return changed
+
+    def _reload_files(self, module_name: str, changed: Dict[str, str], stats: ModuleLoadStats) -> Any:
+        """
+        Reload the changed files of a module and the files that depend on them.
+
+        The reloaded files are imported as new module objects rather than
+        reloaded in place, so the previous version keeps its own globals
+        while it serves, and keeps them if the reload fails. Unchanged files
+        (and the objects and state they hold) are shared by both versions.
+
+        Args:
+            module_name: Name of the module
+            changed: Mapping of changed file to its new content hash
+            stats: Receives the import time
+
+        Returns:
+            The module package.
+        """
+        package = f"{self.modules_path.name}.{module_name}"
+        module_dir = self.modules_path / module_name
+
+        graph = build_import_graph(package, module_dir)
+        changed_names = {file_to_module(package, module_dir, path) for path in changed}
+        order = reload_order(graph, dependents(graph, changed_names))
+        logger.info(f"Partially reloading module {module_name}: {', '.join(order)}")
+
+        if package not in sys.modules:
+            raise ImportError(f"{package} is not imported")
+
+        # Detach the previous versions of the files, and remember the package
+        # attributes the new imports will overwrite, to restore both on failure
+        missing = object()
+        with self._import_lock:
+            previous = {name: sys.modules.pop(name) for name in order if name in sys.modules}
+            importlib.invalidate_caches()
+        attributes = []
+        for name in order:
+            parent_name, _, child = name.rpartition(".")
+            parent = previous.get(parent_name) or sys.modules.get(parent_name)
+            if parent is not None:
+                attributes.append((parent, child, getattr(parent, child, missing)))
+
+        start = time.perf_counter()
+        try:
+            # Importing a file imports its parent packages first, so files
+            # that are never imported by the package are skipped
+            for name in order:
+                if name in previous:
+                    importlib.import_module(name)
+        except BaseException:
+            for name in order:
+                sys.modules.pop(name, None)
+            sys.modules.update(previous)
+            for parent, child, value in attributes:
+                if value is missing:
+                    parent.__dict__.pop(child, None)
+                else:
+                    setattr(parent, child, value)
+            raise
+        finally:
+            stats.import_ms = (time.perf_counter() - start) * 1000
+
+        stats.reloaded_files = order
+        self.source_hashes[module_name].update(changed)
+        return sys.modules[package]
+
+    def _build_routes(self, router: APIRouter) -> List[BaseRoute]:
+        """
+        Build the routes a router would add to the app, without adding them.
+
+        Args:
+            router: The module's router
+
+        Returns:
+            The routes, ready to be placed in the app's route table.
+        """
+        # A shallow copy shares the app router's settings (dependency overrides,
+        # default response class, ...) but collects routes in its own list
+        staging = copy.copy(self.app.router)
+        staging.routes = []
+        staging.include_router(router)
+        return staging.routes
+
+    def _activate_module(self, module_name: str, module: Any,
+                         routes: Optional[List[BaseRoute]], stats: ModuleLoadStats) -> bool:
+        """
+        Store a freshly imported module and publish its routes.
+
+        Args:
+            module_name: Name of the module
+            module: The imported module
+            routes: The module's routes, or None if it has no router
+            stats: Timings of the load, completed with the publication time
+
+        Returns:
+            True if the module has routes, False otherwise.
+        """
+        # Store the module
+        self.loaded_modules[module_name] = module
+        self.module_stats[module_name] = stats
+        self._invalidate_responses(module_name)
+
+        router = self._get_module_router(module)
+        if self.metrics is not None:
+            self.metrics.set_module_prefix(module_name, getattr(router, "prefix", ""))
+        if self.bulkheads is not None:
+            self.bulkheads.configure(module_name, getattr(router, "prefix", ""), get_bulkhead_limits(router))
+        if self.executors is not None:
+            # Keeps the pools of the previous version unless their sizes changed
+            self.executors.configure(module_name, get_execution_policy(router))
+
+        if routes is None:
+            logger.warning(f"No router found in module: {module_name}")
+            stats.error = "No router found"
+            self._unregister_module_routes(module_name)
             return False
 
+        logger.info(f"Registering routes for module: {module_name}")
+        start = time.perf_counter()
+        self._swap_module_routes(module_name, routes)
+        stats.register_ms += (time.perf_counter() - start) * 1000
+        return True
+
+    def _record_failure(self, module_name: str, stats: ModuleLoadStats, error: Exception) -> None:
+        """
+        Log and record a failed module load.
+
+        Args:
+            module_name: Name of the module
+            stats: Timings collected before the failure
+            error: The exception raised while loading
+        """
+        logger.error(f"Error loading module {module_name}: {str(error)}")
+        stats.error = f"{type(error).__name__}: {error}"
+        self.module_stats[module_name] = stats
+
     def _get_module_router(self, module) -> Optional[APIRouter]:
         """
         Extract the router from a module.
@@ -133,6 +612,40 @@ class ModuleLoader:
 
         return None
 
+    def _swap_module_routes(self, module_name: str, new_routes: List[BaseRoute]) -> None:
+        """
+        Replace a module's routes using a copy-on-write route table.
+
+        A new list is built and assigned to the app router in one step, so a
+        request always sees either the old or the new routes, never a table
+        without them. The new routes take the place of the old ones to keep
+        the matching order stable.
+
+        Args:
+            module_name: Name of the module
+            new_routes: The routes to publish (empty to remove the module's routes)
+        """
+        old_ids = {id(route) for route in self.module_routes.get(module_name, [])}
+
+        routes: List[BaseRoute] = []
+        inserted = False
+        for route in self.app.router.routes:
+            if id(route) in old_ids:
+                if not inserted:
+                    routes.extend(new_routes)
+                    inserted = True
+                continue
+            routes.append(route)
+        if not inserted:
+            routes.extend(new_routes)
+
+        self.app.router.routes = routes
+
+        if new_routes:
+            self.module_routes[module_name] = new_routes
+        else:
+            self.module_routes.pop(module_name, None)
+
     def _unregister_module_routes(self, module_name: str) -> None:
         """
         Unregister routes for a module.
@@ -140,28 +653,25 @@ class ModuleLoader:
         Args:
             module_name: Name of the module
         """
-        module = self.loaded_modules.get(module_name)
-        if not module:
+        owned_routes = self.module_routes.get(module_name)
+        if not owned_routes:
             return
 
-        router = self._get_module_router(module)
-        if not router:
-            return
+        self._swap_module_routes(module_name, [])
 
-        # Find and remove routes from the app
-        routes_to_remove = []
-        prefix = getattr(router, "prefix", "")
+        logger.info(f"Unregistered {_count_routes(owned_routes)} routes for module: {module_name}")
 
-        for route in self.app.routes:
-            # Check if this route belongs to the module
-            if hasattr(route, "path") and route.path.startswith(prefix):
-                routes_to_remove.append(route)
+    def get_routes_count(self, module_name: str) -> int:
+        """
+        Count the routes registered by a module.
 
-        # Remove the routes
-        for route in routes_to_remove:
-            self.app.routes.remove(route)
+        Args:
+            module_name: Name of the module
 
-        logger.info(f"Unregistered {len(routes_to_remove)} routes for module: {module_name}")
+        Returns:
+            The number of routes owned by the module.
+        """
+        return _count_routes(self.module_routes.get(module_name, []))
 
     def _cleanup_module_from_sys(self, module_path: str) -> None:
         """
@@ -170,96 +680,348 @@ class ModuleLoader:
         Args:
             module_path: Full import path of the module
         """
+        # Iterate over a snapshot: other loader threads may be importing
+        # modules (and so adding to sys.modules) at the same time
         modules_to_remove = [
-            m for m in sys.modules if m == module_path or m.startswith(f"{module_path}.")
+            m for m in list(sys.modules) if m == module_path or m.startswith(f"{module_path}.")
         ]
 
         for m in modules_to_remove:
-            if m in sys.modules:
-                del sys.modules[m]
+            sys.modules.pop(m, None)
 
     def load_all_modules(self) -> None:
         """
         Discover and load all available modules.
+
+        Modules are imported concurrently in a thread pool, then their routes
+        are published one by one in alphabetical order so the route table is
+        the same on every start.
         """
-        modules = self.discover_modules()
+        start = time.perf_counter()
+        modules = sorted(self.discover_modules())
         logger.info(f"Discovered modules: {modules}")
 
+        results: Dict[str, Tuple[ModuleLoadStats, Any, Optional[List[BaseRoute]], Optional[Exception]]] = {}
+
+        def build(module_name: str):
+            stats = ModuleLoadStats()
+            try:
+                module, routes = self._build_module(module_name, stats)
+                return stats, module, routes, None
+            except Exception as e:
+                return stats, None, None, e
+
+        workers = max(1, min(self.load_workers, len(modules)))
+        if workers > 1:
+            # Import the parent package up front so the workers don't race on it
+            importlib.import_module(self.modules_path.name)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cardinal-loader") as executor:
+                for module_name, result in zip(modules, executor.map(build, modules)):
+                    results[module_name] = result
+        else:
+            for module_name in modules:
+                results[module_name] = build(module_name)
+
         for module_name in modules:
-            success = self.load_module(module_name)
+            stats, module, routes, error = results[module_name]
+            if error is not None:
+                self._record_failure(module_name, stats, error)
+                success = False
+            else:
+                self._startup_hooks.append(module_name)
+                success = self._activate_module(module_name, module, routes, stats)
+
             if success:
-                logger.info(f"Successfully loaded module: {module_name}")
+                logger.info(
+                    f"Successfully loaded module: {module_name} "
+                    f"(import {stats.import_ms:.1f} ms, routes {stats.register_ms:.1f} ms)"
+                )
             else:
                 logger.error(f"Failed to load module: {module_name}")
 
+        self.startup_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"Loaded {len(self.loaded_modules)} modules in {self.startup_ms:.1f} ms using {workers} workers")
+
+    def prepare_lazy_loading(self, manifest_file: Optional[str] = None) -> None:
+        """
+        Discover modules without importing them.
+
+        Builds the manifest of router prefixes and defers each module until
+        a request hits its prefix. Modules whose prefix cannot be determined
+        statically are loaded right away.
+
+        Args:
+            manifest_file: Optional path where the manifest is written as JSON
+        """
+        self.lazy_loading = True
+        modules = self.discover_modules()
+        self.manifest = build_manifest(self.modules_path, modules)
+
+        if manifest_file:
+            try:
+                write_manifest(manifest_file, self.manifest)
+            except OSError as e:
+                logger.warning(f"Could not write module manifest to {manifest_file}: {str(e)}")
+
+        for module_name in sorted(modules):
+            entry = self.manifest[module_name]
+            if entry.prefix is None:
+                logger.info(f"Module {module_name} has no static router prefix, loading it eagerly")
+                if self.load_module(module_name):
+                    logger.info(f"Successfully loaded module: {module_name}")
+                else:
+                    logger.error(f"Failed to load module: {module_name}")
+            else:
+                self._add_pending(module_name, entry.prefix)
+
+        logger.info(f"Deferred loading of modules: {sorted(self.pending_modules)}")
+
+    def _add_pending(self, module_name: str, prefix: str) -> None:
+        """
+        Register a module to be loaded on the first request to its prefix.
+
+        Args:
+            module_name: Name of the module
+            prefix: Prefix of the module's router
+        """
+        other = self._pending_prefixes.get(prefix)
+        if other is not None and other != module_name:
+            logger.warning(f"Modules {other} and {module_name} share the prefix {prefix}")
+        self.pending_modules[module_name] = prefix
+        self._pending_prefixes[prefix] = module_name
+        if self.metrics is not None:
+            self.metrics.set_module_prefix(module_name, prefix)
+        if self.bulkheads is not None:
+            # Only the configured limits are known until the module is imported
+            self.bulkheads.configure(module_name, prefix)
+
+    def _discard_pending(self, module_name: str) -> None:
+        """
+        Forget a pending module.
+
+        Args:
+            module_name: Name of the module
+        """
+        prefix = self.pending_modules.pop(module_name, None)
+        if prefix is not None and self._pending_prefixes.get(prefix) == module_name:
+            del self._pending_prefixes[prefix]
+
+    def match_pending_module(self, path: str) -> Optional[str]:
+        """
+        Find the pending module whose prefix matches a request path.
+
+        Args:
+            path: The request path
+
+        Returns:
+            The module name, or None if no pending module matches.
+        """
+        # Try the path and each of its parents, longest first
+        while path:
+            module_name = self._pending_prefixes.get(path)
+            if module_name is not None:
+                return module_name
+            path = path[:path.rfind("/")]
+        return None
+
+    async def ensure_loaded(self, module_name: str) -> bool:
+        """
+        Load a pending module, once, even if several requests ask for it.
+
+        Args:
+            module_name: Name of the module
+
+        Returns:
+            True if the module is loaded, False otherwise.
+        """
+        if module_name not in self.pending_modules:
+            return module_name in self.loaded_modules
+
+        lock = self._load_locks.setdefault(module_name, asyncio.Lock())
+        async with lock:
+            # Another request may have loaded it while we were waiting
+            if module_name not in self.pending_modules:
+                return module_name in self.loaded_modules
+
+            logger.info(f"Loading module on demand: {module_name}")
+            success = await self.load_module_async(module_name)
+            self._discard_pending(module_name)
+            self._load_locks.pop(module_name, None)
+
+            if success:
+                self._update_openapi_schema([module_name])
+            else:
+                logger.error(f"Failed to load module: {module_name}")
+            return success
+
+    async def load_pending_modules(self) -> None:
+        """
+        Load every pending module, one at a time.
+        """
+        for module_name in sorted(self.pending_modules):
+            await self.ensure_loaded(module_name)
+
+    async def warm_up(self) -> None:
+        """
+        Load all pending modules in the background after startup.
+        """
+        start = time.perf_counter()
+        count = len(self.pending_modules)
+        try:
+            await self.load_pending_modules()
+        except Exception as e:
+            logger.error(f"Error during module warm-up: {str(e)}")
+            return
+        logger.info(f"Warm-up loaded {count} modules in {time.perf_counter() - start:.2f}s")
+
+    async def start_warmup(self) -> None:
+        """
+        Start the background warm-up of pending modules.
+        """
+        logger.info("Starting module warm-up")
+        self.warmup_task = asyncio.create_task(self.warm_up())
+
+    async def stop_warmup(self) -> None:
+        """
+        Cancel the background warm-up if it is still running.
+        """
+        if self.warmup_task and not self.warmup_task.done():
+            self.warmup_task.cancel()
+            try:
+                await self.warmup_task
+            except asyncio.CancelledError:
+                pass
+
     async def watch_modules(self) -> None:
         """
         Watch for changes in the modules directory and reload modules as needed.
-        This is a simple polling implementation. For production, consider using a file
-        system watcher library.
+
+        File system scanning and debouncing happen in the watcher thread; this
+        coroutine only applies the resulting batches of changes.
         """
-        last_scan = {}
         self.running = True
-    
-        while self.running:
-            try:
-                # Get the current list of available modules
-                current_modules = set(self.discover_modules())
-                
-                # Check for removed modules
-                loaded_module_names = set(self.loaded_modules.keys())
-                removed_modules = loaded_module_names - current_modules
-                
-                # Handle removed modules
-                schema_needs_update = False
-                for module_name in removed_modules:
-                    logger.info(f"Module removed: {module_name}")
-                    self._unregister_module_routes(module_name)
-                    self._cleanup_module_from_sys(f"{self.modules_path.name}.{module_name}")
-                    if module_name in self.loaded_modules:
-                        del self.loaded_modules[module_name]
-                    if module_name in last_scan:
-                        del last_scan[module_name]
-                    schema_needs_update = True
-    
-                # Update OpenAPI schema if modules were removed
-                if schema_needs_update:
-                    self._update_openapi_schema()
-    
-                # Check each module directory for changes or new modules
-                changes_detected = False
-                for module_dir in self.modules_path.iterdir():
-                    if not module_dir.is_dir() or not (module_dir / "__init__.py").exists():
-                        continue
-    
-                    module_name = module_dir.name
-                    latest_modification = 0
-    
-                    # Find the newest modification time in the module directory
-                    for root, _, files in os.walk(module_dir):
-                        for file in files:
-                            if file.endswith('.py'):
-                                file_path = os.path.join(root, file)
-                                mod_time = os.path.getmtime(file_path)
-                                latest_modification = max(latest_modification, mod_time)
-    
-                    # If this is a new module or has been modified, reload it
-                    if module_name not in last_scan or latest_modification > last_scan[module_name]:
-                        last_scan[module_name] = latest_modification
-                        logger.info(f"Change detected in module: {module_name}")
-                        if self.load_module(module_name):
-                            changes_detected = True
-    
-                # Update OpenAPI schema if modules were added or changed
-                if changes_detected:
-                    self._update_openapi_schema()
-    
-                # Sleep to prevent high CPU usage
-                await asyncio.sleep(2)
-    
-            except Exception as e:
-                logger.error(f"Error in module watcher: {str(e)}")
-                await asyncio.sleep(5)  # Sleep longer on error
+
+        # With several workers, changes go through the coordinator instead
+        if self.coordinator is not None:
+            await self.coordinator.run()
+            return
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def on_changes(changes: ModuleChanges) -> None:
+            loop.call_soon_threadsafe(queue.put_nowait, changes)
+
+        self.watcher = self.create_watcher(on_changes)
+        self.watcher.start()
+
+        try:
+            while self.running:
+                changes = await queue.get()
+                try:
+                    await self._apply_changes(changes)
+                except Exception as e:
+                    logger.error(f"Error in module watcher: {str(e)}")
+        finally:
+            self.watcher.stop()
+
+    def create_watcher(self, callback: Callable[[ModuleChanges], None],
+                       baseline: Optional[Dict[str, Dict[str, FileStat]]] = None) -> ModuleWatcher:
+        """
+        Create a file watcher for the modules directory.
+
+        Args:
+            callback: Called from the watcher thread with each batch of changes
+            baseline: Files of an earlier StatIndex whose differences with the
+                modules directory are reported as the first batch of changes
+
+        Returns:
+            The watcher, not started yet.
+        """
+        return ModuleWatcher(
+            self.modules_path,
+            callback,
+            backend=self.watcher_backend,
+            debounce=self.watcher_debounce,
+            poll_interval=self.watcher_poll_interval,
+            baseline=baseline,
+        )
+
+    async def _apply_changes(self, changes: ModuleChanges) -> bool:
+        """
+        Reload changed modules and unload removed ones.
+
+        Args:
+            changes: A batch of changes reported by the watcher
+
+        Returns:
+            True if every change was applied, False if a module failed to load.
+        """
+        updated_modules: Set[str] = set()
+        success = True
+
+        # Handle removed modules
+        for module_name in changes.removed:
+            if module_name in self.pending_modules:
+                logger.info(f"Module removed: {module_name}")
+                self._discard_pending(module_name)
+            elif module_name in self.loaded_modules:
+                logger.info(f"Module removed: {module_name}")
+                await self.unload_module(module_name)
+                updated_modules.add(module_name)
+
+        # Reload new and modified modules
+        for module_name in sorted(changes.changed):
+            logger.info(f"Change detected in module: {module_name}")
+
+            # Modules that were never imported only need their manifest entry refreshed
+            if self.lazy_loading and module_name not in self.loaded_modules:
+                entry = read_manifest_entry(self.modules_path / module_name)
+                self.manifest[module_name] = entry
+                self._discard_pending(module_name)
+                if entry.prefix is not None:
+                    self._add_pending(module_name, entry.prefix)
+                    continue
+
+            if await self.load_module_async(module_name, changes.changed[module_name]):
+                updated_modules.add(module_name)
+            else:
+                success = False
+
+        # Update OpenAPI schema if modules were added, changed or removed
+        if updated_modules:
+            self._update_openapi_schema(updated_modules)
+        return success
+
+    def _remove_module(self, module_name: str) -> None:
+        """
+        Unregister a module's routes and forget about it.
+
+        Args:
+            module_name: Name of the module
+        """
+        self._unregister_module_routes(module_name)
+        self._cleanup_module_from_sys(f"{self.modules_path.name}.{module_name}")
+        self.loaded_modules.pop(module_name, None)
+        self.module_stats.pop(module_name, None)
+        self.source_hashes.pop(module_name, None)
+        self._invalidate_responses(module_name)
+        if self.metrics is not None:
+            self.metrics.remove_module(module_name)
+        if self.bulkheads is not None:
+            self.bulkheads.remove_module(module_name)
+        if self.executors is not None:
+            self.executors.remove_module(module_name)
+
+    def _invalidate_responses(self, module_name: str) -> None:
+        """
+        Drop the cached responses of a module's routes.
+
+        Args:
+            module_name: Name of the module that was reloaded or removed
+        """
+        if self.response_cache is not None:
+            self.response_cache.invalidate_module(module_name)
 
     async def start_watcher(self) -> None:
         """
@@ -281,21 +1043,23 @@ class ModuleLoader:
                     await self.watcher_task
                 except asyncio.CancelledError:
                     pass
+            if self.watcher:
+                await asyncio.to_thread(self.watcher.join, 5)
                     
-    def _update_openapi_schema(self) -> None:
+    def _update_openapi_schema(self, module_names: Iterable[str]) -> None:
         """
-        Update the OpenAPI schema to reflect the current routes.
-        This forces the Swagger UI to refresh with the current API structure.
+        Mark the OpenAPI schema as outdated for the given modules.
+
+        The schema is not regenerated here: the OpenAPI cache rebuilds only
+        the fragments of these modules the next time the schema is requested.
+
+        Args:
+            module_names: Names of the modules that were loaded, reloaded or removed
         """
-        try:
-            # Regenerate the OpenAPI schema
-            if hasattr(self.app, "openapi_schema"):
-                # Clear the cached schema to force regeneration
-                self.app.openapi_schema = None
-                
-            # Trigger schema regeneration
-            _ = self.app.openapi()
-            
-            logger.info("OpenAPI schema updated")
-        except Exception as e:
-            logger.error(f"Error updating OpenAPI schema: {str(e)}")
\ No newline at end of file
+        if self.openapi_cache is not None:
+            self.openapi_cache.invalidate(module_names)
+        else:
+            # Clear FastAPI's cached schema to force regeneration on next request
+            self.app.openapi_schema = None
+
+        logger.info("OpenAPI schema marked for update")
@@ -0,0 +1,30 @@
+"""
+Attribution of functions and endpoints to the Cardinal module that owns them.
+
+Modules are imported as submodules of the modules package (for example
+"modules.example_module.routes"), so the owning module of a function is the
+second part of its __module__. The metrics, the response cache, the module
+executors and the error summary all attribute work this way.
+"""
+
+from typing import Any, Optional
+
+# Owner of the core routes and functions, and of requests that match no route
+CORE_MODULE = "core"
+
+
+def module_of(obj: Any, modules_package: str = "modules") -> Optional[str]:
+    """
+    Find the Cardinal module a function, endpoint or class is defined in.
+
+    Args:
+        obj: The function, endpoint or class (None is accepted)
+        modules_package: Import name of the modules package
+
+    Returns:
+        The module name, or None for objects defined outside of the modules package.
+    """
+    parts = (getattr(obj, "__module__", None) or "").split(".")
+    if len(parts) > 1 and parts[0] == modules_package:
+        return parts[1]
+    return None
@@ -0,0 +1,336 @@
+"""
+Incremental OpenAPI schema generation for Cardinal.
+
+The schema is assembled from one fragment per module (plus one for the core
+routes). A module change only marks its fragment as stale; nothing is
+generated until the schema is requested again, and then only the stale
+fragments are rebuilt before being merged. The serialized document is served
+with an ETag so clients can revalidate with If-None-Match.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from fastapi import FastAPI, Request
+from fastapi.openapi.utils import get_openapi
+from starlette.responses import Response
+from starlette.routing import BaseRoute
+
+logger = logging.getLogger(__name__)
+
+# Fragment key used for routes that do not belong to any module
+CORE_FRAGMENT = "__core__"
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Check whether an Accept-Encoding header allows a gzip response.
+
+    Args:
+        accept_encoding: Value of the header
+
+    Returns:
+        True if gzip, or any coding ("*"), is listed with a non-zero quality.
+    """
+    wildcard = False
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding == "gzip":
+            return quality > 0
+        if coding == "*":
+            wildcard = quality > 0
+    return wildcard
+
+
+class _Payload:
+    """
+    A serialized OpenAPI document, ready to be sent.
+    """
+
+    def __init__(self, document: Dict[str, Any], compress: bool):
+        self.document = document
+        self.body = json.dumps(
+            document, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+        self.etag = f'"{hashlib.sha1(self.body).hexdigest()}"'
+        self.gzip_body = gzip.compress(self.body, compresslevel=6) if compress else None
+
+
+class OpenAPICache:
+    """
+    Lazily rebuilt OpenAPI document made of cached per-module fragments.
+    """
+
+    def __init__(self, app: FastAPI, module_loader, compress: bool = True):
+        """
+        Initialize the cache.
+
+        Args:
+            app: The FastAPI application instance
+            module_loader: The ModuleLoader that owns the module routes
+            compress: Whether to keep a gzip-compressed copy of the document
+        """
+        self.app = app
+        self.module_loader = module_loader
+        self.compress = compress
+        self._fragments: Dict[str, Dict[str, Any]] = {}
+        self._stale: Set[str] = {CORE_FRAGMENT}
+        self._generation = 0
+        self._payload: Optional[_Payload] = None
+        self._payload_generation = -1
+        self._variants: Dict[str, _Payload] = {}
+        self._build_lock = threading.Lock()
+        # Guards _stale and _generation, which the event loop updates while a
+        # rebuild may be running in a worker thread. Not the build lock, so
+        # that invalidating never waits for a rebuild.
+        self._state_lock = threading.Lock()
+        self._async_lock: Optional[asyncio.Lock] = None
+
+    def invalidate(self, module_names: Iterable[str]) -> None:
+        """
+        Mark the fragments of some modules as stale.
+
+        Args:
+            module_names: Names of the modules that were loaded, reloaded or removed
+        """
+        with self._state_lock:
+            self._stale.update(module_names)
+            self._generation += 1
+
+    def invalidate_all(self) -> None:
+        """
+        Mark every fragment as stale.
+        """
+        with self._state_lock:
+            self._fragments = {}
+            self._stale = {CORE_FRAGMENT}
+            self._generation += 1
+
+    @property
+    def is_fresh(self) -> bool:
+        """Whether the cached document reflects the current routes."""
+        return self._payload is not None and self._payload_generation == self._generation
+
+    def openapi(self) -> Dict[str, Any]:
+        """
+        Return the current OpenAPI document, rebuilding stale fragments if needed.
+
+        Used as a drop-in replacement for FastAPI.openapi.
+        """
+        return self._get_payload().document
+
+    async def get_payload_async(self) -> _Payload:
+        """
+        Return the current payload, rebuilding it in a worker thread if needed.
+        """
+        if self.is_fresh:
+            return self._payload
+
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+
+        # Concurrent requests after a change wait for a single rebuild
+        async with self._async_lock:
+            if self.is_fresh:
+                return self._payload
+            return await asyncio.to_thread(self._get_payload)
+
+    def _get_payload(self) -> _Payload:
+        with self._build_lock:
+            if self.is_fresh:
+                return self._payload
+
+            # Take the stale set and the generation together, so that an
+            # invalidation made during the build is kept for the next one
+            with self._state_lock:
+                generation = self._generation
+                stale, self._stale = self._stale, set()
+            try:
+                self._payload = _Payload(self._build_document(stale), self.compress)
+            except Exception:
+                # Keep the fragments marked as stale so the next request retries
+                with self._state_lock:
+                    self._stale.update(stale)
+                raise
+            self._payload_generation = generation
+            self._variants = {}
+            self.app.openapi_schema = self._payload.document
+            return self._payload
+
+    def _build_document(self, stale: Set[str]) -> Dict[str, Any]:
+        """
+        Regenerate stale fragments and merge all fragments into one document.
+
+        Args:
+            stale: Fragment keys to regenerate
+
+        Returns:
+            The merged OpenAPI document.
+        """
+        module_routes: Dict[str, List[BaseRoute]] = dict(self.module_loader.module_routes)
+
+        # Drop fragments of modules that no longer have routes
+        for name in list(self._fragments):
+            if name != CORE_FRAGMENT and name not in module_routes:
+                del self._fragments[name]
+
+        if CORE_FRAGMENT in stale or CORE_FRAGMENT not in self._fragments:
+            owned_ids = {id(route) for routes in module_routes.values() for route in routes}
+            core_routes = [route for route in self.app.routes if id(route) not in owned_ids]
+            self._fragments[CORE_FRAGMENT] = self._generate(core_routes, webhooks=True)
+
+        rebuilt = 0
+        for name, routes in module_routes.items():
+            if name in stale or name not in self._fragments:
+                self._fragments[name] = self._generate(routes)
+                rebuilt += 1
+
+        logger.debug(f"OpenAPI schema rebuilt ({rebuilt} module fragments regenerated)")
+
+        document = self._merge([self._fragments[CORE_FRAGMENT]] + [
+            self._fragments[name] for name in module_routes
+        ])
+        if document is None:
+            # Two fragments define different schemas under the same name (e.g.
+            # two modules with an Item model). Only a single pass over all the
+            # routes gives them distinct names, so fall back to a full build.
+            logger.debug("OpenAPI schema names collide between modules, generating the full schema")
+            document = self._generate(list(self.app.routes), webhooks=True)
+        return document
+
+    def _generate(self, routes: List[BaseRoute], webhooks: bool = False) -> Dict[str, Any]:
+        """
+        Generate the OpenAPI fragment for a list of routes.
+
+        Args:
+            routes: Routes to document
+            webhooks: Whether to include the app's webhooks
+
+        Returns:
+            A complete OpenAPI document covering only those routes.
+        """
+        app = self.app
+        return get_openapi(
+            title=app.title,
+            version=app.version,
+            openapi_version=app.openapi_version,
+            description=app.description,
+            terms_of_service=app.terms_of_service,
+            contact=app.contact,
+            license_info=app.license_info,
+            routes=routes,
+            webhooks=app.webhooks.routes if webhooks else None,
+            tags=app.openapi_tags,
+            servers=app.servers,
+        )
+
+    @staticmethod
+    def _merge(fragments: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Merge OpenAPI fragments. The first fragment provides the document metadata.
+
+        Args:
+            fragments: Fragments to merge, core fragment first
+
+        Returns:
+            The merged document, or None if two fragments define different
+            components under the same name.
+        """
+        document = dict(fragments[0])
+        paths: Dict[str, Any] = {}
+        components: Dict[str, Dict[str, Any]] = {}
+
+        for fragment in fragments:
+            for path, operations in fragment.get("paths", {}).items():
+                paths.setdefault(path, {}).update(operations)
+            for section, items in fragment.get("components", {}).items():
+                merged = components.setdefault(section, {})
+                for name, item in items.items():
+                    if merged.setdefault(name, item) != item:
+                        return None
+
+        document["paths"] = paths
+        if components:
+            document["components"] = components
+        else:
+            document.pop("components", None)
+        return document
+
+    def _variant(self, payload: _Payload, root_path: str) -> _Payload:
+        """
+        Return the payload with the request's root path added to the servers.
+
+        Args:
+            payload: The base payload
+            root_path: The ASGI root path of the request
+
+        Returns:
+            The payload to serve for that root path.
+        """
+        if not root_path or not self.app.root_path_in_servers:
+            return payload
+
+        server_urls = {s.get("url") for s in payload.document.get("servers", [])}
+        if root_path in server_urls:
+            return payload
+
+        variant = self._variants.get(root_path)
+        if variant is None:
+            document = dict(payload.document)
+            document["servers"] = [{"url": root_path}] + payload.document.get("servers", [])
+            variant = self._variants[root_path] = _Payload(document, self.compress)
+        return variant
+
+    async def endpoint(self, request: Request) -> Response:
+        """
+        Serve the OpenAPI document with ETag and gzip support.
+        """
+        root_path = request.scope.get("root_path", "").rstrip("/")
+        payload = self._variant(await self.get_payload_async(), root_path)
+
+        headers = {"ETag": payload.etag, "Cache-Control": "no-cache"}
+        if payload.gzip_body is not None:
+            headers["Vary"] = "Accept-Encoding"
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            tags = {tag.strip() for tag in if_none_match.split(",")}
+            if payload.etag in tags or f"W/{payload.etag}" in tags or "*" in tags:
+                return Response(status_code=304, headers=headers)
+
+        if payload.gzip_body is not None and accepts_gzip(request.headers.get("accept-encoding", "")):
+            headers["Content-Encoding"] = "gzip"
+            return Response(payload.gzip_body, media_type="application/json", headers=headers)
+
+        return Response(payload.body, media_type="application/json", headers=headers)
+
+    def install(self, openapi_url: Optional[str]) -> None:
+        """
+        Replace FastAPI's OpenAPI route and schema generator with this cache.
+
+        Args:
+            openapi_url: URL the schema is served at (None disables the route)
+        """
+        self.app.openapi = self.openapi
+        if not openapi_url:
+            return
+
+        self.app.router.routes = [
+            route for route in self.app.router.routes
+            if getattr(route, "path", None) != openapi_url
+        ]
+        self.app.add_route(openapi_url, self.endpoint, include_in_schema=False)
@@ -0,0 +1,229 @@
+"""
+Shared resources managed by Cardinal core.
+
+Modules that call other services should not open a client per request,
+or even per module: each client has its own connection pool, so
+connections would not be reused. The ResourceRegistry owns one pooled
+httpx.AsyncClient for the whole application, opened at startup and closed
+at shutdown, and any other resource registered with it.
+
+Endpoints get them through FastAPI dependencies:
+
+    @router.get("/weather")
+    async def get_weather(client: httpx.AsyncClient = Depends(get_http_client)):
+        response = await client.get("https://weather.example.com/today")
+        ...
+
+Lifecycle hooks can use context.app.state.resources.
+"""
+
+import inspect
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+import httpx
+from fastapi import Request
+
+logger = logging.getLogger(__name__)
+
+ResourceFactory = Callable[[], Union[Any, Awaitable[Any]]]
+ResourceCloser = Callable[[Any], Union[None, Awaitable[None]]]
+
+
+class ResourceRegistry:
+    """
+    Creates, hands out and closes the resources shared by the modules.
+    """
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 5.0, timeout: float = 10.0, http2: bool = False,
+                 retries: int = 0):
+        """
+        Initialize the registry. Nothing is opened before start().
+
+        Args:
+            max_connections: Maximum number of open HTTP connections
+            max_keepalive_connections: Maximum number of idle connections kept open
+            keepalive_expiry: Seconds an idle connection is kept open
+            timeout: Default timeout of HTTP requests, in seconds
+            http2: Whether to negotiate HTTP/2 (needs the h2 package)
+            retries: Number of retries of failed connection attempts
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = timeout
+        self.http2 = http2
+        self.retries = retries
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self.requests = 0
+
+        self._transport: Optional[httpx.AsyncHTTPTransport] = None
+        self._factories: Dict[str, ResourceFactory] = {}
+        self._closers: Dict[str, Optional[ResourceCloser]] = {}
+        self._resources: Dict[str, Any] = {}
+        # Names in creation order, closed in reverse
+        self._order: List[str] = []
+
+    def register(self, name: str, factory: ResourceFactory, close: Optional[ResourceCloser] = None) -> None:
+        """
+        Register a shared resource, created on first use.
+
+        Registering a name again (e.g. from a reloaded module) replaces the
+        factory and the closer, but keeps the resource if it was created.
+
+        Args:
+            name: Name the resource is looked up by
+            factory: Creates the resource (sync or async)
+            close: Releases the resource at shutdown (sync or async)
+        """
+        self._factories[name] = factory
+        self._closers[name] = close
+
+    async def get(self, name: str) -> Any:
+        """
+        Return a shared resource, creating it on first use.
+
+        Args:
+            name: Name of the resource
+
+        Returns:
+            The resource.
+        """
+        if name in self._resources:
+            return self._resources[name]
+        factory = self._factories.get(name)
+        if factory is None:
+            raise KeyError(f"Unknown resource: {name}")
+
+        resource = factory()
+        if inspect.isawaitable(resource):
+            resource = await resource
+        # Another request may have created it while the factory was awaited
+        if name in self._resources:
+            await self._close(name, resource)
+            return self._resources[name]
+        self._resources[name] = resource
+        self._order.append(name)
+        return resource
+
+    async def start(self) -> None:
+        """Open the shared HTTP client."""
+        if self.http_client is not None:
+            return
+
+        http2 = self.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 needs the h2 package (pip install httpx[http2]), using HTTP/1.1")
+                http2 = False
+
+        self._transport = httpx.AsyncHTTPTransport(limits=self.limits, http2=http2, retries=self.retries)
+        self.http_client = httpx.AsyncClient(
+            transport=self._transport,
+            timeout=self.timeout,
+            event_hooks={"request": [self._on_request]},
+        )
+        logger.info(f"Opened the shared HTTP client (max {self.limits.max_connections} connections, "
+                    f"HTTP/2 {'on' if http2 else 'off'})")
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        self.requests += 1
+
+    async def _close(self, name: str, resource: Any) -> None:
+        close = self._closers.get(name)
+        if close is None:
+            return
+        try:
+            result = close(resource)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.error(f"Error closing resource {name}: {str(e)}")
+
+    async def close(self) -> None:
+        """Close the shared HTTP client and every resource created, newest first."""
+        for name in reversed(self._order):
+            await self._close(name, self._resources.pop(name))
+        self._order = []
+
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+            self._transport = None
+            logger.info("Closed the shared HTTP client")
+
+    def pool_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Describe the connection pool of the shared HTTP client.
+
+        Returns:
+            Pool limits, connection counts by state and request counters, or
+            None if the client is not open.
+        """
+        if self.http_client is None:
+            return None
+
+        # The transport does not expose its pool publicly; it is httpcore's
+        connections = list(getattr(getattr(self._transport, "_pool", None), "connections", ()))
+        idle = sum(1 for connection in connections if connection.is_idle())
+        http2 = sum(1 for connection in connections if "HTTP/2" in connection.info())
+        return {
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "connections": len(connections),
+            "active": len(connections) - idle,
+            "idle": idle,
+            "http2": http2,
+            "requests": self.requests,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Describe the shared resources.
+
+        Returns:
+            The HTTP connection pool stats and the registered resources.
+        """
+        return {
+            "http_client": self.pool_stats(),
+            "resources": {name: name in self._resources for name in sorted(self._factories)},
+        }
+
+
+def get_resources(request: Request) -> ResourceRegistry:
+    """FastAPI dependency returning the application's resource registry."""
+    return request.app.state.resources
+
+
+def get_http_client(request: Request) -> httpx.AsyncClient:
+    """
+    FastAPI dependency returning the shared, pooled HTTP client.
+
+    Raises:
+        RuntimeError: If the application has not started yet
+    """
+    client = request.app.state.resources.http_client
+    if client is None:
+        raise RuntimeError("The shared HTTP client is not open; is the application started?")
+    return client
+
+
+def resource(name: str) -> Callable[[Request], Awaitable[Any]]:
+    """
+    Build a FastAPI dependency returning a registered shared resource.
+
+    Args:
+        name: Name the resource was registered under
+
+    Returns:
+        The dependency.
+    """
+    async def dependency(request: Request) -> Any:
+        return await request.app.state.resources.get(name)
+    return dependency
@@ -0,0 +1,78 @@
+"""
+Fast JSON responses for Cardinal modules.
+
+When an endpoint returns a value, FastAPI validates it against the
+response_model and encodes it again with jsonable_encoder and the json
+module. That work is wasted when the value is a model the module built
+itself, or bytes it has already serialized. FastAPI sends a returned
+Response as is, so returning one of these responses skips it.
+"""
+
+import json
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from starlette.responses import Response
+
+
+def dump_model(model: BaseModel) -> bytes:
+    """
+    Serialize a pydantic model to JSON without validating it.
+
+    Args:
+        model: The model to serialize
+
+    Returns:
+        The encoded JSON document
+    """
+    dump = getattr(model, "model_dump_json", None)  # pydantic 2 serializer
+    return (dump() if dump is not None else model.json()).encode("utf-8")
+
+
+def dump_json(content: Any) -> bytes:
+    """
+    Serialize a model, a list of models or plain JSON data.
+
+    Args:
+        content: The value to serialize
+
+    Returns:
+        The encoded JSON document
+    """
+    if isinstance(content, BaseModel):
+        return dump_model(content)
+    if isinstance(content, list) and all(isinstance(value, BaseModel) for value in content):
+        return b"[" + b",".join(dump_model(value) for value in content) + b"]"
+    return json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class RawJSONResponse(Response):
+    """
+    Send bytes that already hold a JSON document, e.g. from a cache.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, str):
+            return content.encode(self.charset)
+        return bytes(content)
+
+
+class ModelJSONResponse(Response):
+    """
+    Send trusted pydantic models without validating them again.
+
+    Accepts a model, a list of models or plain JSON data.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
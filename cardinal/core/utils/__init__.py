@@ -2,7 +2,7 @@
 Utility package for Cardinal core.
 """
 
-from .logging import setup_logging
+from .logging import get_log_pipeline, setup_logging
 from .errors import setup_error_handlers
 
-__all__ = ["setup_logging", "setup_error_handlers"]
\ No newline at end of file
+__all__ = ["setup_logging", "get_log_pipeline", "setup_error_handlers"]
\ No newline at end of file
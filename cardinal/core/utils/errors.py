@@ -1,38 +1,364 @@
 """
 Error handling utilities for Cardinal.
+
+Unhandled exceptions go through an ErrorAggregator, which fingerprints them
+by exception type and location. The first occurrence of a fingerprint is
+logged with its traceback; repeats are only counted and summarized in one
+line per time window, so a module failing on every request does not flood
+the logs with identical tracebacks.
 """
 
+import hashlib
+import json
 import logging
+import sysconfig
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
 from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from ..module_names import CORE_MODULE, module_of
+from ..middleware import UnhandledErrorMiddleware
 
 logger = logging.getLogger(__name__)
 
-def setup_error_handlers(app: FastAPI) -> None:
+# Frames in these directories are library code, not the location of a bug
+_LIBRARY_PATHS = tuple({
+    path for path in (sysconfig.get_paths().get(name) for name in ("stdlib", "platstdlib", "purelib", "platlib"))
+    if path
+})
+
+
+def _location(filename: str, lineno: int, function: str) -> str:
+    return f"{filename}:{lineno} in {function}"
+
+
+def exception_fingerprint(exc: BaseException) -> Tuple[str, str, str]:
+    """
+    Identify where an exception comes from.
+
+    Args:
+        exc: The exception
+
+    Returns:
+        The qualified exception type, the innermost frame of the traceback,
+        and the innermost frame outside of the standard library and
+        installed packages (the same as the former if there is none).
+    """
+    exc_type = type(exc)
+    type_name = f"{exc_type.__module__}.{exc_type.__qualname__}"
+
+    location = origin = "<unknown>"
+    tb = exc.__traceback__
+    while tb is not None:
+        code = tb.tb_frame.f_code
+        location = _location(code.co_filename, tb.tb_lineno, code.co_name)
+        if not code.co_filename.startswith(_LIBRARY_PATHS):
+            origin = location
+        tb = tb.tb_next
+    if origin == "<unknown>":
+        origin = location
+    return type_name, location, origin
+
+
+class ErrorGroup:
+    """
+    The occurrences of one error fingerprint.
+    """
+
+    __slots__ = ("fingerprint", "kind", "type", "location", "origin", "module", "message",
+                 "count", "first_seen", "last_seen", "window_start", "window_count")
+
+    def __init__(self, fingerprint: str, kind: str, type_name: str, location: str, origin: str,
+                 module: str, message: str, now: float):
+        self.fingerprint = fingerprint
+        self.kind = kind
+        self.type = type_name
+        self.location = location
+        self.origin = origin
+        self.module = module
+        self.message = message
+        self.count = 0
+        self.first_seen = now
+        self.last_seen = now
+        # Start of the current window and the repeats counted in it
+        self.window_start = now
+        self.window_count = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "kind": self.kind,
+            "type": self.type,
+            "location": self.location,
+            "origin": self.origin,
+            "module": self.module,
+            "message": self.message,
+            "count": self.count,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+        }
+
+
+class ErrorAggregator:
+    """
+    Deduplicates and counts the errors handled by the exception handlers.
+
+    Only used from the event loop, so it needs no locking.
+    """
+
+    def __init__(self, window: float = 60.0, max_fingerprints: int = 1000,
+                 max_message_length: int = 500, modules_package: str = "modules"):
+        """
+        Initialize the aggregator.
+
+        Args:
+            window: Length, in seconds, of the window over which repeats are
+                counted before a summary line is logged
+            max_fingerprints: Number of distinct fingerprints kept; the least
+                recently seen ones are forgotten first
+            max_message_length: Longest exception message kept and logged
+            modules_package: Import name of the modules package, used to find
+                the module an endpoint belongs to
+        """
+        self.window = window
+        self.max_fingerprints = max_fingerprints
+        self.max_message_length = max_message_length
+        self.modules_package = modules_package
+        self.total = 0
+        self.module_counts: Dict[str, Dict[str, int]] = {}
+
+        # Fingerprint -> group, least recently seen first
+        self.groups: "OrderedDict[str, ErrorGroup]" = OrderedDict()
+
+    def module_of(self, request: Request) -> str:
+        """
+        Find the Cardinal module that handled a request.
+
+        Args:
+            request: The request that failed
+
+        Returns:
+            The module name, or CORE_MODULE for core endpoints and unmatched requests.
+        """
+        return module_of(request.scope.get("endpoint"), self.modules_package) or CORE_MODULE
+
+    def _truncate(self, message: str) -> str:
+        if len(message) > self.max_message_length:
+            return message[:self.max_message_length] + "..."
+        return message
+
+    def _record(self, kind: str, type_name: str, location: str, origin: str, module: str,
+                message: str) -> Tuple[ErrorGroup, bool]:
+        """
+        Count an occurrence of an error.
+
+        Returns:
+            The group of the error, and whether this is its first occurrence.
+        """
+        now = time.time()
+        fingerprint = hashlib.sha1(f"{kind}|{type_name}|{location}|{origin}".encode("utf-8")).hexdigest()[:12]
+
+        self.total += 1
+        counts = self.module_counts.setdefault(module, {})
+        counts[kind] = counts.get(kind, 0) + 1
+
+        group = self.groups.get(fingerprint)
+        first = group is None
+        if first:
+            group = self.groups[fingerprint] = ErrorGroup(
+                fingerprint, kind, type_name, location, origin, module, message, now
+            )
+            if len(self.groups) > self.max_fingerprints:
+                self.groups.popitem(last=False)
+        else:
+            self.groups.move_to_end(fingerprint)
+
+        group.count += 1
+        group.last_seen = now
+        group.message = message
+        return group, first
+
+    def _repeat(self, group: ErrorGroup, level: int) -> None:
+        """Count a repeat, and log a summary line once per window."""
+        group.window_count += 1
+        elapsed = group.last_seen - group.window_start
+        if elapsed >= self.window:
+            logger.log(level, f"{group.type} [{group.fingerprint}] in module {group.module} at {group.origin} "
+                              f"repeated {group.window_count} times in the last {elapsed:.1f}s "
+                              f"({group.count} in total): {group.message}")
+            group.window_start = group.last_seen
+            group.window_count = 0
+
+    def record_exception(self, exc: BaseException, request: Request) -> ErrorGroup:
+        """
+        Record an unhandled exception, logging its traceback on the first occurrence.
+
+        Args:
+            exc: The exception
+            request: The request that raised it
+
+        Returns:
+            The group of the exception.
+        """
+        type_name, location, origin = exception_fingerprint(exc)
+        module = self.module_of(request)
+        group, first = self._record("exception", type_name, location, origin, module,
+                                    self._truncate(str(exc)))
+        if first:
+            logger.error(f"Unhandled exception [{group.fingerprint}] in module {module} "
+                         f"({request.method} {request.url.path}): {group.message}", exc_info=exc)
+        else:
+            self._repeat(group, logging.ERROR)
+        return group
+
+    def record_validation_error(self, exc: RequestValidationError, request: Request) -> ErrorGroup:
+        """
+        Record a request validation error, logging it on the first occurrence.
+
+        Validation errors are fingerprinted by route and by the fields and
+        error types involved, not by the submitted values.
+
+        Args:
+            exc: The validation error
+            request: The request that failed validation
+
+        Returns:
+            The group of the error.
+        """
+        route = getattr(request.scope.get("route"), "path", request.url.path)
+        fields = ",".join(sorted(
+            f"{'.'.join(str(part) for part in error.get('loc', ()))}:{error.get('type', '')}"
+            for error in exc.errors()
+        ))
+        module = self.module_of(request)
+        message = self._truncate(
+            "; ".join(f"{'.'.join(str(part) for part in error.get('loc', ()))}: {error.get('msg', '')}"
+                      for error in exc.errors())
+        )
+        group, first = self._record("validation", type(exc).__name__, f"{request.method} {route}",
+                                    fields, module, message)
+        if first:
+            logger.warning(f"Validation error [{group.fingerprint}] in module {module} "
+                           f"({request.method} {request.url.path}): {message}")
+        else:
+            self._repeat(group, logging.WARNING)
+        return group
+
+    def summary(self, limit: int = 10) -> Dict[str, Any]:
+        """
+        Summarize the recorded errors.
+
+        Args:
+            limit: Number of fingerprints to list
+
+        Returns:
+            The total count, the counts of each module by kind of error, and
+            the most frequent fingerprints.
+        """
+        top = sorted(self.groups.values(), key=lambda group: group.count, reverse=True)[:limit]
+        return {
+            "total": self.total,
+            "window_seconds": self.window,
+            "fingerprints": len(self.groups),
+            "modules": self.module_counts,
+            "top": [group.to_dict() for group in top],
+        }
+
+    def reset(self) -> None:
+        """Forget every recorded error."""
+        self.total = 0
+        self.module_counts.clear()
+        self.groups.clear()
+
+
+def echo_body(body: Any, max_bytes: int) -> Tuple[Any, bool]:
+    """
+    Cap the request body echoed in a validation error response.
+
+    Args:
+        body: The body FastAPI attached to the validation error
+        max_bytes: Largest body, in bytes of JSON, echoed as is (0 to never echo it)
+
+    Returns:
+        The body, or the start of its encoding if it is too large, and
+        whether it was truncated.
+    """
+    if body is None:
+        return None, False
+    if max_bytes <= 0:
+        return None, True
+
+    if isinstance(body, (bytes, bytearray)):
+        text = bytes(body).decode("utf-8", errors="replace")
+    elif isinstance(body, str):
+        text = body
+    else:
+        try:
+            text = json.dumps(body, ensure_ascii=False, default=str)
+        except (TypeError, ValueError):
+            return None, True
+        if len(text.encode("utf-8")) <= max_bytes:
+            return body, False
+
+    data = text.encode("utf-8")
+    if len(data) <= max_bytes:
+        return text, False
+    return data[:max_bytes].decode("utf-8", errors="ignore"), True
+
+
+def setup_error_handlers(app: FastAPI, error_window: float = 60.0, error_max_fingerprints: int = 1000,
+                         error_body_echo_bytes: int = 1024, errors_url: Optional[str] = "/errors") -> None:
     """
     Configure error handlers for the FastAPI application.
-    
+
     Args:
         app: FastAPI application instance
+        error_window: Seconds over which repeats of an error are counted
+            before a summary line is logged
+        error_max_fingerprints: Number of distinct errors tracked
+        error_body_echo_bytes: Largest request body echoed in validation
+            error responses
+        errors_url: URL of the error summary endpoint (None to disable it)
     """
-    
+    module_loader = getattr(app.state, "module_loader", None)
+    aggregator = ErrorAggregator(
+        window=error_window,
+        max_fingerprints=error_max_fingerprints,
+        modules_package=module_loader.modules_path.name if module_loader is not None else "modules",
+    )
+    app.state.error_aggregator = aggregator
+
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError):
         """
         Handle validation errors.
         """
-        logger.warning(f"Validation error: {exc}")
+        aggregator.record_validation_error(exc, request)
+        body, truncated = echo_body(exc.body, error_body_echo_bytes)
+        # Each error also echoes the input it rejected, which can be the whole body
+        detail = []
+        for error in exc.errors():
+            if "input" in error:
+                error = dict(error)
+                error["input"], input_truncated = echo_body(error["input"], error_body_echo_bytes)
+                truncated = truncated or input_truncated
+            detail.append(error)
+        content = {
+            "error": "Validation Error",
+            "detail": jsonable_encoder(detail),
+            "body": body
+        }
+        if truncated:
+            content["body_truncated"] = True
         return JSONResponse(
             status_code=422,
-            content={
-                "error": "Validation Error",
-                "detail": exc.errors(),
-                "body": exc.body
-            }
+            content=content
         )
-    
+
     @app.exception_handler(StarletteHTTPException)
     async def http_exception_handler(request: Request, exc: StarletteHTTPException):
         """
@@ -46,17 +372,29 @@ def setup_error_handlers(app: FastAPI) -> None:
                 "detail": exc.detail
             }
         )
-    
-    @app.exception_handler(Exception)
+
     async def general_exception_handler(request: Request, exc: Exception):
         """
         Handle general exceptions.
         """
-        logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
+        aggregator.record_exception(exc, request)
         return JSONResponse(
             status_code=500,
             content={
                 "error": "Internal Server Error",
                 "detail": "An unexpected error occurred. Please try again later."
             }
-        )
\ No newline at end of file
+        )
+
+    # Not an exception handler: Starlette would re-raise the exception to the
+    # server after the handler, which would log every traceback again
+    app.add_middleware(UnhandledErrorMiddleware, handler=general_exception_handler)
+
+    if errors_url:
+        async def get_errors(limit: int = 10):
+            """
+            Summarize the errors handled since startup.
+            """
+            return aggregator.summary(limit)
+
+        app.add_api_route(errors_url, get_errors, methods=["GET"], tags=["System"])
@@ -1,28 +1,263 @@
 """
 Logging configuration for Cardinal.
+
+Log calls only put the record on a bounded in-memory queue; a background
+listener thread formats the records and writes them to stdout and the
+(rotating) log file. Code on the event loop therefore never waits on disk
+or terminal I/O. When the queue is full, records are dropped and counted
+rather than blocking the caller.
 """
 
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
 import os
-from typing import Optional
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
 from fastapi import FastAPI
-from pathlib import Path
+from starlette.types import Scope
+from ..middleware import RequestHook, add_request_hook
+
+
+class RequestLogHook(RequestHook):
+    """
+    Log each request and its response at DEBUG level.
+
+    The messages are only formatted when DEBUG is enabled on the logger.
+    """
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+
+    def on_request(self, scope: Scope) -> Any:
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Request: {scope['method']} {scope['path']}")
+
+    def on_response(self, scope: Scope, status: int, duration: float, context: Any,
+                    error: Optional[BaseException]) -> None:
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Response: {status} ({duration * 1000:.1f} ms)")
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format records as one JSON object per line.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            data["stack"] = self.formatStack(record.stack_info)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            data["suppressed"] = suppressed
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """
+    Format records as text, noting how many records were rate-limited before this one.
+    """
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        # The note goes right after the message line, ahead of any traceback
+        text = super().formatMessage(record)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            text = f"{text} ({suppressed} similar records suppressed)"
+        return text
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Rate-limit and sample records per logger.
+
+    Limits apply to a logger and its children (e.g. "core" also covers
+    "core.module_loader"); the most specific configured name wins. The
+    rate limit is a token bucket allowing bursts of one second's worth of
+    records. Sampling only applies below WARNING, so warnings and errors
+    are never sampled away, only rate-limited.
+    """
+
+    def __init__(self, rate_limits: Optional[Dict[str, float]] = None,
+                 sample_rates: Optional[Dict[str, float]] = None):
+        """
+        Initialize the filter.
+
+        Args:
+            rate_limits: Maximum records per second, by logger name
+            sample_rates: Fraction of records below WARNING kept, by logger name
+        """
+        super().__init__()
+        self.rate_limits = dict(rate_limits or {})
+        self.sample_rates = dict(sample_rates or {})
+        self.suppressed = 0
+        # Logger name -> (rate limit, sample rate, limit key), resolved once per logger
+        self._rules: Dict[str, tuple] = {}
+        # Limit key -> [tokens, last refill time, records suppressed since last pass]
+        self._buckets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def _resolve(self, name: str) -> tuple:
+        rule = self._rules.get(name)
+        if rule is None:
+            rate = sample = key = None
+            candidate = name
+            while candidate:
+                if rate is None and candidate in self.rate_limits:
+                    rate, key = self.rate_limits[candidate], candidate
+                if sample is None and candidate in self.sample_rates:
+                    sample = self.sample_rates[candidate]
+                candidate = candidate.rpartition(".")[0]
+            if rate is None and "" in self.rate_limits:
+                rate, key = self.rate_limits[""], ""
+            if sample is None:
+                sample = self.sample_rates.get("")
+            rule = self._rules[name] = (rate, sample, key)
+        return rule
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self.rate_limits and not self.sample_rates:
+            return True
+
+        rate, sample, key = self._resolve(record.name)
+        if sample is not None and record.levelno < logging.WARNING and random.random() >= sample:
+            self.suppressed += 1
+            return False
+        if rate is None:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [rate, now, 0]
+            bucket[0] = min(rate, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                self.suppressed += 1
+                return False
+            bucket[0] -= 1
+            if bucket[2]:
+                # Let the output say how many records were dropped before this one
+                record.suppressed = bucket[2]
+                bucket[2] = 0
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    A QueueHandler that drops records instead of blocking when the queue is full.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now, since they may change after the call, but
+        # leave the exception and the formatting to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """
+    The queue, handlers and listener thread installed by setup_logging.
+    """
+
+    def __init__(self, queue_handler: NonBlockingQueueHandler,
+                 listener: logging.handlers.QueueListener, rate_filter: RateLimitFilter):
+        self.queue_handler = queue_handler
+        self.listener = listener
+        self.rate_filter = rate_filter
+        self._stopped = False
+
+    def stop(self) -> None:
+        """Write out the queued records and stop the listener thread."""
+        if self._stopped:
+            return
+        self._stopped = True
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Describe the pipeline state.
+
+        Returns:
+            Records waiting in the queue, dropped because it was full, and
+            suppressed by rate limiting or sampling.
+        """
+        return {
+            "queued": self.queue_handler.queue.qsize(),
+            "dropped": self.queue_handler.dropped,
+            "suppressed": self.rate_filter.suppressed,
+        }
+
+
+# The pipeline installed by the last setup_logging call
+_pipeline: Optional[LogPipeline] = None
+
+
+def get_log_pipeline() -> Optional[LogPipeline]:
+    """Return the log pipeline installed by setup_logging, if any."""
+    return _pipeline
+
 
 def setup_logging(app: Optional[FastAPI] = None, log_level: str = "INFO",
-                  log_format: str = None, log_file: str = None) -> logging.Logger:
+                  log_format: str = None, log_file: str = None, log_json: bool = False,
+                  log_max_bytes: int = 10 * 1024 * 1024, log_backup_count: int = 5,
+                  log_queue_size: int = 10000, log_rate_limits: Optional[Dict[str, float]] = None,
+                  log_sample_rates: Optional[Dict[str, float]] = None) -> logging.Logger:
     """
     Configure logging for Cardinal.
 
+    Installs a single queue handler on the root logger, so every logger
+    (core, modules, libraries) goes through the same non-blocking pipeline
+    and each line is written once.
+
     Args:
         app: FastAPI application instance
         log_level: Logging level to use
-        log_format: Format string for log messages
+        log_format: Format string for log messages (ignored for JSON output)
         log_file: Path to log file
+        log_json: Whether to write one JSON object per line instead of text
+        log_max_bytes: Size at which the log file is rotated (0 to never rotate)
+        log_backup_count: Number of rotated log files kept
+        log_queue_size: Maximum number of records waiting to be written
+        log_rate_limits: Maximum records per second, by logger name
+        log_sample_rates: Fraction of records below WARNING kept, by logger name
 
     Returns:
         Configured logger instance
     """
+    global _pipeline
+
     # Convert string log level to logging constant
     numeric_level = getattr(logging, log_level.upper(), None)
     if not isinstance(numeric_level, int):
@@ -32,18 +267,19 @@ def setup_logging(app: Optional[FastAPI] = None, log_level: str = "INFO",
     if log_format is None:
         log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
-    # Create logger for Cardinal
-    logger = logging.getLogger("cardinal")
-    logger.setLevel(numeric_level)
-    logger.handlers = []  # Clear existing handlers
-
     # Create formatter
-    formatter = logging.Formatter(log_format)
+    formatter = JsonFormatter() if log_json else TextFormatter(log_format)
 
-    # Add console handler
+    # Replace a pipeline installed by an earlier call. It is stopped first, so
+    # that it is done writing (and rotating) the log file before it is reopened.
+    if _pipeline is not None:
+        _pipeline.stop()
+        _pipeline = None
+
+    # Handlers doing the actual I/O, run by the listener thread
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers = [console_handler]
 
     # Add file handler if log_file is specified
     if log_file:
@@ -52,24 +288,35 @@ def setup_logging(app: Optional[FastAPI] = None, log_level: str = "INFO",
         if log_dir and not os.path.exists(log_dir):
             os.makedirs(log_dir, exist_ok=True)
 
-        file_handler = logging.FileHandler(log_file)
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=log_max_bytes, backupCount=log_backup_count, encoding="utf-8"
+        )
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-
-    # Configure basic logging
-    logging.basicConfig(
-        level=numeric_level,
-        format=log_format,
-        handlers=[logging.StreamHandler(sys.stdout)]
-    )
-
-    # If app is provided, add logging middleware
-    if app:
-        @app.middleware("http")
-        async def log_requests(request, call_next):
-            logger.debug(f"Request: {request.method} {request.url.path}")
-            response = await call_next(request)
-            logger.debug(f"Response: {response.status_code}")
-            return response
-
-    return logger
\ No newline at end of file
+        handlers.append(file_handler)
+
+    rate_filter = RateLimitFilter(log_rate_limits, log_sample_rates)
+    queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=log_queue_size))
+    queue_handler.addFilter(rate_filter)
+
+    listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _pipeline = LogPipeline(queue_handler, listener, rate_filter)
+    atexit.register(_pipeline.stop)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(numeric_level)
+
+    # Create logger for Cardinal; it propagates to the root handler
+    logger = logging.getLogger("cardinal")
+    logger.setLevel(numeric_level)
+    logger.handlers = []  # Clear existing handlers
+
+    # If app is provided, log requests. The hook is only registered when
+    # DEBUG is enabled, so requests pay nothing for it otherwise.
+    if app and logger.isEnabledFor(logging.DEBUG):
+        add_request_hook(app, RequestLogHook(logger))
+
+    return logger
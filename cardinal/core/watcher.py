@@ -0,0 +1,494 @@
+"""
+File system watchers for hot-reloading Cardinal modules.
+
+Two backends are available:
+
+- ``InotifyBackend`` uses the Linux inotify API and only wakes up when something
+  in the modules directory actually changes.
+- ``PollingBackend`` periodically lists the modules directory and is used when
+  inotify is not available (other platforms, some network filesystems).
+
+Both backends only report which modules *may* have changed. A per-file
+``StatIndex`` then confirms the change, so only touched modules are re-scanned
+and reloaded. All of this runs in a dedicated thread, never on the event loop.
+"""
+
+import os
+import sys
+import ctypes
+import ctypes.util
+import errno
+import select
+import struct
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (mtime in nanoseconds, size in bytes) of a watched file
+FileStat = Tuple[int, int]
+
+# Directories that never contain module sources
+IGNORED_DIRS = {"__pycache__"}
+
+
+class ModuleChanges:
+    """
+    A batch of changes detected in the modules directory.
+
+    Attributes:
+        changed: Mapping of module name to the set of .py files that were
+            created, modified or deleted in that module
+        removed: Names of modules that no longer exist on disk
+    """
+
+    def __init__(self):
+        self.changed: Dict[str, Set[str]] = {}
+        self.removed: Set[str] = set()
+
+    def merge(self, other: "ModuleChanges") -> None:
+        """
+        Merge a later batch of changes into this one.
+
+        Args:
+            other: Changes detected after the ones in this batch
+        """
+        for module_name in other.removed:
+            self.changed.pop(module_name, None)
+            self.removed.add(module_name)
+
+        for module_name, files in other.changed.items():
+            self.removed.discard(module_name)
+            self.changed.setdefault(module_name, set()).update(files)
+
+    def __bool__(self) -> bool:
+        return bool(self.changed or self.removed)
+
+
+class StatIndex:
+    """
+    Per-file stat index of the modules directory.
+
+    Stores the (mtime, size) of every .py file grouped by module, so that a
+    scan only has to stat the files of the modules it is asked about.
+    """
+
+    def __init__(self, root: Path):
+        """
+        Initialize the index.
+
+        Args:
+            root: Path to the modules directory
+        """
+        self.root = root
+        self.files: Dict[str, Dict[str, FileStat]] = {}
+
+    def build(self) -> None:
+        """
+        Stat every module once to seed the index.
+        """
+        self.files = {}
+        for module_name in list_module_dirs(self.root):
+            self.files[module_name] = self._stat_module(module_name)
+
+    def scan(self, module_names: Set[str]) -> ModuleChanges:
+        """
+        Re-stat the given modules and record what changed since the last scan.
+
+        Args:
+            module_names: Names of the modules to look at
+
+        Returns:
+            The changes found in those modules.
+        """
+        changes = ModuleChanges()
+
+        for module_name in module_names:
+            previous = self.files.get(module_name)
+
+            if not (self.root / module_name / "__init__.py").exists():
+                if previous is not None:
+                    del self.files[module_name]
+                    changes.removed.add(module_name)
+                continue
+
+            current = self._stat_module(module_name)
+            self.files[module_name] = current
+
+            if previous is None:
+                changes.changed[module_name] = set(current)
+                continue
+
+            changed_files = {
+                path for path, stat in current.items() if previous.get(path) != stat
+            }
+            changed_files.update(path for path in previous if path not in current)
+
+            if changed_files:
+                changes.changed[module_name] = changed_files
+
+        return changes
+
+    def _stat_module(self, module_name: str) -> Dict[str, FileStat]:
+        """
+        Stat all .py files of a module.
+
+        Args:
+            module_name: Name of the module
+
+        Returns:
+            Mapping of file path to its (mtime, size).
+        """
+        stats: Dict[str, FileStat] = {}
+
+        for root, dirs, files in os.walk(self.root / module_name):
+            dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
+            for file in files:
+                if not file.endswith(".py"):
+                    continue
+                file_path = os.path.join(root, file)
+                try:
+                    st = os.stat(file_path)
+                except FileNotFoundError:
+                    # Deleted between listing and stat
+                    continue
+                stats[file_path] = (st.st_mtime_ns, st.st_size)
+
+        return stats
+
+
+def list_module_dirs(root: Path) -> Set[str]:
+    """
+    List the module directories (folders with an __init__.py) under root.
+
+    Args:
+        root: Path to the modules directory
+
+    Returns:
+        The set of module names.
+    """
+    modules = set()
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.is_dir() and os.path.exists(os.path.join(entry.path, "__init__.py")):
+                    modules.add(entry.name)
+    except FileNotFoundError:
+        pass
+    return modules
+
+
+class PollingBackend:
+    """
+    Watcher backend that reports every module as a candidate on each interval.
+    """
+
+    name = "polling"
+
+    def __init__(self, root: Path, stop_event: threading.Event):
+        self.root = root
+        self.stop_event = stop_event
+
+    def wait(self, timeout: float, known_modules: Set[str]) -> Set[str]:
+        """
+        Wait for the next polling interval.
+
+        Args:
+            timeout: How long to wait, in seconds
+            known_modules: Modules currently present in the stat index
+
+        Returns:
+            The names of the modules to re-scan.
+        """
+        if self.stop_event.wait(timeout):
+            return set()
+        return list_module_dirs(self.root) | known_modules
+
+    def close(self) -> None:
+        pass
+
+
+# inotify constants, see inotify(7)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyBackend:
+    """
+    Watcher backend based on Linux inotify.
+
+    Every directory below the modules directory gets its own watch, and events
+    are mapped back to the module they belong to.
+    """
+
+    name = "inotify"
+
+    def __init__(self, root: Path, stop_event: threading.Event):
+        """
+        Initialize the inotify instance and watch the modules directory.
+
+        Args:
+            root: Path to the modules directory
+            stop_event: Event set when the watcher is stopping
+
+        Raises:
+            OSError: If inotify is not available on this system.
+        """
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not supported by the C library")
+
+        self._libc = libc
+        self.root = root
+        self.stop_event = stop_event
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        # Watch descriptor -> (directory path, module name or None for the root)
+        self.watches: Dict[int, Tuple[str, Optional[str]]] = {}
+        self._add_watch(str(self.root), None)
+        for module_name in list_module_dirs(self.root):
+            self._add_tree(module_name)
+
+    def _add_watch(self, path: str, module_name: Optional[str]) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if module_name is None:
+                raise OSError(err, os.strerror(err), path)
+            # The directory may already be gone again, the next scan will notice
+            logger.debug(f"Could not watch {path}: {os.strerror(err)}")
+            return
+        self.watches[wd] = (path, module_name)
+
+    def _add_tree(self, module_name: str) -> None:
+        for root, dirs, _ in os.walk(self.root / module_name):
+            dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
+            self._add_watch(root, module_name)
+
+    def wait(self, timeout: float, known_modules: Set[str]) -> Set[str]:
+        """
+        Wait for file system events.
+
+        Args:
+            timeout: Maximum time to wait, in seconds
+            known_modules: Modules currently present in the stat index
+
+        Returns:
+            The names of the modules touched by the events received.
+        """
+        touched: Set[str] = set()
+        if self.stop_event.is_set():
+            return touched
+
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return touched
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return touched
+
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost, fall back to a full scan
+                logger.warning("inotify event queue overflowed, rescanning all modules")
+                return list_module_dirs(self.root) | known_modules
+
+            watch = self.watches.get(wd)
+            if watch is None:
+                continue
+            path, module_name = watch
+
+            if mask & IN_IGNORED:
+                del self.watches[wd]
+                continue
+
+            if module_name is None:
+                # Event on the modules directory itself: a module was added or removed
+                if name and mask & IN_ISDIR and name not in IGNORED_DIRS:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        self._add_tree(name)
+                    touched.add(name)
+                continue
+
+            if mask & IN_ISDIR:
+                if name in IGNORED_DIRS:
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_tree_at(os.path.join(path, name), module_name)
+                touched.add(module_name)
+            elif not name or name.endswith(".py"):
+                touched.add(module_name)
+
+        return touched
+
+    def _add_tree_at(self, path: str, module_name: str) -> None:
+        for root, dirs, _ in os.walk(path):
+            dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
+            self._add_watch(root, module_name)
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class ModuleWatcher:
+    """
+    Runs a watcher backend in a background thread and reports debounced,
+    confirmed module changes through a callback.
+    """
+
+    def __init__(self, root: Path, callback: Callable[[ModuleChanges], None],
+                 backend: str = "auto", debounce: float = 0.5,
+                 poll_interval: float = 2.0, max_delay: float = 5.0,
+                 baseline: Optional[Dict[str, Dict[str, FileStat]]] = None):
+        """
+        Initialize the watcher.
+
+        Args:
+            root: Path to the modules directory
+            callback: Called from the watcher thread with each batch of changes
+            backend: "inotify", "polling" or "auto" to prefer inotify
+            debounce: Quiet period in seconds before a batch of changes is reported
+            poll_interval: Interval in seconds between scans of the polling backend
+            max_delay: Maximum time in seconds a batch can be held back by debouncing
+            baseline: Files of an earlier StatIndex to start from. The differences
+                between it and the modules directory are reported as the first batch
+                of changes; without it, the watcher only reports later changes.
+        """
+        self.root = root
+        self.callback = callback
+        self.backend_name = backend
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.max_delay = max_delay
+        self.index = StatIndex(root)
+        self.baseline = baseline
+        self.backend = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _create_backend(self):
+        if self.backend_name in ("auto", "inotify"):
+            try:
+                return InotifyBackend(self.root, self._stop_event)
+            except OSError as e:
+                if self.backend_name == "inotify":
+                    logger.warning(f"inotify watcher unavailable ({e}), falling back to polling")
+                else:
+                    logger.debug(f"inotify watcher unavailable ({e}), using polling")
+        return PollingBackend(self.root, self._stop_event)
+
+    def start(self) -> None:
+        """
+        Start the watcher thread.
+        """
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="cardinal-module-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Ask the watcher thread to stop. The thread exits after its current wait.
+        """
+        self._stop_event.set()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait for the watcher thread to exit.
+
+        Args:
+            timeout: Maximum time to wait, in seconds
+        """
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        try:
+            # The backend is created before the index is built so that changes
+            # made while building it are not lost
+            self.backend = self._create_backend()
+            if self.baseline is None:
+                self.index.build()
+                changes = ModuleChanges()
+            else:
+                self.index.files = {name: dict(files) for name, files in self.baseline.items()}
+                changes = self.index.scan(list_module_dirs(self.root) | set(self.index.files))
+            logger.info(f"Module watcher started using the {self.backend.name} backend")
+        except Exception as e:
+            logger.error(f"Could not start module watcher: {str(e)}")
+            return
+
+        try:
+            if changes:
+                self.callback(changes)
+            while not self._stop_event.is_set():
+                try:
+                    changes = self._next_changes()
+                    if changes and not self._stop_event.is_set():
+                        self.callback(changes)
+                except Exception as e:
+                    logger.error(f"Error in module watcher: {str(e)}")
+                    self._stop_event.wait(5)  # Sleep longer on error
+        finally:
+            self.backend.close()
+
+    def _next_changes(self) -> ModuleChanges:
+        """
+        Wait for a change, then keep collecting until the modules directory has
+        been quiet for the debounce period.
+
+        Returns:
+            The debounced batch of changes (may be empty).
+        """
+        candidates = self.backend.wait(self.poll_interval, set(self.index.files))
+        changes = self.index.scan(candidates) if candidates else ModuleChanges()
+        if not changes:
+            return changes
+
+        deadline = time.monotonic() + self.max_delay
+        while time.monotonic() < deadline and not self._stop_event.is_set():
+            candidates = self.backend.wait(self.debounce, set(self.index.files))
+            more = self.index.scan(candidates) if candidates else ModuleChanges()
+            if not more:
+                break
+            changes.merge(more)
+
+        return changes
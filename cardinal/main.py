@@ -16,13 +16,25 @@ config = CoreConfig()
 logger = setup_logging(
     log_level=config.log_level,
     log_format=config.log_format,
-    log_file=config.log_file
+    log_file=config.log_file,
+    log_json=config.log_json,
+    log_max_bytes=config.log_max_bytes,
+    log_backup_count=config.log_backup_count,
+    log_queue_size=config.log_queue_size,
+    log_rate_limits=config.log_rate_limits,
+    log_sample_rates=config.log_sample_rates
 )
 
 # Create the FastAPI application
 app = create_app(config)
 
 # Setup error handlers
-setup_error_handlers(app)
+setup_error_handlers(
+    app,
+    error_window=config.error_window,
+    error_max_fingerprints=config.error_max_fingerprints,
+    error_body_echo_bytes=config.error_body_echo_bytes,
+    errors_url=config.errors_url
+)
 
 logger.info(f"Cardinal initialized with config: {config.dict()}")
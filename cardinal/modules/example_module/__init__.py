@@ -2,7 +2,7 @@
 Example module for Cardinal.
 """
 
-from .routes import router
+from .routes import on_load, on_unload, on_warmup, router
 
 # This is important for auto-discovery
-__all__ = ["router"]
\ No newline at end of file
+__all__ = ["router", "on_load", "on_unload", "on_warmup"]
\ No newline at end of file
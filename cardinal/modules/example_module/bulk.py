@@ -0,0 +1,227 @@
+"""
+Request handling shared by the bulk endpoints of the example module.
+
+A bulk request body is either a JSON array or NDJSON (one JSON value per
+line). JSON arrays are validated in one pass and applied in a single storage
+call. NDJSON bodies are read as a stream and applied in chunks, so an import
+never has to be held in memory all at once.
+"""
+
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Tuple, Type
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+
+from .models import BulkItemResult, BulkResponse
+
+# Content types read as newline-delimited JSON
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl", "application/jsonlines")
+
+# Number of NDJSON entries validated and applied together
+BULK_CHUNK_SIZE = 1000
+
+# Failed entries listed in the response to an NDJSON request
+MAX_REPORTED_FAILURES = 1000
+
+Entry = Tuple[int, Any]
+ApplyChunk = Callable[[List[Entry]], Awaitable[List[BulkItemResult]]]
+
+
+def parse_model(model: Type[BaseModel]) -> Callable[[Any], BaseModel]:
+    """
+    Return a parser that validates a decoded JSON value as a model.
+
+    Args:
+        model: The pydantic model of an entry
+
+    Returns:
+        A function building the model from a JSON object
+    """
+    def parse(raw: Any) -> BaseModel:
+        if not isinstance(raw, dict):
+            raise ValueError("Expected a JSON object")
+        return model(**raw)
+    return parse
+
+
+def parse_item_id(raw: Any) -> int:
+    """
+    Validate an entry of a bulk delete: an item ID, or an object with an "id".
+
+    Args:
+        raw: The decoded JSON value
+
+    Returns:
+        The item ID
+    """
+    if isinstance(raw, dict):
+        raw = raw.get("id")
+    if not isinstance(raw, int) or isinstance(raw, bool):
+        raise ValueError("Expected an item ID")
+    return raw
+
+
+def validate_batch(entries: List[Tuple[int, Any]],
+                   parse: Callable[[Any], Any]) -> Tuple[List[Entry], List[BulkItemResult]]:
+    """
+    Validate every entry of a batch.
+
+    Invalid entries are reported individually instead of rejecting the
+    whole batch.
+
+    Args:
+        entries: (index, decoded JSON value) pairs
+        parse: Validates one value and returns the parsed entry
+
+    Returns:
+        The valid (index, parsed entry) pairs and the results of the invalid entries
+    """
+    valid: List[Entry] = []
+    rejected: List[BulkItemResult] = []
+
+    for index, raw in entries:
+        try:
+            valid.append((index, parse(raw)))
+        except ValidationError as e:
+            rejected.append(BulkItemResult(index=index, status=422, detail=json.loads(e.json())))
+        except (TypeError, ValueError) as e:
+            rejected.append(BulkItemResult(index=index, status=422, detail=str(e)))
+
+    return valid, rejected
+
+
+def bulk_request_body(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Describe a bulk request body for the OpenAPI schema.
+
+    The endpoints read the body themselves, so FastAPI cannot document it.
+
+    Args:
+        schema: JSON schema of one entry
+
+    Returns:
+        The ``openapi_extra`` of the route
+    """
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": schema}},
+                NDJSON_MEDIA_TYPES[0]: {"schema": schema},
+            },
+        }
+    }
+
+
+def is_ndjson(request: Request) -> bool:
+    """Check whether a request body is NDJSON."""
+    content_type = request.headers.get("content-type", "")
+    return content_type.split(";")[0].strip().lower() in NDJSON_MEDIA_TYPES
+
+
+async def iter_ndjson_chunks(request: Request, chunk_size: int) -> AsyncIterator[List[Tuple[int, Any]]]:
+    """
+    Read an NDJSON request body as it arrives, in chunks of entries.
+
+    Args:
+        request: The incoming request
+        chunk_size: Maximum number of entries per chunk
+
+    Yields:
+        Lists of (index, decoded JSON value) pairs. Lines that are not valid
+        JSON are passed on as the exception raised while decoding them.
+    """
+    chunk: List[Tuple[int, Any]] = []
+    index = 0
+    buffer = b""
+
+    def decode(line: bytes) -> Any:
+        try:
+            return json.loads(line)
+        except ValueError as e:
+            return e
+
+    async for data in request.stream():
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if not line.strip():
+                continue
+            chunk.append((index, decode(line)))
+            index += 1
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+    if buffer.strip():
+        chunk.append((index, decode(buffer)))
+    if chunk:
+        yield chunk
+
+
+def _parse_decoded(parse: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """Wrap a parser so that NDJSON decoding errors are reported like validation errors."""
+    def parse_line(raw: Any) -> Any:
+        if isinstance(raw, ValueError):
+            raise ValueError(f"Invalid JSON: {str(raw)}")
+        return parse(raw)
+    return parse_line
+
+
+async def run_bulk(request: Request, parse: Callable[[Any], Any], apply_chunk: ApplyChunk,
+                   chunk_size: int = BULK_CHUNK_SIZE) -> BulkResponse:
+    """
+    Validate and apply the entries of a bulk request.
+
+    Args:
+        request: The incoming request, with a JSON array or NDJSON body
+        parse: Validates one entry and returns the parsed entry
+        apply_chunk: Applies a list of valid (index, entry) pairs and
+            returns their results
+        chunk_size: Number of NDJSON entries applied together
+
+    Returns:
+        The counts of applied and rejected entries with the per-entry
+        results. For NDJSON bodies only failed entries are listed.
+    """
+    if is_ndjson(request):
+        return await _run_ndjson(request, _parse_decoded(parse), apply_chunk, chunk_size)
+
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body is not valid JSON")
+    if not isinstance(body, list):
+        raise HTTPException(status_code=422, detail="Expected a JSON array")
+
+    valid, results = validate_batch(list(enumerate(body)), parse)
+    if valid:
+        results.extend(await apply_chunk(valid))
+    results.sort(key=lambda result: result.index)
+
+    succeeded = sum(1 for result in results if result.status < 400)
+    return BulkResponse(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+
+async def _run_ndjson(request: Request, parse: Callable[[Any], Any], apply_chunk: ApplyChunk,
+                      chunk_size: int) -> BulkResponse:
+    succeeded = 0
+    failed = 0
+    failures: List[BulkItemResult] = []
+
+    async for entries in iter_ndjson_chunks(request, chunk_size):
+        valid, results = validate_batch(entries, parse)
+        if valid:
+            results.extend(await apply_chunk(valid))
+
+        for result in results:
+            if result.status < 400:
+                succeeded += 1
+                continue
+            failed += 1
+            if len(failures) < MAX_REPORTED_FAILURES:
+                failures.append(result)
+
+    failures.sort(key=lambda result: result.index)
+    return BulkResponse(succeeded=succeeded, failed=failed, results=failures)
@@ -0,0 +1,286 @@
+"""
+Compact columnar storage backend for the example module.
+
+Each field is stored in its own column: numbers and timestamps in typed
+arrays, strings as UTF-8 in a single packed buffer. An item then costs
+around a hundred bytes instead of the kilobyte or so of a pydantic model
+with its dict and field objects. Models are only built for the items a
+request actually returns.
+"""
+
+import itertools
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import Item
+from .storage import EXAMPLE_ITEMS, ItemQuery, ItemStorage
+
+# Timestamps are stored as microseconds since this (naive) epoch
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+# Stored in place of a missing timestamp
+NO_TIMESTAMP = -(2 ** 63)
+
+
+def _to_micros(value: Optional[datetime]) -> int:
+    """Convert a datetime to microseconds since the epoch, in local time."""
+    if value is None:
+        return NO_TIMESTAMP
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return (value - EPOCH) // ONE_MICROSECOND
+
+
+def _from_micros(value: int) -> Optional[datetime]:
+    """Convert microseconds since the epoch back to a naive datetime."""
+    if value == NO_TIMESTAMP:
+        return None
+    return EPOCH + timedelta(microseconds=value)
+
+
+class PackedStrings:
+    """
+    A column of optional strings packed as UTF-8 in one buffer.
+
+    Replaced and deleted strings leave unused bytes behind; the buffer is
+    compacted once they make up more than half of it.
+    """
+
+    __slots__ = ("buffer", "offsets", "lengths", "garbage")
+
+    # Buffers smaller than this are never compacted
+    MIN_COMPACT_SIZE = 64 * 1024
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.offsets = array("q")
+        self.lengths = array("q")  # -1 for None
+        self.garbage = 0
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def _write(self, value: Optional[str]) -> Tuple[int, int]:
+        if value is None:
+            return len(self.buffer), -1
+        data = value.encode("utf-8")
+        offset = len(self.buffer)
+        self.buffer += data
+        return offset, len(data)
+
+    def append(self, value: Optional[str]) -> None:
+        offset, length = self._write(value)
+        self.offsets.append(offset)
+        self.lengths.append(length)
+
+    def get(self, row: int) -> Optional[str]:
+        length = self.lengths[row]
+        if length < 0:
+            return None
+        offset = self.offsets[row]
+        return self.buffer[offset:offset + length].decode("utf-8")
+
+    def set(self, row: int, value: Optional[str]) -> None:
+        self.garbage += max(0, self.lengths[row])
+        self.offsets[row], self.lengths[row] = self._write(value)
+        self._maybe_compact()
+
+    def delete(self, row: int) -> None:
+        self.garbage += max(0, self.lengths[row])
+        del self.offsets[row]
+        del self.lengths[row]
+        self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        if len(self.buffer) >= self.MIN_COMPACT_SIZE and self.garbage * 2 > len(self.buffer):
+            self.compact()
+
+    def compact(self) -> None:
+        """Rewrite the buffer without the unused bytes."""
+        buffer = bytearray()
+        for row, length in enumerate(self.lengths):
+            offset = self.offsets[row]
+            self.offsets[row] = len(buffer)
+            if length > 0:
+                buffer += self.buffer[offset:offset + length]
+        self.buffer = buffer
+        self.garbage = 0
+
+    def nbytes(self) -> int:
+        """Size of the column's buffers in bytes."""
+        return (len(self.buffer) + self.offsets.itemsize * len(self.offsets)
+                + self.lengths.itemsize * len(self.lengths))
+
+
+class ItemRow:
+    """
+    Read-only view of one row of a CompactItemStorage.
+
+    Reads the columns on attribute access, without building a model. A view
+    is only valid until the next write to the storage.
+    """
+
+    __slots__ = ("storage", "row")
+
+    def __init__(self, storage: "CompactItemStorage", row: int):
+        self.storage = storage
+        self.row = row
+
+    @property
+    def id(self) -> int:
+        return self.storage.ids[self.row]
+
+    @property
+    def name(self) -> str:
+        return self.storage.names.get(self.row)
+
+    @property
+    def description(self) -> Optional[str]:
+        return self.storage.descriptions.get(self.row)
+
+    @property
+    def price(self) -> float:
+        return self.storage.prices[self.row]
+
+    @property
+    def is_active(self) -> bool:
+        return bool(self.storage.active[self.row])
+
+    @property
+    def created_at(self) -> datetime:
+        return _from_micros(self.storage.created[self.row])
+
+    @property
+    def updated_at(self) -> Optional[datetime]:
+        return _from_micros(self.storage.updated[self.row])
+
+    def to_item(self) -> Item:
+        """Build the pydantic model of the row."""
+        return Item(
+            id=self.id,
+            name=self.name,
+            description=self.description,
+            price=self.price,
+            is_active=self.is_active,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+        )
+
+
+class CompactItemStorage(ItemStorage):
+    """
+    Stores items in memory as columns instead of one model per item.
+
+    Rows are kept in ID order, so an ID is found with a binary search and
+    no per-item dictionary entry is needed. Filtered queries scan the
+    columns from the cursor instead of using secondary indexes, trading
+    filter speed for memory.
+    """
+
+    def __init__(self):
+        """Initialize the storage with the example items."""
+        self.ids = array("q")
+        self.prices = array("d")
+        self.active = bytearray()
+        self.created = array("q")
+        self.updated = array("q")
+        self.names = PackedStrings()
+        self.descriptions = PackedStrings()
+        # IDs to assign, shared with a storage adopting this one
+        self.next_ids = itertools.count(1)
+
+        for data in EXAMPLE_ITEMS:
+            self.create(dict(data, created_at=datetime.now()))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _find_row(self, item_id: int) -> Optional[int]:
+        row = bisect_left(self.ids, item_id)
+        if row < len(self.ids) and self.ids[row] == item_id:
+            return row
+        return None
+
+    def get(self, item_id: int) -> Optional[Item]:
+        row = self._find_row(item_id)
+        return ItemRow(self, row).to_item() if row is not None else None
+
+    def get_page(self, cursor: Optional[int], limit: int, skip: int,
+                 query: Optional[ItemQuery] = None) -> Tuple[List[Item], Optional[int]]:
+        start = bisect_right(self.ids, cursor) if cursor is not None else 0
+
+        if query is None or query.is_empty():
+            start += skip
+            rows = range(start, min(start + limit, len(self.ids)))
+            has_more = start + limit < len(self.ids)
+        else:
+            # Collect one extra match to know whether there is a next page
+            matched: List[int] = []
+            for row in range(start, len(self.ids)):
+                if not query.matches(ItemRow(self, row)):
+                    continue
+                if skip:
+                    skip -= 1
+                    continue
+                matched.append(row)
+                if len(matched) > limit:
+                    break
+            rows = matched[:limit]
+            has_more = len(matched) > limit
+
+        items = [ItemRow(self, row).to_item() for row in rows]
+        next_cursor = items[-1].id if has_more and items else None
+        return items, next_cursor
+
+    def create(self, data: Dict[str, Any]) -> Item:
+        item_id = next(self.next_ids)
+
+        # IDs only grow, so appending keeps the rows in ID order
+        self.ids.append(item_id)
+        self.prices.append(data["price"])
+        self.active.append(1 if data.get("is_active", True) else 0)
+        self.created.append(_to_micros(data["created_at"]))
+        self.updated.append(_to_micros(data.get("updated_at")))
+        self.names.append(data["name"])
+        self.descriptions.append(data.get("description"))
+
+        return ItemRow(self, len(self.ids) - 1).to_item()
+
+    def update(self, item_id: int, changes: Dict[str, Any]) -> Optional[Item]:
+        row = self._find_row(item_id)
+        if row is None:
+            return None
+
+        for field, value in changes.items():
+            if field == "name":
+                self.names.set(row, value)
+            elif field == "description":
+                self.descriptions.set(row, value)
+            elif field == "price":
+                self.prices[row] = value
+            elif field == "is_active":
+                self.active[row] = 1 if value else 0
+            elif field == "updated_at":
+                self.updated[row] = _to_micros(value)
+
+        return ItemRow(self, row).to_item()
+
+    def delete(self, item_id: int) -> bool:
+        row = self._find_row(item_id)
+        if row is None:
+            return False
+
+        for column in (self.ids, self.prices, self.active, self.created, self.updated):
+            del column[row]
+        self.names.delete(row)
+        self.descriptions.delete(row)
+        return True
+
+    def nbytes(self) -> int:
+        """Size of the storage's column buffers in bytes."""
+        arrays = (self.ids, self.prices, self.created, self.updated)
+        return (sum(column.itemsize * len(column) for column in arrays) + len(self.active)
+                + self.names.nbytes() + self.descriptions.nbytes())
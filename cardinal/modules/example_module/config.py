@@ -0,0 +1,28 @@
+"""
+Configuration for the example module.
+"""
+
+from pydantic_settings import BaseSettings
+
+
+class ItemSettings(BaseSettings):
+    """
+    Configuration settings for the example module.
+
+    Attributes:
+        storage: Storage backend for items ("memory", "compact" or "sqlite")
+        sqlite_path: Path of the SQLite database file
+        sqlite_pool_size: Number of pooled SQLite connections
+        json_cache_size: Maximum number of serialized items cached for GET /items/{id}
+    """
+    storage: str = "memory"
+    sqlite_path: str = "data/items.db"
+    sqlite_pool_size: int = 4
+    json_cache_size: int = 10000
+
+    class Config:
+        """Configuration for the settings class"""
+        env_prefix = "CARDINAL_ITEMS_"
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+        extra = "ignore"
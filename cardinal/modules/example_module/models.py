@@ -2,8 +2,8 @@
 Data models for the example module.
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, validator
+from typing import Any, List, Optional
 from datetime import datetime
 
 class ItemBase(BaseModel):
@@ -24,6 +24,17 @@ class ItemUpdate(BaseModel):
     price: Optional[float] = Field(None, description="Price of the item", ge=0)
     is_active: Optional[bool] = Field(None, description="Whether the item is active")
 
+    @validator("name", "price", "is_active", pre=True)
+    def reject_null(cls, value):
+        """Reject an explicit null for fields an item cannot be without; omit them instead."""
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+class ItemBulkUpdate(ItemUpdate):
+    """Model for one entry of a bulk update."""
+    id: int = Field(..., description="ID of the item to update")
+
 class Item(ItemBase):
     """Model for an item."""
     id: int = Field(..., description="Unique identifier for the item")
@@ -32,4 +43,21 @@ class Item(ItemBase):
     
     class Config:
         """Configuration for the model."""
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class BulkItemResult(BaseModel):
+    """Outcome of one entry of a bulk request."""
+    index: int = Field(..., description="Position of the entry in the request, starting at 0")
+    status: int = Field(..., description="HTTP status code the entry would have had on its own")
+    id: Optional[int] = Field(None, description="ID of the item, when known")
+    item: Optional[Item] = Field(None, description="The created or updated item")
+    detail: Optional[Any] = Field(None, description="Why the entry failed")
+
+class BulkResponse(BaseModel):
+    """Model for the response of a bulk request."""
+    succeeded: int = Field(..., description="Number of entries applied")
+    failed: int = Field(..., description="Number of entries rejected")
+    results: List[BulkItemResult] = Field(
+        ...,
+        description="Per-entry results. For NDJSON requests only the first 1000 failed entries are listed.",
+    )
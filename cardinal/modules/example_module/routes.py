@@ -2,40 +2,248 @@
 API routes for the example module.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
-from typing import List, Optional
-from .models import Item, ItemCreate, ItemUpdate
-from .services import ItemService
+import hashlib
+import sys
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+from core.executors import run_sync
+from core.lifecycle import ModuleContext
+from core.responses import ModelJSONResponse, RawJSONResponse
+from .bulk import Entry, bulk_request_body, parse_item_id, parse_model, run_bulk
+from .config import ItemSettings
+from .models import BulkItemResult, BulkResponse, Item, ItemBulkUpdate, ItemCreate, ItemUpdate
+from .services import ItemService, create_storage
+from .storage import ItemQuery, ItemStorage
 
 # Create router with prefix and tags
 router = APIRouter(prefix="/items", tags=["Items"])
 
 # Initialize service
-item_service = ItemService()
+settings = ItemSettings()
+item_service = ItemService(create_storage(settings), json_cache_size=settings.json_cache_size)
+
+# Storage of the previous version of the module whose state is taken over
+adopted_storage: Optional[ItemStorage] = None
+
+
+async def call_service(func, *args, **kwargs):
+    """
+    Call an ItemService method, in the module's own thread pool if the storage backend blocks.
+    """
+    if item_service.storage.blocking:
+        return await run_sync(func, *args, **kwargs)
+    return func(*args, **kwargs)
+
+
+def next_chunk(iterator: Iterator[bytes]) -> Optional[bytes]:
+    """Return the next chunk of an iterator, or None once it is exhausted."""
+    return next(iterator, None)
+
+
+async def stream_service(iterator: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Iterate over an ItemService generator, in the module's own thread pool if the storage backend blocks.
+    """
+    if item_service.storage.blocking:
+        # One call per chunk, so that the pool's size and draining apply to the stream
+        while True:
+            chunk = await run_sync(next_chunk, iterator)
+            if chunk is None:
+                return
+            yield chunk
+    else:
+        for chunk in iterator:
+            yield chunk
+
+
+def storage_version(storage: ItemStorage) -> Tuple[str, str, str]:
+    """
+    Identify the code and settings of a storage backend.
+
+    A reload imports the storage classes again, so their identity cannot be
+    compared across versions of the module; their name and source can.
+    """
+    backend = type(storage)
+    with open(sys.modules[backend.__module__].__file__, "rb") as source:
+        digest = hashlib.sha1(source.read()).hexdigest()
+    return f"{backend.__module__}.{backend.__qualname__}", digest, repr(sorted(settings.dict().items()))
+
+
+async def on_load(context: ModuleContext) -> None:
+    """
+    Pick the storage of the previous version of the module to adopt, if compatible.
+
+    A reload then keeps the stored items and the open SQLite connections
+    instead of starting empty and reconnecting. The storage is only adopted
+    if its code and the settings are unchanged.
+    """
+    global adopted_storage
+    previous = context.state.get("storage")
+    if previous is not None and context.state.get("storage_version") == storage_version(item_service.storage):
+        adopted_storage = previous
+
+
+async def on_warmup(context: ModuleContext) -> None:
+    """
+    Take over the adopted storage and JSON cache, fill the cache with the
+    first items, and record both for the next version of the module.
+
+    The state is taken over here rather than in on_load, right before the
+    routes are swapped. It is recorded last: if a hook fails, the previous
+    version keeps serving and remains the one to adopt. The previous
+    version's storage is recorded too, for its on_unload.
+    """
+    if adopted_storage is not None:
+        item_service.storage.close()
+        # The previous version keeps serving until the routes are swapped, so
+        # its writes must invalidate the cache this version serves from
+        item_service.adopt(adopted_storage, context.state["json_cache"])
+    await call_service(item_service.warm_json_cache)
+    context.state["previous_storage"] = context.state.get("storage")
+    context.state["storage"] = item_service.storage
+    context.state["json_cache"] = item_service.json_cache
+    context.state["storage_version"] = storage_version(item_service.storage)
+    context.state["adopted_storage"] = adopted_storage
+
+
+async def on_unload(context: ModuleContext) -> None:
+    """
+    Close the storage, unless the next version of the module adopted it.
+
+    The storage to close is taken from the context rather than from the
+    module globals, which may already belong to the next version.
+    """
+    if context.reloading:
+        storage = context.state.pop("previous_storage", None)
+        if storage is None or storage is context.state.get("adopted_storage"):
+            return
+    else:
+        storage = context.state.get("storage") or item_service.storage
+    storage.close()
 
 @router.get("/", response_model=List[Item])
-async def get_items(skip: int = 0, limit: int = 10):
+async def get_items(
+    skip: int = Query(0, ge=0, description="Number of items to skip"),
+    limit: int = Query(10, ge=0, description="Maximum number of items to return"),
+    cursor: Optional[int] = Query(None, description="Return items after this ID (from X-Next-Cursor)"),
+    is_active: Optional[bool] = Query(None, description="Only active or only inactive items"),
+    min_price: Optional[float] = Query(None, ge=0, description="Minimum price, inclusive"),
+    max_price: Optional[float] = Query(None, ge=0, description="Maximum price, inclusive"),
+    name_prefix: Optional[str] = Query(None, min_length=1, description="Only items whose name starts with this (case-sensitive)")
+):
     """
-    Get a list of items with pagination.
+    Get a list of items with pagination and optional filters.
+
+    Pass the X-Next-Cursor response header back as `cursor` to get the next
+    page; deep pages then cost the same as the first one. Filters are
+    answered from secondary indexes and combine with pagination.
     """
-    return item_service.get_items(skip=skip, limit=limit)
+    query = ItemQuery(is_active=is_active, min_price=min_price, max_price=max_price,
+                      name_prefix=name_prefix)
+    items, next_cursor = await call_service(
+        item_service.get_items_page, cursor=cursor, limit=limit, skip=skip, query=query
+    )
+    # The storage built these models, so they are sent without validating them again
+    headers = {"X-Next-Cursor": str(next_cursor)} if next_cursor is not None else None
+    return ModelJSONResponse(items, headers=headers)
 
 @router.post("/", response_model=Item, status_code=201)
 async def create_item(item: ItemCreate):
     """
     Create a new item.
     """
-    return item_service.create_item(item)
+    created = await call_service(item_service.create_item, item)
+    return ModelJSONResponse(created, status_code=201)
+
+# The export and bulk routes are declared before /{item_id} so that their
+# paths are not taken for an item ID
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "One item per line"}},
+)
+async def export_items(
+    chunk_size: int = Query(500, ge=1, le=10000, description="Number of items read from storage at a time")
+):
+    """
+    Export every item as NDJSON (one JSON item per line).
+
+    Items are read and sent one page at a time, so memory use does not
+    grow with the collection and the first items are sent right away.
+    """
+    return StreamingResponse(
+        stream_service(item_service.export_ndjson(chunk_size)),
+        media_type="application/x-ndjson",
+    )
+
+async def apply_create(entries: List[Entry]) -> List[BulkItemResult]:
+    items = await call_service(item_service.create_items, [item for _, item in entries])
+    return [
+        BulkItemResult(index=index, status=201, id=item.id, item=item)
+        for (index, _), item in zip(entries, items)
+    ]
+
+async def apply_update(entries: List[Entry]) -> List[BulkItemResult]:
+    items = await call_service(item_service.update_items, [update for _, update in entries])
+    return [
+        BulkItemResult(index=index, status=200, id=update.id, item=item) if item is not None
+        else BulkItemResult(index=index, status=404, id=update.id, detail="Item not found")
+        for (index, update), item in zip(entries, items)
+    ]
+
+async def apply_delete(entries: List[Entry]) -> List[BulkItemResult]:
+    deleted = await call_service(item_service.delete_items, [item_id for _, item_id in entries])
+    return [
+        BulkItemResult(index=index, status=204 if success else 404, id=item_id,
+                       detail=None if success else "Item not found")
+        for (index, item_id), success in zip(entries, deleted)
+    ]
+
+@router.post("/bulk", response_model=BulkResponse,
+             openapi_extra=bulk_request_body(ItemCreate.schema()))
+async def create_items_bulk(request: Request):
+    """
+    Create many items in one request.
+
+    Send a JSON array of items, or NDJSON (`Content-Type: application/x-ndjson`,
+    one item per line) for large imports: it is streamed and applied in chunks.
+    Invalid entries are reported individually and do not stop the others.
+    """
+    return await run_bulk(request, parse_model(ItemCreate), apply_create)
+
+@router.patch("/bulk", response_model=BulkResponse,
+              openapi_extra=bulk_request_body(ItemBulkUpdate.schema()))
+async def update_items_bulk(request: Request):
+    """
+    Update many items in one request.
+
+    Each entry holds the `id` of the item and the fields to change. The body
+    is a JSON array or NDJSON, as for bulk creation.
+    """
+    return await run_bulk(request, parse_model(ItemBulkUpdate), apply_update)
+
+@router.delete("/bulk", response_model=BulkResponse,
+               openapi_extra=bulk_request_body({"type": "integer", "title": "Item ID"}))
+async def delete_items_bulk(request: Request):
+    """
+    Delete many items in one request.
+
+    The body is a JSON array of item IDs, or NDJSON with one ID per line.
+    """
+    return await run_bulk(request, parse_item_id, apply_delete)
 
 @router.get("/{item_id}", response_model=Item)
 async def get_item(item_id: int = Path(..., description="The ID of the item to get")):
     """
     Get a specific item by ID.
     """
-    item = item_service.get_item(item_id)
-    if item is None:
+    # Serve the cached JSON directly, skipping response_model validation
+    payload = await call_service(item_service.get_item_json, item_id)
+    if payload is None:
         raise HTTPException(status_code=404, detail="Item not found")
-    return item
+    return RawJSONResponse(payload)
 
 @router.put("/{item_id}", response_model=Item)
 async def update_item(
@@ -45,17 +253,17 @@ async def update_item(
     """
     Update an existing item.
     """
-    item = item_service.update_item(item_id, item_update)
+    item = await call_service(item_service.update_item, item_id, item_update)
     if item is None:
         raise HTTPException(status_code=404, detail="Item not found")
-    return item
+    return ModelJSONResponse(item)
 
 @router.delete("/{item_id}", status_code=204)
 async def delete_item(item_id: int = Path(..., description="The ID of the item to delete")):
     """
     Delete an item.
     """
-    success = item_service.delete_item(item_id)
+    success = await call_service(item_service.delete_item, item_id)
     if not success:
         raise HTTPException(status_code=404, detail="Item not found")
     return None
\ No newline at end of file
@@ -2,39 +2,90 @@
 Business logic for the example module.
 """
 
-from typing import List, Optional, Dict
+import threading
+from collections import OrderedDict
+from typing import Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
-from .models import Item, ItemCreate, ItemUpdate
+from core.responses import dump_model
+from .compact import CompactItemStorage
+from .config import ItemSettings
+from .models import Item, ItemBulkUpdate, ItemCreate, ItemUpdate
+from .storage import ItemQuery, ItemStorage, MemoryItemStorage, SQLiteItemStorage
+
+def create_storage(settings: ItemSettings) -> ItemStorage:
+    """
+    Create the storage backend selected in the settings.
+
+    Args:
+        settings: Settings of the example module
+
+    Returns:
+        The storage backend
+    """
+    if settings.storage == "sqlite":
+        return SQLiteItemStorage(settings.sqlite_path, pool_size=settings.sqlite_pool_size)
+    if settings.storage == "memory":
+        return MemoryItemStorage()
+    if settings.storage == "compact":
+        return CompactItemStorage()
+    raise ValueError(f"Unknown item storage backend: {settings.storage}")
+
+
+class ItemJSONCache:
+    """
+    JSON encodings of recently read items, least recently used first.
+
+    A reload hands the cache over to the next version of the module along
+    with the storage, so that the writes of both versions invalidate the
+    same entries. Each entry records the Item model it was encoded from,
+    and a version only serves the entries of its own model.
+
+    Attributes:
+        max_items: Maximum number of items kept (0 to disable)
+        entries: Item ID -> (Item model, JSON bytes)
+        lock: Guards the entries, since service methods may run in the threadpool
+        version: Bumped on every invalidation, so that a read racing with an
+            update does not cache the old version of an item
+    """
+
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self.entries: "OrderedDict[int, Tuple[type, bytes]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.version = 0
+
 
 class ItemService:
     """
     Service for managing items.
     
-    In a real application, this would interact with a database.
-    For simplicity, this example uses an in-memory dictionary.
+    Items are kept in a pluggable storage backend: an in-memory dictionary
+    by default, or a SQLite database that survives reloads and restarts.
+    The JSON encoding of recently read items is cached until they change.
     """
     
-    def __init__(self):
-        """Initialize the service with some example data."""
-        self.items: Dict[int, Item] = {
-            1: Item(
-                id=1,
-                name="Example Item 1",
-                description="This is the first example item",
-                price=19.99,
-                is_active=True,
-                created_at=datetime.now()
-            ),
-            2: Item(
-                id=2,
-                name="Example Item 2",
-                description="This is the second example item",
-                price=29.99,
-                is_active=True,
-                created_at=datetime.now()
-            )
-        }
-        self.counter = 3  # Next ID to assign
+    def __init__(self, storage: Optional[ItemStorage] = None, json_cache_size: int = 10000):
+        """
+        Initialize the service.
+
+        Args:
+            storage: Storage backend to use. Defaults to in-memory storage with some example data.
+            json_cache_size: Maximum number of serialized items kept in memory (0 to disable)
+        """
+        self.storage = storage if storage is not None else MemoryItemStorage()
+
+        self.json_cache = ItemJSONCache(json_cache_size)
+
+    def adopt(self, storage: ItemStorage, json_cache: ItemJSONCache) -> None:
+        """
+        Take over the storage and JSON cache of the previous version of the module.
+
+        Args:
+            storage: Storage of the previous version, of the same backend and settings
+            json_cache: JSON cache of the previous version
+        """
+        self.storage.adopt(storage)
+        self.json_cache = json_cache
     
     def get_items(self, skip: int = 0, limit: int = 10) -> List[Item]:
         """
@@ -47,8 +98,61 @@ class ItemService:
         Returns:
             A list of items
         """
-        items = list(self.items.values())
-        return items[skip:skip + limit]
+        items, _ = self.get_items_page(skip=skip, limit=limit)
+        return items
+
+    def get_items_page(self, cursor: Optional[int] = None, limit: int = 10, skip: int = 0,
+                       query: Optional[ItemQuery] = None) -> Tuple[List[Item], Optional[int]]:
+        """
+        Get a page of items in ID order using keyset pagination.
+
+        Deep pages cost the same as the first one: O(log n + limit). Filtered
+        pages are answered from the storage's secondary indexes, in
+        O(log n + k) for k matching items.
+
+        Args:
+            cursor: Return items with an ID greater than this one (None to start at the beginning)
+            limit: Maximum number of items to return
+            skip: Number of items to skip after the cursor
+            query: Only return the items matching these filters
+
+        Returns:
+            The items of the page and the cursor of the next page (None on the last page)
+        """
+        return self.storage.get_page(cursor, limit, skip, query)
+    
+    def iter_items(self, chunk_size: int = 500) -> Iterator[List[Item]]:
+        """
+        Iterate over every item in ID order, one keyset page at a time.
+
+        Only one page is held in memory at once.
+
+        Args:
+            chunk_size: Number of items per page
+
+        Yields:
+            Pages of items
+        """
+        cursor = None
+        while True:
+            items, cursor = self.storage.get_page(cursor, chunk_size, 0)
+            if items:
+                yield items
+            if cursor is None:
+                return
+
+    def export_ndjson(self, chunk_size: int = 500) -> Iterator[bytes]:
+        """
+        Serialize every item as NDJSON, one page at a time.
+
+        Args:
+            chunk_size: Number of items per page
+
+        Yields:
+            The encoded lines of a page
+        """
+        for items in self.iter_items(chunk_size):
+            yield b"".join(dump_model(item) + b"\n" for item in items)
     
     def get_item(self, item_id: int) -> Optional[Item]:
         """
@@ -60,7 +164,75 @@ class ItemService:
         Returns:
             The item if found, None otherwise
         """
-        return self.items.get(item_id)
+        return self.storage.get(item_id)
+
+    def get_item_json(self, item_id: int) -> Optional[bytes]:
+        """
+        Get the JSON encoding of an item, from the cache when possible.
+
+        Args:
+            item_id: ID of the item to get
+
+        Returns:
+            The serialized item if found, None otherwise
+        """
+        cache = self.json_cache
+        with cache.lock:
+            entry = cache.entries.get(item_id)
+            if entry is not None and entry[0] is Item:
+                cache.entries.move_to_end(item_id)
+                return entry[1]
+            version = cache.version
+
+        item = self.storage.get(item_id)
+        if item is None:
+            return None
+        payload = dump_model(item)
+
+        with cache.lock:
+            if cache.max_items > 0 and version == cache.version:
+                cache.entries[item_id] = (Item, payload)
+                cache.entries.move_to_end(item_id)
+                if len(cache.entries) > cache.max_items:
+                    cache.entries.popitem(last=False)
+        return payload
+
+    def warm_json_cache(self, limit: int = 100) -> int:
+        """
+        Serialize the first items into the JSON cache.
+
+        Args:
+            limit: Maximum number of items to serialize
+
+        Returns:
+            The number of items cached
+        """
+        cache = self.json_cache
+        limit = min(limit, cache.max_items)
+        if limit <= 0:
+            return 0
+
+        with cache.lock:
+            version = cache.version
+        items, _ = self.storage.get_page(None, limit, 0)
+        payloads = [(item.id, dump_model(item)) for item in items]
+
+        with cache.lock:
+            if version != cache.version:
+                return 0
+            for item_id, payload in payloads:
+                cache.entries[item_id] = (Item, payload)
+            while len(cache.entries) > cache.max_items:
+                cache.entries.popitem(last=False)
+        return len(payloads)
+
+    def _invalidate_json(self, item_ids: Iterable[int]) -> None:
+        """Drop the cached JSON of items that changed."""
+        cache = self.json_cache
+        with cache.lock:
+            cache.version += 1
+            for item_id in item_ids:
+                cache.entries.pop(item_id, None)
     
     def create_item(self, item_create: ItemCreate) -> Item:
         """
@@ -72,18 +244,9 @@ class ItemService:
         Returns:
             The created item
         """
-        # Create a new item with an incremented ID
-        item = Item(
-            id=self.counter,
-            **item_create.dict(),
-            created_at=datetime.now()
-        )
-        
-        # Add it to our "database"
-        self.items[self.counter] = item
-        self.counter += 1
-        
-        return item
+        data = item_create.dict()
+        data["created_at"] = datetime.now()
+        return self.storage.create(data)
     
     def update_item(self, item_id: int, item_update: ItemUpdate) -> Optional[Item]:
         """
@@ -96,24 +259,14 @@ class ItemService:
         Returns:
             The updated item if found, None otherwise
         """
-        # Check if the item exists
-        if item_id not in self.items:
-            return None
-        
-        # Get the existing item
-        item = self.items[item_id]
-        
         # Update only the fields that are provided
         update_data = item_update.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(item, field, value)
-        
+
         # Update the updated_at timestamp
-        item.updated_at = datetime.now()
-        
-        # Store the updated item
-        self.items[item_id] = item
-        
+        update_data["updated_at"] = datetime.now()
+
+        item = self.storage.update(item_id, update_data)
+        self._invalidate_json([item_id])
         return item
     
     def delete_item(self, item_id: int) -> bool:
@@ -126,8 +279,54 @@ class ItemService:
         Returns:
             True if the item was deleted, False if not found
         """
-        if item_id not in self.items:
-            return False
-            
-        del self.items[item_id]
-        return True
\ No newline at end of file
+        deleted = self.storage.delete(item_id)
+        self._invalidate_json([item_id])
+        return deleted
+
+    def create_items(self, items: List[ItemCreate]) -> List[Item]:
+        """
+        Create several items in one storage call.
+
+        Args:
+            items: Data for the new items
+
+        Returns:
+            The created items, in the same order
+        """
+        now = datetime.now()
+        return self.storage.create_many([dict(item.dict(), created_at=now) for item in items])
+
+    def update_items(self, updates: List[ItemBulkUpdate]) -> List[Optional[Item]]:
+        """
+        Update several items in one storage call.
+
+        Args:
+            updates: ID and new data of each item
+
+        Returns:
+            For each update, the updated item or None if it was not found
+        """
+        now = datetime.now()
+        changes = []
+        for item_update in updates:
+            update_data = item_update.dict(exclude_unset=True, exclude={"id"})
+            update_data["updated_at"] = now
+            changes.append((item_update.id, update_data))
+
+        items = self.storage.update_many(changes)
+        self._invalidate_json(item_id for item_id, _ in changes)
+        return items
+
+    def delete_items(self, item_ids: List[int]) -> List[bool]:
+        """
+        Delete several items in one storage call.
+
+        Args:
+            item_ids: IDs of the items to delete
+
+        Returns:
+            For each ID, True if the item was deleted, False if not found
+        """
+        deleted = self.storage.delete_many(item_ids)
+        self._invalidate_json(item_ids)
+        return deleted
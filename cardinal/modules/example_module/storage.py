@@ -0,0 +1,647 @@
+"""
+Storage backends for the example module.
+"""
+
+import heapq
+import itertools
+import os
+import queue
+import sqlite3
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .models import Item
+
+# Items every new storage starts with
+EXAMPLE_ITEMS = [
+    {
+        "name": "Example Item 1",
+        "description": "This is the first example item",
+        "price": 19.99,
+        "is_active": True,
+    },
+    {
+        "name": "Example Item 2",
+        "description": "This is the second example item",
+        "price": 29.99,
+        "is_active": True,
+    },
+]
+
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    Return the smallest string greater than every string starting with a prefix.
+
+    Args:
+        prefix: A non-empty prefix
+
+    Returns:
+        The upper bound, or None if there is none
+    """
+    for i in range(len(prefix) - 1, -1, -1):
+        if ord(prefix[i]) < 0x10FFFF:
+            return prefix[:i] + chr(ord(prefix[i]) + 1)
+    return None
+
+
+class ItemQuery:
+    """
+    Filters of an item query. Filters left to None are not applied.
+
+    Attributes:
+        is_active: Only items with this active flag
+        min_price: Only items with a price greater than or equal to this one
+        max_price: Only items with a price less than or equal to this one
+        name_prefix: Only items whose name starts with this prefix (case-sensitive)
+    """
+
+    def __init__(self, is_active: Optional[bool] = None, min_price: Optional[float] = None,
+                 max_price: Optional[float] = None, name_prefix: Optional[str] = None):
+        self.is_active = is_active
+        self.min_price = min_price
+        self.max_price = max_price
+        self.name_prefix = name_prefix or None
+
+    def is_empty(self) -> bool:
+        """Check whether the query has no filter at all."""
+        return (self.is_active is None and self.min_price is None
+                and self.max_price is None and self.name_prefix is None)
+
+    def matches(self, item: Item) -> bool:
+        """
+        Check whether an item passes every filter.
+
+        Args:
+            item: The item to check
+
+        Returns:
+            True if the item matches the query
+        """
+        if self.is_active is not None and item.is_active != self.is_active:
+            return False
+        if self.min_price is not None and item.price < self.min_price:
+            return False
+        if self.max_price is not None and item.price > self.max_price:
+            return False
+        if self.name_prefix is not None and not item.name.startswith(self.name_prefix):
+            return False
+        return True
+
+
+class ItemStorage(ABC):
+    """
+    Interface of an item storage backend.
+
+    Attributes:
+        blocking: Whether calls do blocking I/O and should run off the event loop
+    """
+
+    blocking = False
+
+    @abstractmethod
+    def get(self, item_id: int) -> Optional[Item]:
+        """
+        Get an item by ID.
+
+        Args:
+            item_id: ID of the item
+
+        Returns:
+            The item if found, None otherwise
+        """
+
+    @abstractmethod
+    def get_page(self, cursor: Optional[int], limit: int, skip: int,
+                 query: Optional[ItemQuery] = None) -> Tuple[List[Item], Optional[int]]:
+        """
+        Get a page of items in ID order.
+
+        Args:
+            cursor: Return items with an ID greater than this one (None to start at the beginning)
+            limit: Maximum number of items to return
+            skip: Number of items to skip after the cursor
+            query: Only return the items matching these filters
+
+        Returns:
+            The items of the page and the cursor of the next page (None on the last page)
+        """
+
+    @abstractmethod
+    def create(self, data: Dict[str, Any]) -> Item:
+        """
+        Store a new item and assign its ID.
+
+        Args:
+            data: Field values of the item, without the ID
+
+        Returns:
+            The created item
+        """
+
+    @abstractmethod
+    def update(self, item_id: int, changes: Dict[str, Any]) -> Optional[Item]:
+        """
+        Update some fields of an item.
+
+        Args:
+            item_id: ID of the item
+            changes: Field values to change
+
+        Returns:
+            The updated item if found, None otherwise
+        """
+
+    @abstractmethod
+    def delete(self, item_id: int) -> bool:
+        """
+        Delete an item.
+
+        Args:
+            item_id: ID of the item
+
+        Returns:
+            True if the item was deleted, False if not found
+        """
+
+    def create_many(self, items: List[Dict[str, Any]]) -> List[Item]:
+        """
+        Store several new items.
+
+        Backends override this when they can apply the batch more cheaply
+        than one call per item.
+
+        Args:
+            items: Field values of each item, without the ID
+
+        Returns:
+            The created items, in the same order
+        """
+        return [self.create(data) for data in items]
+
+    def update_many(self, updates: List[Tuple[int, Dict[str, Any]]]) -> List[Optional[Item]]:
+        """
+        Update several items.
+
+        Args:
+            updates: (item ID, field values to change) pairs
+
+        Returns:
+            For each pair, the updated item or None if it was not found
+        """
+        return [self.update(item_id, changes) for item_id, changes in updates]
+
+    def delete_many(self, item_ids: List[int]) -> List[bool]:
+        """
+        Delete several items.
+
+        Args:
+            item_ids: IDs of the items
+
+        Returns:
+            For each ID, True if the item was deleted, False if not found
+        """
+        return [self.delete(item_id) for item_id in item_ids]
+
+    def close(self) -> None:
+        """Release the resources held by the storage."""
+
+    def adopt(self, previous: "ItemStorage") -> None:
+        """
+        Take over the state of the storage of the previous version of the module.
+
+        A reload imports the module again, and the previous storage keeps
+        returning instances of the previous Item model, which the new
+        version's models reject. This storage takes over its state, whose
+        methods build the new model. The state is shared rather than copied:
+        requests still running in the previous version write to it as well,
+        and their writes must not be lost.
+
+        Args:
+            previous: Storage of the same backend, with the same settings
+        """
+        self.__dict__.update(previous.__dict__)
+
+
+class MemoryItemStorage(ItemStorage):
+    """
+    Stores items in a dictionary, with sorted indexes for pagination and filters.
+
+    Besides the ID index, three secondary indexes are kept up to date on
+    every write: the IDs of active and inactive items, (price, ID) pairs and
+    (name, ID) pairs, each as a sorted list. A filtered query reads the
+    smallest matching slice of an index with a binary search and checks the
+    other filters on those items only, reading no further than the page needs.
+    """
+
+    def __init__(self):
+        """Initialize the storage with the example items."""
+        self.items: Dict[int, Item] = {}
+        # IDs to assign, shared with a storage adopting this one
+        self.next_ids = itertools.count(1)
+
+        # IDs in ascending order. IDs are assigned in increasing order, so new
+        # items are simply appended and the list never needs sorting.
+        self.ids: List[int] = []
+
+        # Secondary indexes
+        self.ids_by_active: Dict[bool, List[int]] = {True: [], False: []}
+        self.by_price: List[Tuple[float, int]] = []
+        self.by_name: List[Tuple[str, int]] = []
+
+        for data in EXAMPLE_ITEMS:
+            self.create(dict(data, created_at=datetime.now()))
+
+    def _current(self, item: Item) -> Item:
+        # Items stored by a previous version of the module, before or while it
+        # was adopted, are instances of its own Item model
+        return item if type(item) is Item else Item(**item.dict())
+
+    def _index(self, item: Item) -> None:
+        # New IDs are the largest, so appending keeps the flag lists sorted
+        # on create; updates that flip the flag need the insort
+        active_ids = self.ids_by_active[item.is_active]
+        if not active_ids or active_ids[-1] < item.id:
+            active_ids.append(item.id)
+        else:
+            insort(active_ids, item.id)
+        insort(self.by_price, (item.price, item.id))
+        insort(self.by_name, (item.name, item.id))
+
+    def _unindex(self, item: Item) -> None:
+        for index, key in (
+            (self.ids_by_active[item.is_active], item.id),
+            (self.by_price, (item.price, item.id)),
+            (self.by_name, (item.name, item.id)),
+        ):
+            position = bisect_left(index, key)
+            if position < len(index) and index[position] == key:
+                del index[position]
+
+    def get(self, item_id: int) -> Optional[Item]:
+        item = self.items.get(item_id)
+        return self._current(item) if item is not None else None
+
+    def _matching_page(self, query: ItemQuery, cursor: Optional[int],
+                       count: int) -> List[int]:
+        """
+        Find the first IDs after a cursor of the items matching a query.
+
+        Args:
+            query: A non-empty query
+            cursor: Only IDs greater than this one (None for all)
+            count: Number of IDs wanted
+
+        Returns:
+            Up to count matching IDs, in ascending order
+        """
+        # Candidate slices, as (size, ids or None, index, start, end)
+        candidates = []
+        if query.is_active is not None:
+            active_ids = self.ids_by_active[query.is_active]
+            candidates.append((len(active_ids), active_ids, None, 0, 0))
+
+        if query.min_price is not None or query.max_price is not None:
+            start = bisect_left(self.by_price, (query.min_price,)) if query.min_price is not None else 0
+            end = (bisect_right(self.by_price, (query.max_price, float("inf")))
+                   if query.max_price is not None else len(self.by_price))
+            candidates.append((max(0, end - start), None, self.by_price, start, end))
+
+        if query.name_prefix is not None:
+            start = bisect_left(self.by_name, (query.name_prefix,))
+            upper = prefix_upper_bound(query.name_prefix)
+            end = bisect_left(self.by_name, (upper,)) if upper is not None else len(self.by_name)
+            candidates.append((max(0, end - start), None, self.by_name, start, end))
+
+        # Start from the smallest slice, checking the other filters on it only
+        _, ids, index, start, end = min(candidates, key=lambda candidate: candidate[0])
+        check = len(candidates) > 1
+        after = cursor if cursor is not None else 0
+
+        if ids is not None:
+            # Already in ID order: read from the cursor and stop once the page is full
+            page: List[int] = []
+            for item_id in itertools.islice(ids, bisect_right(ids, after), None):
+                if check and not query.matches(self.items[item_id]):
+                    continue
+                page.append(item_id)
+                if len(page) == count:
+                    break
+            return page
+
+        # A price or name slice is in value order: keep only the smallest IDs
+        # after the cursor rather than sorting the whole slice
+        matching = (item_id for _, item_id in itertools.islice(index, start, end)
+                    if item_id > after and (not check or query.matches(self.items[item_id])))
+        return heapq.nsmallest(count, matching)
+
+    def get_page(self, cursor: Optional[int], limit: int, skip: int,
+                 query: Optional[ItemQuery] = None) -> Tuple[List[Item], Optional[int]]:
+        if query is None or query.is_empty():
+            # Only the requested slice of the ID index is touched, so a page
+            # costs O(log n + limit) however deep it is
+            start = bisect_right(self.ids, cursor) if cursor is not None else 0
+            start += skip
+            page_ids = self.ids[start:start + limit]
+            has_more = start + limit < len(self.ids)
+        else:
+            # One extra match tells whether there is a next page
+            matched = self._matching_page(query, cursor, skip + limit + 1) if limit else []
+            page_ids = matched[skip:skip + limit]
+            has_more = len(matched) > skip + limit
+
+        next_cursor = page_ids[-1] if page_ids and has_more else None
+        return [self._current(self.items[item_id]) for item_id in page_ids], next_cursor
+
+    def create(self, data: Dict[str, Any]) -> Item:
+        item = Item(id=next(self.next_ids), **data)
+        self.items[item.id] = item
+        self.ids.append(item.id)
+        self._index(item)
+        return item
+
+    def update(self, item_id: int, changes: Dict[str, Any]) -> Optional[Item]:
+        item = self.items.get(item_id)
+        if item is None:
+            return None
+
+        # Build and validate the new version first, so that an invalid value
+        # leaves the item and the indexes as they were
+        updated = Item(**dict(item.dict(), **changes))
+        self._unindex(item)
+        self.items[item_id] = updated
+        self._index(updated)
+        return updated
+
+    def delete(self, item_id: int) -> bool:
+        item = self.items.pop(item_id, None)
+        if item is None:
+            return False
+
+        del self.ids[bisect_right(self.ids, item_id) - 1]
+        self._unindex(item)
+        return True
+
+
+# Columns in the order used by every SELECT below
+COLUMNS = ("id", "name", "description", "price", "is_active", "created_at", "updated_at")
+SELECT_COLUMNS = ", ".join(COLUMNS)
+
+# The sqlite3 module compiles each distinct SQL string once per connection and
+# keeps it in the connection's statement cache. Using fixed SQL strings with
+# parameters means the CRUD paths always reuse prepared statements.
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    description TEXT,
+    price REAL NOT NULL,
+    is_active INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT
+)
+"""
+# Indexes for the filters of ItemQuery
+CREATE_INDEXES_SQL = (
+    "CREATE INDEX IF NOT EXISTS items_is_active ON items (is_active, id)",
+    "CREATE INDEX IF NOT EXISTS items_price ON items (price)",
+    "CREATE INDEX IF NOT EXISTS items_name ON items (name)",
+)
+SELECT_ITEM_SQL = f"SELECT {SELECT_COLUMNS} FROM items WHERE id = ?"
+SELECT_PAGE_SQL = f"SELECT {SELECT_COLUMNS} FROM items WHERE id > ? ORDER BY id LIMIT ? OFFSET ?"
+INSERT_ITEM_SQL = (
+    "INSERT INTO items (name, description, price, is_active, created_at, updated_at) "
+    "VALUES (:name, :description, :price, :is_active, :created_at, :updated_at)"
+)
+DELETE_ITEM_SQL = "DELETE FROM items WHERE id = ?"
+COUNT_ITEMS_SQL = "SELECT COUNT(*) FROM items"
+
+# Fields an update may change
+UPDATABLE_FIELDS = ("name", "description", "price", "is_active", "updated_at")
+
+
+def _to_db(field: str, value: Any) -> Any:
+    """Convert a field value to its SQLite representation."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if field == "is_active" and value is not None:
+        return int(value)
+    return value
+
+
+def _row_to_item(row: tuple) -> Item:
+    """Build an item from a row selected with SELECT_COLUMNS."""
+    return Item(
+        id=row[0],
+        name=row[1],
+        description=row[2],
+        price=row[3],
+        is_active=bool(row[4]),
+        created_at=datetime.fromisoformat(row[5]),
+        updated_at=datetime.fromisoformat(row[6]) if row[6] else None,
+    )
+
+
+class ConnectionPool:
+    """
+    A fixed-size pool of SQLite connections shared between threads.
+    """
+
+    def __init__(self, path: str, size: int = 4, cached_statements: int = 128):
+        """
+        Open the connections of the pool.
+
+        Args:
+            path: Path of the database file
+            size: Number of connections
+            cached_statements: Size of each connection's prepared statement cache
+        """
+        self.path = path
+        self._connections: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all: List[sqlite3.Connection] = []
+
+        for _ in range(max(1, size)):
+            conn = sqlite3.connect(
+                path,
+                check_same_thread=False,
+                cached_statements=cached_statements,
+                timeout=30,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._all.append(conn)
+            self._connections.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a connection for the duration of a with block.
+
+        The block runs in a transaction that is committed on success and
+        rolled back on error.
+        """
+        conn = self._connections.get()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._connections.put(conn)
+
+    def close(self) -> None:
+        """Close every connection of the pool."""
+        for conn in self._all:
+            conn.close()
+        self._all = []
+
+
+class SQLiteItemStorage(ItemStorage):
+    """
+    Stores items in a SQLite database in WAL mode.
+
+    Data lives on disk, so it survives module reloads and restarts and can
+    grow larger than RAM. Calls block on disk I/O and should be made from a
+    worker thread.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, pool_size: int = 4):
+        """
+        Open the database, creating it with the example items if needed.
+
+        Args:
+            path: Path of the database file
+            pool_size: Number of pooled connections
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.pool = ConnectionPool(path, pool_size)
+        self._update_statements: Dict[Tuple[str, ...], str] = {}
+        self._query_statements: Dict[Tuple[str, ...], str] = {}
+
+        with self.pool.connection() as conn:
+            conn.execute(CREATE_TABLE_SQL)
+            for sql in CREATE_INDEXES_SQL:
+                conn.execute(sql)
+            if conn.execute(COUNT_ITEMS_SQL).fetchone()[0] == 0:
+                now = datetime.now()
+                for data in EXAMPLE_ITEMS:
+                    self._insert(conn, dict(data, created_at=now))
+
+    def get(self, item_id: int) -> Optional[Item]:
+        with self.pool.connection() as conn:
+            row = conn.execute(SELECT_ITEM_SQL, (item_id,)).fetchone()
+        return _row_to_item(row) if row else None
+
+    def _query_sql(self, conditions: Tuple[str, ...]) -> str:
+        """
+        Return the SELECT statement of a page filtered on some conditions.
+
+        Like the UPDATE statements, each combination of filters gets one
+        fixed SQL string.
+        """
+        sql = self._query_statements.get(conditions)
+        if sql is None:
+            where = " AND ".join(("id > ?",) + conditions)
+            sql = f"SELECT {SELECT_COLUMNS} FROM items WHERE {where} ORDER BY id LIMIT ? OFFSET ?"
+            self._query_statements[conditions] = sql
+        return sql
+
+    def get_page(self, cursor: Optional[int], limit: int, skip: int,
+                 query: Optional[ItemQuery] = None) -> Tuple[List[Item], Optional[int]]:
+        sql = SELECT_PAGE_SQL
+        params: List[Any] = [cursor if cursor is not None else 0]
+
+        if query is not None and not query.is_empty():
+            conditions = []
+            if query.is_active is not None:
+                conditions.append("is_active = ?")
+                params.append(int(query.is_active))
+            if query.min_price is not None:
+                conditions.append("price >= ?")
+                params.append(query.min_price)
+            if query.max_price is not None:
+                conditions.append("price <= ?")
+                params.append(query.max_price)
+            if query.name_prefix is not None:
+                # A range instead of LIKE, so the name index can be used
+                conditions.append("name >= ?")
+                params.append(query.name_prefix)
+                upper = prefix_upper_bound(query.name_prefix)
+                if upper is not None:
+                    conditions.append("name < ?")
+                    params.append(upper)
+            sql = self._query_sql(tuple(conditions))
+
+        # Fetch one extra row to know whether there is a next page; the
+        # primary key index makes this O(log n + limit) at any depth
+        with self.pool.connection() as conn:
+            rows = conn.execute(sql, params + [limit + 1, skip]).fetchall()
+
+        items = [_row_to_item(row) for row in rows[:limit]]
+        next_cursor = items[-1].id if len(rows) > limit and items else None
+        return items, next_cursor
+
+    def _insert(self, conn: sqlite3.Connection, data: Dict[str, Any]) -> Item:
+        params = {field: _to_db(field, data.get(field)) for field in COLUMNS[1:]}
+        cursor = conn.execute(INSERT_ITEM_SQL, params)
+        return Item(id=cursor.lastrowid, **data)
+
+    def create(self, data: Dict[str, Any]) -> Item:
+        with self.pool.connection() as conn:
+            return self._insert(conn, data)
+
+    def create_many(self, items: List[Dict[str, Any]]) -> List[Item]:
+        # One connection and one commit for the whole batch
+        with self.pool.connection() as conn:
+            return [self._insert(conn, data) for data in items]
+
+    def _update_sql(self, fields: Tuple[str, ...]) -> str:
+        """
+        Return the UPDATE statement for a set of fields.
+
+        There are only a few combinations, each kept as a fixed SQL string so
+        the connections can reuse their prepared statements.
+        """
+        sql = self._update_statements.get(fields)
+        if sql is None:
+            assignments = ", ".join(f"{field} = ?" for field in fields)
+            sql = f"UPDATE items SET {assignments} WHERE id = ?"
+            self._update_statements[fields] = sql
+        return sql
+
+    def _update(self, conn: sqlite3.Connection, item_id: int,
+                changes: Dict[str, Any]) -> Optional[Item]:
+        fields = tuple(field for field in UPDATABLE_FIELDS if field in changes)
+        if fields:
+            params = [_to_db(field, changes[field]) for field in fields]
+            cursor = conn.execute(self._update_sql(fields), params + [item_id])
+            if cursor.rowcount == 0:
+                return None
+        row = conn.execute(SELECT_ITEM_SQL, (item_id,)).fetchone()
+        return _row_to_item(row) if row else None
+
+    def update(self, item_id: int, changes: Dict[str, Any]) -> Optional[Item]:
+        with self.pool.connection() as conn:
+            return self._update(conn, item_id, changes)
+
+    def update_many(self, updates: List[Tuple[int, Dict[str, Any]]]) -> List[Optional[Item]]:
+        with self.pool.connection() as conn:
+            return [self._update(conn, item_id, changes) for item_id, changes in updates]
+
+    def delete(self, item_id: int) -> bool:
+        with self.pool.connection() as conn:
+            return conn.execute(DELETE_ITEM_SQL, (item_id,)).rowcount > 0
+
+    def delete_many(self, item_ids: List[int]) -> List[bool]:
+        with self.pool.connection() as conn:
+            return [conn.execute(DELETE_ITEM_SQL, (item_id,)).rowcount > 0 for item_id in item_ids]
+
+    def close(self) -> None:
+        self.pool.close()
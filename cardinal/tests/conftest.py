@@ -0,0 +1,46 @@
+"""
+Shared fixtures of the Cardinal test suite.
+
+Run from the cardinal directory:
+
+    python -m pytest
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+CARDINAL_DIR = Path(__file__).resolve().parent.parent
+
+# The application imports core and modules as top-level packages
+if str(CARDINAL_DIR) not in sys.path:
+    sys.path.insert(0, str(CARDINAL_DIR))
+
+from core import create_app  # noqa: E402
+from core.config import CoreConfig  # noqa: E402
+
+
+def make_config(**overrides) -> CoreConfig:
+    """Configuration of a test application: no file logging, no watcher."""
+    settings = dict(
+        modules_path=str(CARDINAL_DIR / "modules"),
+        log_file=None,
+        auto_reload=False,
+    )
+    settings.update(overrides)
+    return CoreConfig(**settings)
+
+
+@pytest.fixture
+def app():
+    """A Cardinal application with the example module, not started."""
+    return create_app(make_config())
+
+
+@pytest.fixture
+def client(app):
+    """A test client of the started application."""
+    with TestClient(app) as test_client:
+        yield test_client
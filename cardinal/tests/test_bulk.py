@@ -0,0 +1,69 @@
+"""
+Tests of the parsing of bulk requests of the example module.
+"""
+
+import pytest
+
+from modules.example_module.bulk import parse_item_id, parse_model, validate_batch
+from modules.example_module.models import ItemCreate
+
+NDJSON = {"content-type": "application/x-ndjson"}
+
+
+@pytest.mark.parametrize("raw, expected", [(3, 3), ({"id": 4}, 4)])
+def test_parse_item_id_accepts_ids_and_objects(raw, expected):
+    assert parse_item_id(raw) == expected
+
+
+@pytest.mark.parametrize("raw", [True, "3", None, 2.5, {"name": "x"}, {"id": False}])
+def test_parse_item_id_rejects_other_values(raw):
+    with pytest.raises(ValueError):
+        parse_item_id(raw)
+
+
+def test_parse_model_needs_an_object():
+    parse = parse_model(ItemCreate)
+    assert parse({"name": "A", "price": 1.0}).name == "A"
+    with pytest.raises(ValueError):
+        parse([{"name": "A", "price": 1.0}])
+
+
+def test_validate_batch_reports_each_invalid_entry():
+    entries = [(0, {"name": "A", "price": 1.0}), (1, {"name": "B"}), (2, "C")]
+    valid, rejected = validate_batch(entries, parse_model(ItemCreate))
+    assert [index for index, _ in valid] == [0]
+    assert [(result.index, result.status) for result in rejected] == [(1, 422), (2, 422)]
+    assert rejected[0].detail[0]["loc"] == ["price"]
+    assert rejected[1].detail == "Expected a JSON object"
+
+
+def test_ndjson_create_lists_only_failures(client):
+    body = (b'{"name": "A", "price": 1.0}\n'
+            b'\n'
+            b'not json\n'
+            b'{"name": "B"}\n'
+            b'{"name": "C", "price": 3.0}')  # No trailing newline
+    response = client.post("/items/bulk", content=body, headers=NDJSON)
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["succeeded"], data["failed"]) == (2, 2)
+    assert [result["index"] for result in data["results"]] == [1, 2]
+    assert data["results"][0]["detail"].startswith("Invalid JSON")
+
+    names = [item["name"] for item in client.get("/items/", params={"limit": 100}).json()]
+    assert names.count("A") == names.count("C") == 1
+
+
+def test_json_array_results_are_in_request_order(client):
+    response = client.request("DELETE", "/items/bulk", json=[2, {"id": 999}, "x", 1])
+    assert response.status_code == 200
+    results = response.json()["results"]
+    statuses = [(result["index"], result["status"]) for result in results]
+    assert statuses == [(0, 204), (1, 404), (2, 422), (3, 204)]
+
+
+@pytest.mark.parametrize("body, status", [(b"[1, 2", 400), (b'{"id": 1}', 422)])
+def test_json_body_must_be_an_array(client, body, status):
+    response = client.request("DELETE", "/items/bulk", content=body,
+                              headers={"content-type": "application/json"})
+    assert response.status_code == status
@@ -0,0 +1,113 @@
+"""
+Tests of the per-module concurrency limits.
+"""
+
+import asyncio
+
+import httpx
+
+from core.bulkhead import Bulkhead, BulkheadLimits, BulkheadRegistry, set_bulkhead
+from core.middleware import BulkheadMiddleware
+
+
+def test_queue_overflow_and_timeout_are_rejected():
+    async def scenario():
+        bulkhead = Bulkhead(BulkheadLimits(max_concurrent=1, max_queue=1, queue_timeout=0.05))
+        assert await bulkhead.acquire() is None
+        waiting = asyncio.ensure_future(bulkhead.acquire())
+        await asyncio.sleep(0)
+        assert bulkhead.queued == 1
+
+        # The queue is full
+        assert await bulkhead.acquire() == 429
+
+        # The queued request times out and leaves the queue
+        assert await waiting == 503
+        assert (bulkhead.queued, bulkhead.in_flight) == (0, 1)
+
+        # Its slot was never taken, so the next request gets the released one
+        bulkhead.release()
+        assert bulkhead.in_flight == 0
+        assert await bulkhead.acquire() is None
+        return bulkhead.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["admitted"], stats["rejected_queue_full"], stats["rejected_timeout"]) == (2, 1, 1)
+
+
+def test_release_hands_the_slot_to_the_oldest_waiter():
+    async def scenario():
+        bulkhead = Bulkhead(BulkheadLimits(max_concurrent=1, max_queue=2, queue_timeout=5))
+        assert await bulkhead.acquire() is None
+        first = asyncio.ensure_future(bulkhead.acquire())
+        second = asyncio.ensure_future(bulkhead.acquire())
+        await asyncio.sleep(0)
+
+        # A cancelled waiter gives up its place without taking a slot
+        first.cancel()
+        await asyncio.sleep(0)
+        bulkhead.release()
+        assert await second is None
+        assert (bulkhead.in_flight, bulkhead.queued) == (1, 0)
+        bulkhead.release()
+        assert bulkhead.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_registry_matches_the_module_prefix():
+    class Router:
+        prefix = "/reports"
+
+    router = Router()
+    set_bulkhead(router, max_concurrent=2)
+    registry = BulkheadRegistry(overrides={"reports": {"max_queue": 3}})
+    registry.configure("reports", router.prefix, router.__cardinal_bulkhead__)
+
+    bulkhead = registry.for_path("/reports/daily/1")
+    assert bulkhead is registry.for_path("/reports")
+    assert (bulkhead.limits.max_concurrent, bulkhead.limits.max_queue) == (2, 3)
+    assert registry.for_path("/reportsx") is None
+
+    # Reloaded with the same limits, the module keeps its bulkhead
+    registry.configure("reports", router.prefix, router.__cardinal_bulkhead__)
+    assert registry.bulkheads["reports"] is bulkhead
+
+    registry.remove_module("reports")
+    assert registry.for_path("/reports") is None
+
+
+def test_middleware_rejects_and_frees_the_slot():
+    release = None
+
+    async def app(scope, receive, send):
+        if scope["path"] == "/slow/":
+            await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    registry = BulkheadRegistry(BulkheadLimits(max_concurrent=1, max_queue=0, queue_timeout=1))
+    registry.configure("slow", "/slow")
+    middleware = BulkheadMiddleware(app, registry)
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        transport = httpx.ASGITransport(app=middleware)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            slow = asyncio.ensure_future(client.get("/slow/"))
+            while registry.bulkheads["slow"].in_flight == 0:
+                await asyncio.sleep(0.01)
+
+            rejected = await client.get("/slow/other")
+            assert rejected.status_code == 429
+            assert rejected.headers["retry-after"] == "1"
+            # Other paths are not limited
+            assert (await client.get("/fast")).status_code == 200
+
+            release.set()
+            assert (await slow).status_code == 200
+            assert registry.bulkheads["slow"].in_flight == 0
+            assert (await client.get("/slow/")).status_code == 200
+
+    asyncio.run(scenario())
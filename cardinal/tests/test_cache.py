@@ -0,0 +1,147 @@
+"""
+Tests of the response cache of routes marked with cache_response.
+"""
+
+import sys
+import textwrap
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import make_config
+from core import create_app
+
+ROUTES = """
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from core.cache import cache_response
+
+router = APIRouter(prefix="/cached")
+CALLS = []
+
+
+def require_token(x_token: str = Header(None)):
+    if x_token != "secret":
+        raise HTTPException(status_code=401)
+
+
+@router.get("/counter")
+@cache_response(ttl=60, vary_query=["page"])
+async def counter(page: int = 1, other: int = 0):
+    CALLS.append("counter")
+    return {"page": page, "calls": len(CALLS)}
+
+
+@router.get("/short")
+@cache_response(ttl=0.05)
+async def short():
+    CALLS.append("short")
+    return {"calls": len(CALLS)}
+
+
+@router.get("/blob/{name}")
+@cache_response(ttl=60)
+async def blob(name: str):
+    CALLS.append(name)
+    return {"name": name, "data": "x" * 1000}
+
+
+@router.get("/private", dependencies=[Depends(require_token)])
+@cache_response(ttl=60)
+async def private():
+    CALLS.append("private")
+    return {"secret": True}
+"""
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    root = tmp_path / "cache_modules"
+    module_dir = root / "cached"
+    module_dir.mkdir(parents=True)
+    (module_dir / "__init__.py").write_text("from .routes import router\n")
+    (module_dir / "routes.py").write_text(textwrap.dedent(ROUTES))
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    # Room for two of the blob responses, but not three
+    config = make_config(modules_path=str(root), response_cache_max_bytes=4000)
+    with TestClient(create_app(config)) as client:
+        yield client
+
+    for name in [name for name in sys.modules if name.split(".")[0] == "cache_modules"]:
+        del sys.modules[name]
+
+
+def calls():
+    return sys.modules["cache_modules.cached.routes"].CALLS
+
+
+def test_repeated_requests_are_served_from_the_cache(client):
+    first = client.get("/cached/counter")
+    second = client.get("/cached/counter", params={"other": 5})
+    assert (first.headers["x-cache"], second.headers["x-cache"]) == ("MISS", "HIT")
+    assert second.json() == first.json() == {"page": 1, "calls": 1}
+
+    # The page selects a response, the other query parameters do not
+    assert client.get("/cached/counter", params={"page": 2}).headers["x-cache"] == "MISS"
+    assert calls() == ["counter", "counter"]
+
+    stats = client.app.state.response_cache.stats()
+    assert (stats["entries"], stats["hits"]) == (2, 1)
+
+
+def test_expired_responses_are_computed_again(client):
+    assert client.get("/cached/short").headers["x-cache"] == "MISS"
+    assert client.get("/cached/short").headers["x-cache"] == "HIT"
+    time.sleep(0.1)
+    response = client.get("/cached/short")
+    assert response.headers["x-cache"] == "MISS"
+    assert response.json() == {"calls": 2}
+
+
+def test_if_none_match_gets_not_modified(client):
+    etag = client.get("/cached/counter").headers["etag"]
+
+    response = client.get("/cached/counter", headers={"if-none-match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    response = client.get("/cached/counter", headers={"if-none-match": '"stale"'})
+    assert response.status_code == 200
+    assert response.headers["x-cache"] == "HIT"
+
+
+def test_least_recently_used_responses_are_evicted(client):
+    client.get("/cached/blob/a")
+    client.get("/cached/blob/b")
+    assert client.get("/cached/blob/a").headers["x-cache"] == "HIT"
+
+    # Over the memory budget: b was used least recently
+    client.get("/cached/blob/c")
+    cache = client.app.state.response_cache
+    assert cache.evictions == 1
+    assert cache.size <= cache.max_bytes
+    assert client.get("/cached/blob/a").headers["x-cache"] == "HIT"
+    assert client.get("/cached/blob/b").headers["x-cache"] == "MISS"
+
+
+def test_reload_drops_the_responses_of_the_module(client):
+    client.get("/cached/counter")
+    assert client.get("/cached/counter").headers["x-cache"] == "HIT"
+
+    loader = client.app.state.module_loader
+    assert client.portal.call(loader.load_module_async, "cached") is True
+    assert client.app.state.response_cache.stats()["entries"] == 0
+    assert client.get("/cached/counter").headers["x-cache"] == "MISS"
+
+
+def test_cache_hits_skip_the_dependencies(client):
+    assert client.get("/cached/private").status_code == 401
+    assert client.get("/cached/private", headers={"x-token": "secret"}).headers["x-cache"] == "MISS"
+
+    # Served without running require_token, as documented by cache_response
+    response = client.get("/cached/private")
+    assert response.status_code == 200
+    assert response.headers["x-cache"] == "HIT"
@@ -0,0 +1,104 @@
+"""
+Tests of the compact columnar storage against the memory storage.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from modules.example_module.compact import CompactItemStorage, PackedStrings
+from modules.example_module.storage import ItemQuery, MemoryItemStorage
+
+QUERIES = [
+    None,
+    ItemQuery(),
+    ItemQuery(is_active=True),
+    ItemQuery(is_active=False, min_price=20),
+    ItemQuery(min_price=10, max_price=60),
+    ItemQuery(name_prefix="b"),
+    ItemQuery(name_prefix="é", is_active=True),
+]
+
+NAMES = ["alpha", "beta", "bravo", "é-item", "", "x" * 300]
+
+
+def random_data(rng, now):
+    return {
+        "name": rng.choice(NAMES),
+        "description": rng.choice([None, "", "some description", "ünïcode"]),
+        "price": round(rng.uniform(0, 100), 2),
+        "is_active": rng.random() < 0.6,
+        "created_at": now + timedelta(microseconds=rng.randrange(10 ** 9)),
+    }
+
+
+def new_storages():
+    """An empty memory and compact storage, without the differently timed example items."""
+    memory, compact = MemoryItemStorage(), CompactItemStorage()
+    for storage in (memory, compact):
+        assert storage.delete_many([1, 2]) == [True, True]
+    return memory, compact
+
+
+def assert_same_pages(memory, compact, rng):
+    for query in QUERIES:
+        for limit, skip in ((5, 0), (3, 2), (50, 0)):
+            cursor = rng.choice([None, 0, 10, 40])
+            assert compact.get_page(cursor, limit, skip, query) == memory.get_page(cursor, limit, skip, query)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_compact_storage_matches_the_memory_storage(seed):
+    rng = random.Random(seed)
+    now = datetime(2024, 5, 1, 12, 30)
+    memory, compact = new_storages()
+
+    for _ in range(300):
+        operation = rng.random()
+        if operation < 0.5:
+            data = random_data(rng, now)
+            assert compact.create(data) == memory.create(data)
+        elif operation < 0.8:
+            item_id = rng.randrange(1, 60)
+            changes = {key: value for key, value in random_data(rng, now).items()
+                       if key != "created_at" and rng.random() < 0.5}
+            changes["updated_at"] = now
+            assert compact.update(item_id, changes) == memory.update(item_id, changes)
+        else:
+            item_id = rng.randrange(1, 60)
+            assert compact.delete(item_id) == memory.delete(item_id)
+
+        if rng.random() < 0.1:
+            assert_same_pages(memory, compact, rng)
+
+    assert_same_pages(memory, compact, rng)
+    for item_id in range(0, 200):
+        assert compact.get(item_id) == memory.get(item_id)
+    assert len(compact) == len(memory.items)
+
+
+def test_bulk_operations_match():
+    now = datetime(2024, 5, 1)
+    memory, compact = new_storages()
+    data = [{"name": f"n{i}", "price": float(i), "is_active": bool(i % 2), "created_at": now}
+            for i in range(10)]
+    assert compact.create_many(data) == memory.create_many(data)
+
+    updates = [(3, {"price": 7.5}), (999, {"price": 1.0}), (12, {"name": "renamed"})]
+    assert compact.update_many(updates) == memory.update_many(updates)
+    assert compact.delete_many([4, 4, 999, 5]) == memory.delete_many([4, 4, 999, 5]) == [True, False, False, True]
+
+
+def test_packed_strings_compact_their_garbage(monkeypatch):
+    monkeypatch.setattr(PackedStrings, "MIN_COMPACT_SIZE", 16)
+    column = PackedStrings()
+    for value in ["one", None, "three", "ünï"]:
+        column.append(value)
+    for _ in range(5):
+        column.set(0, "replaced")
+    column.delete(2)
+
+    assert [column.get(row) for row in range(len(column))] == ["replaced", None, "ünï"]
+    assert column.garbage * 2 <= len(column.buffer)
+    assert len(column.buffer) == len("replaced") + len("ünï".encode("utf-8"))
@@ -0,0 +1,169 @@
+"""
+Tests of the hot-reload coordination between workers.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from core.coordination import ReloadCoordinator
+from core.watcher import ModuleWatcher, list_module_dirs
+from test_watcher import touch_later, write
+
+
+class FakeLoader:
+    """The parts of ModuleLoader the coordinator uses, recording applied changes."""
+
+    def __init__(self, modules_path):
+        self.modules_path = modules_path
+        self.running = True
+        self.watcher = None
+        self.loaded_modules = {name: None for name in list_module_dirs(modules_path)}
+        self.pending_modules = {}
+        self.applied = []
+        self.failures = 0
+
+    def create_watcher(self, callback, baseline=None):
+        return ModuleWatcher(self.modules_path, callback, backend="polling",
+                             debounce=0.05, poll_interval=0.05, max_delay=1.0,
+                             baseline=baseline)
+
+    def discover_modules(self):
+        return sorted(list_module_dirs(self.modules_path))
+
+    async def _apply_changes(self, changes):
+        if self.failures:
+            self.failures -= 1
+            return False
+        self.applied.append(changes)
+        return True
+
+
+@pytest.fixture
+def modules_dir(tmp_path):
+    modules = tmp_path / "modules"
+    write(modules / "alpha" / "__init__.py")
+    write(modules / "alpha" / "routes.py")
+    return modules
+
+
+def make_coordinator(modules_dir, tmp_path):
+    coordinator = ReloadCoordinator(FakeLoader(modules_dir), str(tmp_path / "state"))
+    coordinator._prepare()
+    return coordinator
+
+
+def publish_state(coordinator, generation, changed):
+    history = [{"generation": g, "changed": changed, "removed": []} for g in range(1, generation + 1)]
+    coordinator.state_file.write_text(json.dumps({"generation": generation, "history": history}))
+
+
+def read_state(coordinator):
+    return json.loads(coordinator.state_file.read_text())
+
+
+def wait_for_generation(coordinator, generation, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if coordinator.state_file.exists() and read_state(coordinator)["generation"] >= generation:
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def stop(coordinator):
+    watcher = coordinator.module_loader.watcher
+    coordinator.close()
+    if watcher:
+        watcher.join(5)
+
+
+def test_failed_reload_is_retried(modules_dir, tmp_path):
+    coordinator = make_coordinator(modules_dir, tmp_path)
+    loader = coordinator.module_loader
+    publish_state(coordinator, 1, {"alpha": []})
+    loader.failures = 1
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(coordinator.sync())
+    assert coordinator.generation == 0
+
+    # The state file has not changed, but the generation was never applied
+    asyncio.run(coordinator.sync())
+    assert coordinator.generation == 1
+    assert [set(c.changed) for c in loader.applied] == [{"alpha"}]
+
+    # Once applied, the same state file is not read again
+    asyncio.run(coordinator.sync())
+    assert len(loader.applied) == 1
+    stop(coordinator)
+
+
+def test_generations_published_while_loading_are_applied(modules_dir, tmp_path):
+    state_dir = tmp_path / "state"
+    state_dir.mkdir()
+    (state_dir / "generation.json").write_text(json.dumps({"generation": 1, "history": [
+        {"generation": 1, "changed": {"alpha": []}, "removed": []},
+    ]}))
+
+    # Created before the worker loads its modules, at the published generation
+    coordinator = ReloadCoordinator(FakeLoader(modules_dir), str(state_dir))
+    assert coordinator.generation == 1
+
+    # Published while the modules were loading
+    publish_state(coordinator, 2, {"beta": []})
+    coordinator._prepare()
+    assert coordinator.generation == 1
+
+    asyncio.run(coordinator.sync())
+    assert coordinator.generation == 2
+    assert [set(c.changed) for c in coordinator.module_loader.applied] == [{"beta"}]
+    stop(coordinator)
+
+
+def test_first_leader_records_baseline_without_publishing(modules_dir, tmp_path):
+    coordinator = make_coordinator(modules_dir, tmp_path)
+    assert coordinator._try_lead()
+    coordinator._start_leader_watcher()
+    try:
+        state = read_state(coordinator)
+        assert state["generation"] == 0
+        assert str(modules_dir / "alpha" / "routes.py") in state["files"]["alpha"]
+
+        # Nothing changed, so nothing gets published
+        time.sleep(0.3)
+        assert read_state(coordinator)["generation"] == 0
+    finally:
+        stop(coordinator)
+
+
+def test_new_leader_publishes_changes_made_without_a_leader(modules_dir, tmp_path):
+    first = make_coordinator(modules_dir, tmp_path)
+    assert first._try_lead()
+    first._start_leader_watcher()
+    try:
+        routes = modules_dir / "alpha" / "routes.py"
+        touch_later(routes, "x = 22\n")
+        assert wait_for_generation(first, 1)
+    finally:
+        stop(first)
+
+    # Changed while no worker watches the modules directory
+    touch_later(routes, "x = 333\n")
+    write(modules_dir / "beta" / "__init__.py")
+
+    second = make_coordinator(modules_dir, tmp_path)
+    assert second.generation == 1
+    assert second._try_lead()
+    second._start_leader_watcher()
+    try:
+        assert wait_for_generation(second, 2)
+        asyncio.run(second.sync())
+    finally:
+        stop(second)
+
+    assert second.generation == 2
+    changes = second.module_loader.applied[-1]
+    assert changes.changed == {"alpha": {str(routes)}, "beta": {str(modules_dir / "beta" / "__init__.py")}}
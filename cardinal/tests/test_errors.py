@@ -0,0 +1,61 @@
+"""
+Tests of the error handlers and the error aggregator.
+"""
+
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.utils import setup_error_handlers
+from core.utils.errors import echo_body
+
+
+@pytest.fixture
+def error_app(app):
+    setup_error_handlers(app, error_window=3600, error_body_echo_bytes=64)
+
+    async def boom():
+        raise RuntimeError("boom")
+
+    app.add_api_route("/boom", boom)
+    return app
+
+
+def test_repeated_exception_is_logged_once_and_not_reraised(error_app, caplog):
+    # The test client re-raises any exception that escapes the application,
+    # as the server would log it with its traceback
+    with TestClient(error_app, raise_server_exceptions=True) as client, caplog.at_level(logging.ERROR):
+        for _ in range(5):
+            response = client.get("/boom")
+            assert response.status_code == 500
+            assert response.json()["error"] == "Internal Server Error"
+
+        summary = client.get("/errors").json()
+
+    tracebacks = [record for record in caplog.records if record.exc_info]
+    assert len(tracebacks) == 1
+    assert summary["total"] == 5
+    assert summary["fingerprints"] == 1
+    assert summary["top"][0]["count"] == 5
+
+
+def test_errors_endpoint_is_a_system_route(error_app):
+    with TestClient(error_app) as client:
+        schema = client.get("/openapi.json").json()
+    assert schema["paths"]["/errors"]["get"]["tags"] == ["System"]
+
+
+def test_validation_error_echo_is_capped(error_app):
+    with TestClient(error_app) as client:
+        response = client.post("/items/", json={"name": "x" * 1000, "price": "not a price"})
+    assert response.status_code == 422
+    body = response.json()
+    assert body["body_truncated"] is True
+    assert len(body["body"]) <= 64
+
+
+def test_echo_body():
+    assert echo_body({"a": 1}, 100) == ({"a": 1}, False)
+    assert echo_body("é" * 10, 5) == ("éé", True)
+    assert echo_body({"a": 1}, 0) == (None, True)
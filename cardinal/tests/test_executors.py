@@ -0,0 +1,92 @@
+"""
+Tests of the per-module thread and process pools.
+"""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from core.executors import PROCESS, THREAD, ExecutionPolicy, ExecutorRegistry
+
+
+def test_reconfigure_with_the_same_sizes_keeps_the_thread_pool():
+    registry = ExecutorRegistry(ExecutionPolicy(threads=2, processes=1))
+    registry.configure("alpha")
+    executors = registry.executors("alpha")
+    thread_pool = executors.get(THREAD)
+    process_pool = executors.get(PROCESS)
+
+    registry.configure("alpha")
+    assert registry.executors("alpha") is executors
+    assert executors.get(THREAD) is thread_pool
+    # Worker processes keep the code they imported, so a reload replaces them
+    assert executors.get(PROCESS) is not process_pool
+    registry.shutdown()
+
+
+def test_reconfigure_with_new_sizes_replaces_the_pools():
+    registry = ExecutorRegistry(ExecutionPolicy(threads=2, processes=1))
+    registry.configure("alpha")
+    executors = registry.executors("alpha")
+    executors.get(THREAD)
+
+    registry.configure("alpha", {"threads": 3, "processes": None})
+    replaced = registry.executors("alpha")
+    assert replaced is not executors
+    assert replaced.policy.threads == 3
+    assert executors.thread_pool is None
+    registry.shutdown()
+
+
+def test_remove_module_shuts_the_pools_down():
+    registry = ExecutorRegistry(ExecutionPolicy(threads=2, processes=1))
+    executors = registry.executors("alpha")
+    executors.get(THREAD)
+
+    registry.remove_module("alpha")
+    assert "alpha" not in registry.modules
+    assert executors.thread_pool is None
+
+
+def test_hot_reload_keeps_the_module_thread_pool(client):
+    loader = client.app.state.module_loader
+    client.get("/items/1")
+    executors = loader.executors.executors("example_module")
+    thread_pool = executors.get(THREAD)
+
+    assert client.portal.call(loader.load_module_async, "example_module") is True
+    assert loader.executors.executors("example_module").get(THREAD) is thread_pool
+    assert client.get("/items/1").status_code == 200
+
+
+def test_shutdown_drains_the_pools_before_unloading_modules(app, monkeypatch):
+    loader = app.state.module_loader
+    calls = []
+    shutdown = loader.executors.shutdown
+    unload_all_modules = loader.unload_all_modules
+
+    def record_shutdown(*args, **kwargs):
+        calls.append("executors")
+        shutdown(*args, **kwargs)
+
+    async def record_unload():
+        calls.append("unload")
+        await unload_all_modules()
+
+    monkeypatch.setattr(loader.executors, "shutdown", record_shutdown)
+    monkeypatch.setattr(loader, "unload_all_modules", record_unload)
+
+    with TestClient(app):
+        pass
+    assert calls[:2] == ["executors", "unload"]
+
+
+def test_run_uses_the_module_pool():
+    registry = ExecutorRegistry(ExecutionPolicy(threads=1, processes=0))
+
+    async def main():
+        return await registry.run("alpha", THREAD, lambda value: value * 2, 21)
+
+    assert asyncio.run(main()) == 42
+    assert registry.executors("alpha").submitted[THREAD] == 1
+    registry.shutdown()
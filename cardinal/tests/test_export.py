@@ -0,0 +1,68 @@
+"""
+Tests of the NDJSON export of the example module, on every storage backend.
+"""
+
+import json
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import make_config
+from core import create_app
+from core.executors import THREAD
+
+
+@pytest.fixture(params=["memory", "compact", "sqlite"])
+def client(request, tmp_path, monkeypatch):
+    monkeypatch.setenv("CARDINAL_ITEMS_STORAGE", request.param)
+    monkeypatch.setenv("CARDINAL_ITEMS_SQLITE_PATH", str(tmp_path / "items.db"))
+    with TestClient(create_app(make_config())) as client:
+        yield client
+
+
+def export(client, **params):
+    response = client.get("/items/export", params=params)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.content.endswith(b"\n")
+    return [json.loads(line) for line in response.content.splitlines()]
+
+
+def test_export_matches_the_items(client):
+    client.post("/items/", json={"name": "Ünïcode \"quoted\"\nline", "price": 3.0, "is_active": False})
+    client.put("/items/2", json={"description": None})
+
+    lines = export(client)
+    assert lines == [client.get(f"/items/{item_id}").json() for item_id in (1, 2, 3)]
+
+
+def test_export_of_many_items_in_small_chunks(client):
+    count = 2500
+    body = b"".join(
+        json.dumps({"name": f"Bulk {number}", "price": number / 10, "is_active": True}).encode() + b"\n"
+        for number in range(count)
+    )
+    response = client.post("/items/bulk", content=body, headers={"content-type": "application/x-ndjson"})
+    assert response.json()["succeeded"] == count
+    client.delete("/items/100")
+
+    # A chunk boundary falls right after the deleted item
+    lines = export(client, chunk_size=99)
+    ids = [line["id"] for line in lines]
+    assert len(ids) == count + 2 - 1
+    assert ids == sorted(set(ids))
+    assert 100 not in ids
+    assert lines[-1]["name"] == f"Bulk {count - 1}"
+
+
+def test_blocking_export_runs_in_the_module_thread_pool(client):
+    storage = sys.modules["modules.example_module.routes"].item_service.storage
+    if not storage.blocking:
+        pytest.skip("Only blocking storage backends are read off the event loop")
+    executors = client.app.state.module_loader.executors.executors("example_module")
+    submitted = executors.submitted[THREAD]
+
+    # Two full chunks of one item, then the end of the iterator
+    assert len(export(client, chunk_size=1)) == 2
+    assert executors.submitted[THREAD] - submitted == 3
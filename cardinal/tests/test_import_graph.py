@@ -0,0 +1,57 @@
+"""
+Tests of the import graph used by partial reloads.
+"""
+
+from core.import_graph import build_import_graph, dependents, file_to_module, reload_order
+
+PACKAGE = "plugins.shop"
+
+
+def write_files(root, files):
+    for name, text in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+
+def test_file_to_module(tmp_path):
+    assert file_to_module(PACKAGE, tmp_path, str(tmp_path / "__init__.py")) == PACKAGE
+    assert file_to_module(PACKAGE, tmp_path, str(tmp_path / "routes.py")) == f"{PACKAGE}.routes"
+    assert file_to_module(PACKAGE, tmp_path, str(tmp_path / "db" / "__init__.py")) == f"{PACKAGE}.db"
+
+
+def test_graph_resolves_relative_and_absolute_imports(tmp_path):
+    write_files(tmp_path, {
+        "__init__.py": "from .routes import router\n",
+        "routes.py": "import os\nfrom .services import Service\nfrom . import models\n",
+        "services.py": f"from {PACKAGE}.db.session import connect\n",
+        "models.py": "X = 1\n",
+        "db/__init__.py": "",
+        "db/session.py": "from ..models import X\n",
+        "broken.py": "def (:\n",
+    })
+    graph = build_import_graph(PACKAGE, tmp_path)
+
+    assert graph[PACKAGE] == {f"{PACKAGE}.routes"}
+    assert graph[f"{PACKAGE}.routes"] == {f"{PACKAGE}.services", f"{PACKAGE}.models"}
+    assert graph[f"{PACKAGE}.services"] == {f"{PACKAGE}.db.session"}
+    assert graph[f"{PACKAGE}.db.session"] == {f"{PACKAGE}.models"}
+    assert graph[f"{PACKAGE}.broken"] == set()
+
+
+def test_dependents_and_reload_order(tmp_path):
+    graph = {
+        PACKAGE: {f"{PACKAGE}.routes"},
+        f"{PACKAGE}.routes": {f"{PACKAGE}.services", f"{PACKAGE}.models"},
+        f"{PACKAGE}.services": {f"{PACKAGE}.models"},
+        f"{PACKAGE}.models": set(),
+        f"{PACKAGE}.unrelated": set(),
+    }
+    names = dependents(graph, {f"{PACKAGE}.services"})
+    assert names == {f"{PACKAGE}.services", f"{PACKAGE}.routes", PACKAGE}
+    assert reload_order(graph, names) == [f"{PACKAGE}.services", f"{PACKAGE}.routes", PACKAGE]
+
+
+def test_reload_order_appends_cycles():
+    graph = {"a": {"b"}, "b": {"a"}, "c": set()}
+    assert reload_order(graph, {"a", "b", "c"}) == ["c", "a", "b"]
@@ -0,0 +1,83 @@
+"""
+Tests of the example module's item endpoints and storage backends.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from modules.example_module.storage import ItemQuery, MemoryItemStorage
+
+
+@pytest.mark.parametrize("changes", [{"is_active": None}, {"price": None}, {"name": None}])
+def test_null_update_is_rejected_and_leaves_the_item_intact(client, changes):
+    before = client.get("/items/1").json()
+
+    response = client.put("/items/1", json=changes)
+    assert response.status_code == 422
+
+    assert client.get("/items/1").json() == before
+    assert client.delete("/items/1").status_code == 204
+    assert client.get("/items/1").status_code == 404
+
+
+def test_null_bulk_update_fails_only_that_entry(client):
+    response = client.patch("/items/bulk", json=[{"id": 1, "price": None}, {"id": 2, "price": 5}])
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == [422, 200]
+
+    assert client.delete("/items/1").status_code == 204
+    assert client.get("/items/2").json()["price"] == 5
+
+
+def test_null_description_clears_it(client):
+    response = client.put("/items/1", json={"description": None})
+    assert response.status_code == 200
+    assert response.json()["description"] is None
+
+
+def test_memory_storage_keeps_indexes_on_invalid_update():
+    storage = MemoryItemStorage()
+    by_price = list(storage.by_price)
+    by_name = list(storage.by_name)
+
+    with pytest.raises(ValueError):
+        storage.update(1, {"price": None})
+
+    assert storage.by_price == by_price
+    assert storage.by_name == by_name
+    assert storage.delete(1)
+    assert all(item_id != 1 for _, item_id in storage.by_price + storage.by_name)
+
+
+def test_memory_storage_indexes_follow_updates():
+    storage = MemoryItemStorage()
+    storage.update(1, {"price": 1000.0, "is_active": False, "name": "Zeta"})
+
+    items, _ = storage.get_page(None, 10, 0, ItemQuery(min_price=500))
+    assert [item.id for item in items] == [1]
+    items, _ = storage.get_page(None, 10, 0, ItemQuery(is_active=True))
+    assert 1 not in [item.id for item in items]
+    items, _ = storage.get_page(None, 10, 0, ItemQuery(name_prefix="Ze"))
+    assert [item.id for item in items] == [1]
+
+
+def test_memory_storage_filtered_pages_follow_the_cursor():
+    storage = MemoryItemStorage()
+    for number in range(40):
+        storage.create({"name": f"n{number % 7}", "price": float(40 - number),
+                        "is_active": number % 3 == 0, "created_at": datetime.now()})
+
+    for query in (ItemQuery(min_price=5, max_price=30), ItemQuery(name_prefix="n3"),
+                  ItemQuery(min_price=10, is_active=True)):
+        expected = [item_id for item_id in sorted(storage.items) if query.matches(storage.items[item_id])]
+        walked, cursor = [], None
+        while True:
+            items, cursor = storage.get_page(cursor, 4, 0, query)
+            walked.extend(item.id for item in items)
+            if cursor is None:
+                break
+        assert walked == expected
+        items, _ = storage.get_page(expected[2], 3, 1, query)
+        assert [item.id for item in items] == expected[4:7]
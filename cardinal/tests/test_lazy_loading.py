@@ -0,0 +1,85 @@
+"""
+Tests of lazy module loading from the AST manifest.
+"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import CARDINAL_DIR, make_config
+from core import create_app
+from core.manifest import read_manifest_entry
+from test_watcher import write
+
+
+@pytest.fixture
+def manifest_file(tmp_path):
+    return tmp_path / "manifest" / "modules.json"
+
+
+@pytest.fixture
+def client(manifest_file):
+    config = make_config(module_loading="lazy", module_manifest_file=str(manifest_file))
+    with TestClient(create_app(config)) as client:
+        yield client
+
+
+def test_manifest_is_read_without_importing(tmp_path):
+    assert read_manifest_entry(CARDINAL_DIR / "modules" / "example_module").prefix == "/items"
+
+    write(tmp_path / "static" / "__init__.py", '"""Static."""\nfrom .routes import router\n')
+    write(tmp_path / "static" / "routes.py", 'import missing_package\nrouter = APIRouter(prefix="/static/")\n')
+    write(tmp_path / "dynamic" / "__init__.py", "router = APIRouter(prefix=PREFIX)\n")
+    write(tmp_path / "broken" / "__init__.py", "def (\n")
+
+    static = read_manifest_entry(tmp_path / "static")
+    assert (static.prefix, static.description) == ("/static", "Static.")
+    assert read_manifest_entry(tmp_path / "dynamic").prefix is None
+    assert read_manifest_entry(tmp_path / "broken").prefix is None
+
+
+def test_first_request_loads_the_module(client, manifest_file):
+    loader = client.app.state.module_loader
+    assert loader.pending_modules == {"example_module": "/items"}
+    assert "example_module" not in loader.loaded_modules
+    assert json.loads(manifest_file.read_text())["example_module"]["prefix"] == "/items"
+
+    response = client.get("/items/1")
+    assert response.status_code == 200
+    assert response.json()["id"] == 1
+    assert loader.pending_modules == {}
+    assert "example_module" in loader.loaded_modules
+    # The module's hooks ran, as for an eager load
+    assert "storage" in loader.get_module_context("example_module").state
+
+
+def test_concurrent_first_requests_load_the_module_once(client, monkeypatch):
+    loader = client.app.state.module_loader
+    load_module_async = loader.load_module_async
+    loads = []
+
+    async def counting_load(module_name, *args, **kwargs):
+        loads.append(module_name)
+        return await load_module_async(module_name, *args, **kwargs)
+
+    monkeypatch.setattr(loader, "load_module_async", counting_load)
+
+    async def first_requests():
+        return await asyncio.gather(*(loader.ensure_loaded("example_module") for _ in range(5)))
+
+    assert client.portal.call(first_requests) == [True] * 5
+    assert loads == ["example_module"]
+
+
+def test_openapi_schema_loads_every_module(client):
+    loader = client.app.state.module_loader
+    schema = client.get("/openapi.json").json()
+    assert loader.pending_modules == {}
+    assert "/items/{item_id}" in schema["paths"]
+
+
+def test_unknown_paths_do_not_load_modules(client):
+    assert client.get("/elsewhere").status_code == 404
+    assert "example_module" in client.app.state.module_loader.pending_modules
@@ -0,0 +1,112 @@
+"""
+Tests of the hand-over of the example module's storage across hot reloads.
+"""
+
+import sys
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import make_config
+from core import create_app
+
+
+@pytest.fixture(params=["memory", "compact", "sqlite"])
+def client(request, tmp_path, monkeypatch):
+    monkeypatch.setenv("CARDINAL_ITEMS_STORAGE", request.param)
+    monkeypatch.setenv("CARDINAL_ITEMS_SQLITE_PATH", str(tmp_path / "items.db"))
+    with TestClient(create_app(make_config())) as client:
+        yield client
+
+
+def routes_module():
+    return sys.modules["modules.example_module.routes"]
+
+
+def reload(client):
+    loader = client.app.state.module_loader
+    assert client.portal.call(loader.load_module_async, "example_module") is True
+
+
+def test_reload_keeps_the_items(client):
+    created = client.post("/items/", json={"name": "Kept", "price": 3.5}).json()
+    old_storage = routes_module().item_service.storage
+
+    reload(client)
+    new_storage = routes_module().item_service.storage
+    assert type(new_storage).__module__ == type(old_storage).__module__
+    assert type(new_storage) is not type(old_storage)
+
+    assert client.get(f"/items/{created['id']}").json() == created
+    response = client.put(f"/items/{created['id']}", json={"price": 4.5})
+    assert response.status_code == 200
+    assert response.json()["price"] == 4.5
+
+
+def test_writes_of_the_previous_version_are_kept(client):
+    old_storage = routes_module().item_service.storage
+    reload(client)
+
+    # A request still running in the previous version after the swap
+    written = old_storage.create({"name": "Late", "price": 1.0, "is_active": True,
+                                  "created_at": datetime.now()})
+    assert client.get(f"/items/{written.id}").json()["name"] == "Late"
+    assert [item["name"] for item in client.get("/items/", params={"limit": 100}).json()].count("Late") == 1
+
+    # IDs stay unique across both versions
+    created = client.post("/items/", json={"name": "New", "price": 2.0}).json()
+    assert created["id"] > written.id
+
+
+def test_bulk_create_after_reload(client):
+    reload(client)
+    response = client.post("/items/bulk", json=[{"name": "A", "price": 1.0}, {"name": "B", "price": 2.0}])
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == [201, 201]
+    for result in results:
+        assert client.get(f"/items/{result['item']['id']}").status_code == 200
+
+
+def test_partial_reload_of_the_routes_keeps_the_storage_open(client):
+    loader = client.app.state.module_loader
+    routes_file = routes_module().__file__
+    # Make the routes file look changed, so that only it and the package are reloaded
+    loader.source_hashes["example_module"][routes_file] = "0" * 40
+
+    assert client.portal.call(loader.load_module_async, "example_module", {routes_file}) is True
+    assert loader.module_stats["example_module"].reloaded_files == [
+        "modules.example_module.routes", "modules.example_module",
+    ]
+    assert client.get("/items/1").status_code == 200
+    assert client.post("/items/", json={"name": "After", "price": 1.0}).status_code == 201
+
+
+def test_writes_of_the_previous_version_invalidate_the_json_cache(client):
+    old_service = routes_module().item_service
+    reload(client)
+    new_service = routes_module().item_service
+    assert new_service.json_cache is old_service.json_cache
+
+    # Cached by the new version, then changed by a request still running in the old one
+    assert client.get("/items/1").json()["name"] == "Example Item 1"
+    old_service.update_item(1, routes_module().ItemUpdate(name="Renamed"))
+    assert client.get("/items/1").json()["name"] == "Renamed"
+
+
+def test_sync_load_defers_the_hooks_to_startup(tmp_path, monkeypatch):
+    monkeypatch.setenv("CARDINAL_ITEMS_SQLITE_PATH", str(tmp_path / "items.db"))
+    app = create_app(make_config())
+    loader = app.state.module_loader
+    # A second synchronous load before startup runs the hooks only once
+    assert loader.load_module("example_module") is True
+    assert "storage" not in loader.get_module_context("example_module").state
+
+    with TestClient(app):
+        context = loader.get_module_context("example_module")
+        assert context.generation == 1
+        assert context.state["storage"] is routes_module().item_service.storage
+
+        with pytest.raises(RuntimeError):
+            loader.load_module("example_module")
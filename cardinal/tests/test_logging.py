@@ -0,0 +1,71 @@
+"""
+Tests of the log rate limiting and formatters.
+"""
+
+import json
+import logging
+import sys
+
+from core.utils.logging import JsonFormatter, RateLimitFilter, TextFormatter
+
+
+def make_record(name: str = "core.module_loader", level: int = logging.INFO,
+                msg: str = "message") -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, msg, None, None)
+
+
+def test_rate_limit_reports_suppressed_count_on_next_record(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("core.utils.logging.time.monotonic", lambda: now[0])
+    rate_filter = RateLimitFilter({"core": 1})
+
+    assert rate_filter.filter(make_record())
+    assert not rate_filter.filter(make_record())
+    assert not rate_filter.filter(make_record())
+    now[0] += 1
+    record = make_record()
+    assert rate_filter.filter(record)
+    assert record.suppressed == 2
+    assert rate_filter.suppressed == 2
+
+
+def test_rate_limit_covers_child_loggers_only():
+    rate_filter = RateLimitFilter({"core": 1})
+    assert rate_filter.filter(make_record("core.cache"))
+    assert not rate_filter.filter(make_record("core.metrics"))
+    assert rate_filter.filter(make_record("modules.example_module"))
+
+
+def test_sampling_never_drops_warnings():
+    rate_filter = RateLimitFilter(sample_rates={"": 0.0})
+    assert not rate_filter.filter(make_record(level=logging.INFO))
+    assert rate_filter.filter(make_record(level=logging.WARNING))
+
+
+def test_text_formatter_shows_suppressed_count():
+    formatter = TextFormatter("%(levelname)s %(message)s")
+    record = make_record()
+    assert formatter.format(record) == "INFO message"
+    record.suppressed = 3
+    assert formatter.format(record) == "INFO message (3 similar records suppressed)"
+
+
+def test_text_formatter_puts_count_before_traceback():
+    formatter = TextFormatter("%(message)s")
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        record = logging.LogRecord("core", logging.ERROR, __file__, 1, "failed", None,
+                                   sys.exc_info())
+    record.suppressed = 1
+    lines = formatter.format(record).splitlines()
+    assert lines[0] == "failed (1 similar records suppressed)"
+    assert lines[-1] == "RuntimeError: boom"
+
+
+def test_json_formatter_includes_suppressed_count():
+    record = make_record()
+    record.suppressed = 4
+    data = json.loads(JsonFormatter().format(record))
+    assert data["message"] == "message"
+    assert data["suppressed"] == 4
@@ -0,0 +1,76 @@
+"""
+Tests of the request metrics.
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.metrics import CORE_MODULE, UNMATCHED_ROUTE, MetricsRegistry
+from core.middleware import MetricsMiddleware
+
+
+def route_stats(registry, module, method, route):
+    stats = registry.routes[(module, method, route)]
+    return stats.requests, stats.errors
+
+
+def test_requests_are_counted_per_route_and_module(client):
+    registry = client.app.state.module_loader.metrics
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/items/999")
+    client.get("/nowhere")
+
+    assert route_stats(registry, "example_module", "GET", "/items/{item_id}") == (3, 0)
+    assert route_stats(registry, CORE_MODULE, "GET", UNMATCHED_ROUTE) == (1, 0)
+
+    summary = registry.module_summary()["example_module"]
+    assert (summary["requests"], summary["errors"], summary["in_flight"]) == (3, 0, 0)
+    assert summary["mean_ms"] is not None
+
+    text = client.get("/metrics").text
+    assert 'cardinal_requests_total{module="example_module",method="GET",route="/items/{item_id}"} 3' in text
+    assert 'cardinal_requests_in_flight{module="example_module"} 0' in text
+
+
+def test_server_errors_are_counted():
+    def boom():
+        raise RuntimeError("boom")
+
+    def ok():
+        return {"ok": True}
+
+    # Endpoints of a module without a router prefix are attributed once routed
+    boom.__module__ = ok.__module__ = "modules.alpha.routes"
+    app = FastAPI()
+    app.get("/boom")(boom)
+    app.get("/ok")(ok)
+    registry = MetricsRegistry()
+    app.add_middleware(MetricsMiddleware, registry=registry)
+
+    client = TestClient(app, raise_server_exceptions=False)
+    assert client.get("/boom").status_code == 500
+    client.get("/ok")
+    client.get("/ok")
+
+    assert route_stats(registry, "alpha", "GET", "/boom") == (1, 1)
+    assert route_stats(registry, "alpha", "GET", "/ok") == (2, 0)
+    assert registry.module_summary()["alpha"]["errors"] == 1
+    assert registry.in_flight[CORE_MODULE] == 0
+
+
+def test_prefix_attribution_and_module_removal():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.set_module_prefix("alpha", "/alpha/")
+    assert registry.module_for_path("/alpha/items/1") == "alpha"
+    assert registry.module_for_path("/alphabet") == CORE_MODULE
+
+    registry.record("alpha", "GET", "/alpha/", 200, 0.05)
+    registry.record("alpha", "GET", "/alpha/", 503, 2.0)
+    stats = registry.routes[("alpha", "GET", "/alpha/")]
+    assert stats.bucket_counts == [1, 0, 1]
+    assert registry.module_summary()["alpha"]["p95_ms"] is None
+
+    registry.remove_module("alpha")
+    assert registry.routes == {}
+    assert registry.module_for_path("/alpha/") == CORE_MODULE
@@ -0,0 +1,159 @@
+"""
+Tests of module loading and partial reloads.
+"""
+
+import asyncio
+import sys
+import textwrap
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.module_loader import ModuleLoader
+from core.watcher import ModuleChanges
+
+ROUTES_TEMPLATE = """
+from fastapi import APIRouter
+{imports}
+
+router = APIRouter(prefix="/{name}")
+
+@router.get("/")
+async def index():
+    return {{"module": "{name}"}}
+"""
+
+
+def write_module(root, name, submodules=0):
+    module_dir = root / name
+    module_dir.mkdir(parents=True)
+    (module_dir / "__init__.py").write_text("from .routes import router\n")
+    imports = []
+    for number in range(submodules):
+        (module_dir / f"part{number}.py").write_text(f"VALUE = {number}\n")
+        imports.append(f"from . import part{number}")
+    (module_dir / "routes.py").write_text(
+        textwrap.dedent(ROUTES_TEMPLATE.format(name=name, imports="\n".join(imports)))
+    )
+    return module_dir
+
+
+def test_concurrent_load_of_many_modules(tmp_path, monkeypatch):
+    root = tmp_path / "concurrent_modules"
+    names = sorted(f"module_{number}" for number in range(12))
+    for name in names:
+        write_module(root, name, submodules=8)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    loader = ModuleLoader(FastAPI(), str(root), load_workers=4)
+    # Switch threads as often as possible, so that one worker removes its
+    # modules from sys.modules while the others import theirs
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for _ in range(5):
+            loader.load_all_modules()
+            assert sorted(loader.loaded_modules) == names
+            assert all(loader.module_stats[name].error is None for name in names)
+    finally:
+        sys.setswitchinterval(interval)
+
+
+SHOP_ROUTES = """
+from fastapi import APIRouter
+
+from . import state
+from .helpers import VALUE
+
+router = APIRouter(prefix="/shop")
+
+
+@router.get("/")
+async def index():
+    state.CALLS.append(VALUE)
+    return {"value": VALUE}
+"""
+
+
+@pytest.fixture
+def shop(tmp_path, monkeypatch):
+    """A loader with a "shop" module made of a package, routes, helpers and state file."""
+    root = tmp_path / "partial_modules"
+    module_dir = root / "shop"
+    module_dir.mkdir(parents=True)
+    (module_dir / "__init__.py").write_text("from .routes import router\n")
+    (module_dir / "helpers.py").write_text("VALUE = 1\n")
+    (module_dir / "state.py").write_text("CALLS = []\n")
+    (module_dir / "routes.py").write_text(SHOP_ROUTES)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    app = FastAPI()
+    loader = ModuleLoader(app, str(root), load_workers=1)
+    loader.load_all_modules()
+    yield loader, module_dir, TestClient(app)
+
+    for name in [name for name in sys.modules if name.split(".")[0] == "partial_modules"]:
+        del sys.modules[name]
+
+
+def test_partial_reload_imports_new_module_objects(shop):
+    loader, module_dir, client = shop
+    assert client.get("/shop/").json() == {"value": 1}
+    old_routes = sys.modules["partial_modules.shop.routes"]
+    state = sys.modules["partial_modules.shop.state"]
+
+    helpers = module_dir / "helpers.py"
+    helpers.write_text("VALUE = 22\n")
+    assert asyncio.run(loader.load_module_async("shop", {str(helpers)})) is True
+
+    assert loader.module_stats["shop"].reloaded_files == [
+        "partial_modules.shop.helpers", "partial_modules.shop.routes", "partial_modules.shop",
+    ]
+    assert client.get("/shop/").json() == {"value": 22}
+
+    # The previous version kept its globals; the unchanged state file is shared
+    assert sys.modules["partial_modules.shop.routes"] is not old_routes
+    assert old_routes.VALUE == 1
+    assert sys.modules["partial_modules.shop.state"] is state
+    assert state.CALLS == [1, 22]
+
+
+def test_failed_partial_reload_restores_the_previous_modules(shop):
+    loader, module_dir, client = shop
+    package = sys.modules["partial_modules.shop"]
+    old_routes = sys.modules["partial_modules.shop.routes"]
+
+    routes = module_dir / "routes.py"
+    routes.write_text(SHOP_ROUTES + "\nraise RuntimeError('broken')\n")
+    stats = loader.module_stats["shop"]
+    changed = loader._changed_sources(loader.source_hashes["shop"], {str(routes)})
+    with pytest.raises(RuntimeError):
+        loader._reload_files("shop", changed, stats)
+
+    assert sys.modules["partial_modules.shop"] is package
+    assert sys.modules["partial_modules.shop.routes"] is old_routes
+    assert package.routes is old_routes
+
+
+def test_failed_reload_keeps_the_previous_version_serving(shop):
+    loader, module_dir, client = shop
+    routes = module_dir / "routes.py"
+    routes.write_text(SHOP_ROUTES.replace("VALUE}", "VALUE + 1}") + "\nraise RuntimeError('broken')\n")
+
+    assert asyncio.run(loader.load_module_async("shop", {str(routes)})) is False
+    assert loader.module_stats["shop"].error == "RuntimeError: broken"
+    assert client.get("/shop/").json() == {"value": 1}
+
+
+def test_apply_changes_reports_failed_modules(shop):
+    loader, module_dir, client = shop
+    changes = ModuleChanges()
+    changes.changed = {"shop": {str(module_dir / "helpers.py")}}
+    (module_dir / "helpers.py").write_text("VALUE = \n")
+    assert asyncio.run(loader._apply_changes(changes)) is False
+    assert client.get("/shop/").json() == {"value": 1}
+
+    (module_dir / "helpers.py").write_text("VALUE = 3\n")
+    assert asyncio.run(loader._apply_changes(changes)) is True
+    assert client.get("/shop/").json() == {"value": 3}
@@ -0,0 +1,27 @@
+"""
+Tests of the attribution of functions and endpoints to modules.
+"""
+
+from core.executors import ExecutorRegistry
+from core.metrics import MetricsRegistry
+from core.module_names import CORE_MODULE, module_of
+from modules.example_module import routes
+
+
+def test_module_of_functions_in_the_modules_package():
+    assert module_of(routes.call_service) == "example_module"
+    assert module_of(routes.call_service, modules_package="plugins") is None
+
+
+def test_module_of_core_and_missing_endpoints():
+    assert module_of(module_of) is None
+    assert module_of(None) is None
+    assert module_of(len) is None
+
+
+def test_registries_share_the_attribution():
+    assert MetricsRegistry().module_of(routes.call_service) == "example_module"
+    assert MetricsRegistry().module_of(module_of) is None
+    executors = ExecutorRegistry()
+    assert executors.module_of(routes.call_service) == "example_module"
+    assert executors.module_of(module_of) == CORE_MODULE
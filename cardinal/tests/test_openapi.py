@@ -0,0 +1,118 @@
+"""
+Tests of the incremental OpenAPI schema cache.
+"""
+
+import gzip
+import textwrap
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core import create_app
+from core.openapi import CORE_FRAGMENT, accepts_gzip
+
+from conftest import make_config
+
+MODULE_TEMPLATE = """
+from fastapi import APIRouter
+from pydantic import BaseModel
+
+router = APIRouter(prefix="/{name}")
+
+class Item(BaseModel):
+    {field}: int
+
+@router.get("/", response_model=Item)
+async def get_item():
+    return Item({field}=1)
+"""
+
+
+def write_module(root, name, field):
+    module_dir = root / name
+    module_dir.mkdir(parents=True)
+    (module_dir / "__init__.py").write_text("from .routes import router\n")
+    (module_dir / "routes.py").write_text(textwrap.dedent(MODULE_TEMPLATE.format(name=name, field=field)))
+
+
+def resolve(document, ref):
+    node = document
+    for part in ref.lstrip("#/").split("/"):
+        node = node[part]
+    return node
+
+
+def response_schema(document, path):
+    content = document["paths"][path]["get"]["responses"]["200"]["content"]
+    return resolve(document, content["application/json"]["schema"]["$ref"])
+
+
+def test_models_with_the_same_name_in_two_modules(tmp_path, monkeypatch):
+    modules_dir = tmp_path / "openapi_collision_modules"
+    write_module(modules_dir, "alpha", "alpha_field")
+    write_module(modules_dir, "beta", "beta_field")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    app = create_app(make_config(modules_path=str(modules_dir)))
+    with TestClient(app) as client:
+        document = client.get("/openapi.json").json()
+
+    assert set(response_schema(document, "/alpha/")["properties"]) == {"alpha_field"}
+    assert set(response_schema(document, "/beta/")["properties"]) == {"beta_field"}
+
+
+def test_incremental_schema_covers_every_route(client):
+    document = client.get("/openapi.json").json()
+    assert "/health" in document["paths"]
+    assert "/items/{item_id}" in document["paths"]
+    assert "Item" in document["components"]["schemas"]
+    assert response_schema(document, "/items/{item_id}")["title"] == "Item"
+
+
+def test_etag_and_gzip(client):
+    response = client.get("/openapi.json")
+    etag = response.headers["etag"]
+    assert client.get("/openapi.json", headers={"If-None-Match": etag}).status_code == 304
+
+    raw = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert raw.headers["content-encoding"] == "gzip"
+
+    refused = client.get("/openapi.json", headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "content-encoding" not in refused.headers
+    assert refused.json() == response.json()
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", True),
+    ("deflate, gzip;q=0.5", True),
+    ("gzip;q=0", False),
+    ("GZIP; q=0.0, *", False),
+    ("*", True),
+    ("*;q=0", False),
+    ("identity", False),
+    ("", False),
+])
+def test_accepts_gzip(header, expected):
+    assert accepts_gzip(header) is expected
+
+
+def test_invalidation_during_a_rebuild_is_kept(app):
+    cache = app.state.module_loader.openapi_cache
+    cache.openapi()
+    cache.invalidate(["example_module"])
+
+    build_document = cache._build_document
+
+    def build_and_invalidate(stale):
+        # A module changes while the rebuild runs in its worker thread
+        document = build_document(stale)
+        cache.invalidate(["example_module"])
+        return document
+
+    cache._build_document = build_and_invalidate
+    cache.openapi()
+    cache._build_document = build_document
+
+    assert not cache.is_fresh
+    assert cache._stale == {"example_module"}
+    assert CORE_FRAGMENT in cache._fragments
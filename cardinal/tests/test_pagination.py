@@ -0,0 +1,77 @@
+"""
+Tests of the keyset pagination of the item list, on every storage backend.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import make_config
+from core import create_app
+
+
+@pytest.fixture(params=["memory", "compact", "sqlite"])
+def client(request, tmp_path, monkeypatch):
+    monkeypatch.setenv("CARDINAL_ITEMS_STORAGE", request.param)
+    monkeypatch.setenv("CARDINAL_ITEMS_SQLITE_PATH", str(tmp_path / "items.db"))
+    with TestClient(create_app(make_config())) as client:
+        for number in range(3, 21):
+            client.post("/items/", json={"name": f"Item {number:02}", "price": float(number),
+                                         "is_active": number % 2 == 0})
+        yield client
+
+
+def get_page(client, **params):
+    response = client.get("/items/", params=params)
+    assert response.status_code == 200
+    cursor = response.headers.get("x-next-cursor")
+    return [item["id"] for item in response.json()], int(cursor) if cursor is not None else None
+
+
+def test_cursor_walks_every_item_once(client):
+    seen = []
+    ids, cursor = get_page(client, limit=6)
+    while True:
+        seen.extend(ids)
+        if cursor is None:
+            break
+        assert cursor == ids[-1]
+        ids, cursor = get_page(client, limit=6, cursor=cursor)
+    assert seen == list(range(1, 21))
+
+    # An exactly full last page has no next cursor
+    assert get_page(client, limit=5, cursor=15) == ([16, 17, 18, 19, 20], None)
+
+
+def test_cursor_is_stable_across_inserts_and_deletes(client):
+    first, cursor = get_page(client, limit=5)
+    assert first == [1, 2, 3, 4, 5]
+
+    # Changes before the cursor do not shift the next page
+    client.delete("/items/2")
+    client.delete("/items/5")
+    created = client.post("/items/", json={"name": "Late", "price": 1.0, "is_active": True}).json()
+    assert get_page(client, limit=5, cursor=cursor)[0] == [6, 7, 8, 9, 10]
+
+    # Deleting the cursor item itself does not lose the page after it
+    client.delete("/items/10")
+    ids, cursor = get_page(client, limit=5, cursor=9)
+    assert ids == [11, 12, 13, 14, 15]
+
+    rest = []
+    while cursor is not None:
+        ids, cursor = get_page(client, limit=5, cursor=cursor)
+        rest.extend(ids)
+    assert rest == [16, 17, 18, 19, 20, created["id"]]
+
+
+def test_cursor_combines_with_filters_and_skip(client):
+    ids, cursor = get_page(client, limit=3, is_active=True)
+    assert ids == [1, 2, 4]
+    ids, cursor = get_page(client, limit=3, is_active=True, cursor=cursor, skip=1)
+    assert ids == [8, 10, 12]
+
+    ids, cursor = get_page(client, limit=4, min_price=10, max_price=15)
+    assert (ids, cursor) == ([10, 11, 12, 13], 13)
+    assert get_page(client, limit=4, min_price=10, max_price=15, cursor=cursor) == ([14, 15], None)
+
+    assert get_page(client, limit=10, name_prefix="Item 1") == ([10, 11, 12, 13, 14, 15, 16, 17, 18, 19], None)
@@ -0,0 +1,72 @@
+"""
+Tests of the shared resources registry.
+"""
+
+import asyncio
+
+import httpx
+from fastapi import Depends
+from fastapi.testclient import TestClient
+
+from conftest import make_config
+from core import create_app
+from core.resources import ResourceRegistry, get_http_client, resource
+
+
+def test_http_client_is_shared_and_closed_at_shutdown():
+    app = create_app(make_config())
+    resources = app.state.resources
+    clients = []
+
+    @app.get("/probe")
+    async def probe(client: httpx.AsyncClient = Depends(get_http_client),
+                    token=Depends(resource("token"))):
+        clients.append(client)
+        return {"token": token}
+
+    created, closed = [], []
+    resources.register("token", lambda: created.append(1) or "abc", close=closed.append)
+    assert resources.http_client is None
+
+    with TestClient(app) as client:
+        opened = resources.http_client
+        for _ in range(3):
+            assert client.get("/probe").json() == {"token": "abc"}
+        assert clients == [opened] * 3
+        assert created == [1]
+        assert client.get("/resources").json()["resources"] == {"token": True}
+
+    assert opened.is_closed
+    assert resources.http_client is None
+    assert closed == ["abc"]
+
+
+def test_resources_are_created_once_and_closed_newest_first():
+    closed = []
+
+    async def slow_factory():
+        await asyncio.sleep(0.01)
+        return object()
+
+    async def close_async(value):
+        closed.append(value)
+
+    async def scenario():
+        registry = ResourceRegistry()
+        registry.register("first", lambda: "first", close=closed.append)
+        registry.register("second", slow_factory)
+        registry.register("third", lambda: "third", close=close_async)
+
+        assert await registry.get("first") == "first"
+        # Concurrent first uses end up with the same resource
+        one, two = await asyncio.gather(registry.get("second"), registry.get("second"))
+        assert one is two
+        await registry.get("third")
+
+        await registry.start()
+        assert registry.pool_stats()["connections"] == 0
+        await registry.close()
+        assert registry.pool_stats() is None
+
+    asyncio.run(scenario())
+    assert closed == ["third", "first"]
@@ -0,0 +1,62 @@
+"""
+Tests of the fast JSON responses.
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from core.responses import ModelJSONResponse, RawJSONResponse, dump_json, dump_model
+from modules.example_module.models import Item
+
+CREATED = datetime(2024, 5, 1, 12, 30, 15, 250)
+
+
+def make_item(item_id=1, **fields):
+    return Item(**dict(dict(id=item_id, name="Café", description=None, price=2.5,
+                            is_active=True, created_at=CREATED), **fields))
+
+
+def test_dump_json_encodes_models_lists_and_plain_data():
+    item = make_item()
+    assert json.loads(dump_model(item)) == json.loads(item.json())
+    assert dump_json(item) == dump_model(item)
+    assert dump_json([make_item(1), make_item(2)]) == b"[" + dump_model(make_item(1)) + b"," + dump_model(make_item(2)) + b"]"
+    assert dump_json([]) == b"[]"
+
+    # Mixed or plain data goes through jsonable_encoder
+    data = dump_json({"when": CREATED, "items": [make_item()], "name": "é"})
+    assert json.loads(data) == {"when": CREATED.isoformat(), "items": [json.loads(dump_model(make_item()))], "name": "é"}
+    assert "é".encode("utf-8") in data
+
+    with pytest.raises(ValueError):
+        dump_json({"price": float("nan")})
+
+
+def test_responses_send_the_encoded_body():
+    response = ModelJSONResponse([make_item()], status_code=201, headers={"X-Next-Cursor": "1"})
+    assert response.status_code == 201
+    assert response.body == dump_json([make_item()])
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["x-next-cursor"] == "1"
+
+    assert RawJSONResponse(b'{"a":1}').body == b'{"a":1}'
+    assert RawJSONResponse('{"a":"é"}').body == '{"a":"é"}'.encode("utf-8")
+
+
+def test_item_routes_send_the_same_json_as_the_response_model(client):
+    created = client.post("/items/", json={"name": "Ünï", "price": 1.25, "is_active": False})
+    assert created.status_code == 201
+    item = created.json()
+    assert json.loads(dump_model(Item(**item))) == item
+
+    listed = client.get("/items/", params={"limit": 2})
+    assert listed.headers["x-next-cursor"] == "2"
+    assert listed.json() == [client.get(f"/items/{item_id}").json() for item_id in (1, 2)]
+    assert "x-next-cursor" not in client.get("/items/", params={"limit": 3}).headers
+
+    updated = client.put(f"/items/{item['id']}", json={"price": 3.5})
+    assert updated.json() == dict(item, price=3.5, updated_at=updated.json()["updated_at"])
+    assert updated.json()["updated_at"] is not None
+    assert client.get(f"/items/{item['id']}").json() == updated.json()
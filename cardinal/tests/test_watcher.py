@@ -0,0 +1,122 @@
+"""
+Tests of the module watcher and its stat index.
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from core.watcher import InotifyBackend, ModuleChanges, ModuleWatcher, StatIndex, list_module_dirs
+
+
+def write(path, text="x = 1\n"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def touch_later(path, text):
+    # Change the size as well, mtimes can be too coarse to tell writes apart
+    write(path, text)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+@pytest.fixture
+def modules_dir(tmp_path):
+    write(tmp_path / "alpha" / "__init__.py")
+    write(tmp_path / "alpha" / "routes.py")
+    write(tmp_path / "beta" / "__init__.py")
+    (tmp_path / "not_a_module").mkdir()
+    return tmp_path
+
+
+def test_list_module_dirs_needs_init(modules_dir):
+    assert list_module_dirs(modules_dir) == {"alpha", "beta"}
+
+
+def test_scan_reports_only_changed_files(modules_dir):
+    index = StatIndex(modules_dir)
+    index.build()
+    assert not index.scan({"alpha", "beta"})
+
+    routes = modules_dir / "alpha" / "routes.py"
+    touch_later(routes, "x = 22\n")
+    changes = index.scan({"alpha", "beta"})
+    assert changes.changed == {"alpha": {str(routes)}}
+    assert not changes.removed
+
+    # The change is recorded, a second scan finds nothing new
+    assert not index.scan({"alpha"})
+
+
+def test_scan_reports_new_deleted_and_removed(modules_dir):
+    index = StatIndex(modules_dir)
+    index.build()
+
+    write(modules_dir / "gamma" / "__init__.py")
+    os.remove(modules_dir / "alpha" / "routes.py")
+    os.remove(modules_dir / "beta" / "__init__.py")
+
+    changes = index.scan({"alpha", "beta", "gamma"})
+    assert changes.changed["gamma"] == {str(modules_dir / "gamma" / "__init__.py")}
+    assert changes.changed["alpha"] == {str(modules_dir / "alpha" / "routes.py")}
+    assert changes.removed == {"beta"}
+
+
+def test_merge_keeps_the_latest_state():
+    first = ModuleChanges()
+    first.changed["alpha"] = {"a.py"}
+    first.removed.add("beta")
+
+    second = ModuleChanges()
+    second.changed["beta"] = {"b.py"}
+    second.changed["alpha"] = {"c.py"}
+    second.removed.add("gamma")
+
+    first.merge(second)
+    assert first.changed == {"alpha": {"a.py", "c.py"}, "beta": {"b.py"}}
+    assert first.removed == {"gamma"}
+
+
+def wait_for_changes(received, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not received and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return received
+
+
+@pytest.mark.parametrize("backend", ["polling", "inotify"])
+def test_watcher_reports_debounced_changes(modules_dir, backend):
+    if backend == "inotify":
+        try:
+            InotifyBackend(modules_dir, threading.Event()).close()
+        except OSError:
+            pytest.skip("inotify is not available")
+
+    received = []
+    watcher = ModuleWatcher(modules_dir, received.append, backend=backend,
+                            debounce=0.05, poll_interval=0.05, max_delay=1.0)
+    watcher.start()
+    try:
+        # Wait for the index to be built before changing anything
+        deadline = time.monotonic() + 5
+        while not watcher.index.files and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        routes = modules_dir / "alpha" / "routes.py"
+        touch_later(routes, "x = 333\n")
+        write(modules_dir / "alpha" / "models.py")
+
+        assert wait_for_changes(received)
+    finally:
+        watcher.stop()
+        watcher.join(5)
+
+    changed = ModuleChanges()
+    for batch in received:
+        changed.merge(batch)
+    assert set(changed.changed) == {"alpha"}
+    assert str(routes) in changed.changed["alpha"]
+    assert watcher.backend.name == backend